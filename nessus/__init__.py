@@ -4,10 +4,17 @@ it should be quite mapped to the official REST API, but sometimes, I changed it
 documented where the REST API is lying.
 """
 
+from typing import Optional, Iterable
+
+from nessus.cache import NessusResultCache
 from nessus.editor import LibNessusEditor
 from nessus.file import LibNessusFile
+from nessus.metrics import NessusRequestHook
 from nessus.policies import LibNessusPolicies
+from nessus.ratelimit import scanner_rate_limiter
+from nessus.retry import NessusRetryPolicy, NessusCircuitBreaker
 from nessus.scans import LibNessusScans
+from nessus.transport import NessusTransport
 
 
 class LibNessus:
@@ -16,15 +23,46 @@ class LibNessus:
     """
     # pylint: disable=too-few-public-methods
 
-    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str) -> None:
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str, pool_size: int = 10,
+                 result_cache: Optional[NessusResultCache] = None, cache_ttl: float = 0,
+                 retry_policy: Optional[NessusRetryPolicy] = None,
+                 circuit_breaker: Optional[NessusCircuitBreaker] = None, rate_limit: Optional[float] = None,
+                 max_concurrent: Optional[int] = None, hooks: Iterable[NessusRequestHook] = (),
+                 scheme: str = 'https') -> None:
+        """
+        :param host: host to connect to which has nessus
+        :param port: port on the host to connect
+        :param api_access_key: access key to the API
+        :param api_secret_key: secret key to the API
+        :param pool_size: maximum number of connections kept alive to the scanner, shared by every submodule
+        :param result_cache: where to keep the results of finished scans, nothing is kept if not given
+        :param cache_ttl: seconds to keep the templates and policies before asking them again, nothing is kept if not
+                          positive
+        :param retry_policy: how to retry the requests failing because of the scanner, never retried if not given
+        :param circuit_breaker: refuse the requests while the scanner is failing, always sent if not given
+        :param rate_limit: requests per second to the scanner, shared with every client of the process using it
+        :param max_concurrent: requests in flight to the scanner, shared with every client of the process using it
+        :param hooks: told about every request sent (see `NessusMetricsCollector`)
+        :param scheme: 'https' as nessus, 'http' for a local stand-in (see `nessus.testing`)
+        """
+        rate_limiter = None
+        if rate_limit is not None or max_concurrent is not None:
+            rate_limiter = scanner_rate_limiter(host, port, rate=rate_limit, max_concurrent=max_concurrent)
+
+        self.transport = NessusTransport(host=host, port=port, api_access_key=api_access_key,
+                                         api_secret_key=api_secret_key, pool_size=pool_size,
+                                         retry_policy=retry_policy, circuit_breaker=circuit_breaker,
+                                         rate_limiter=rate_limiter, hooks=hooks, scheme=scheme)
+
         args = {
             'host': host,
             'port': port,
             'api_access_key': api_access_key,
             'api_secret_key': api_secret_key,
+            'transport': self.transport,
         }
 
         self.file = LibNessusFile(**args)
-        self.scans = LibNessusScans(**args)
-        self.policies = LibNessusPolicies(**args)
-        self.editor = LibNessusEditor(**args)
+        self.scans = LibNessusScans(result_cache=result_cache, **args)
+        self.policies = LibNessusPolicies(cache_ttl=cache_ttl, **args)
+        self.editor = LibNessusEditor(cache_ttl=cache_ttl, **args)
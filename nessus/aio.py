@@ -0,0 +1,831 @@
+"""
+asyncio flavour of the library, every submodule has the same methods as the blocking one but as coroutines
+it reuses the models, what is sent to nessus (the `*Requests` of each submodule) and the error handling of the
+blocking library, only the transport changes
+needs `aiohttp` (`pip install nessus[async]`)
+"""
+import asyncio
+from contextlib import contextmanager
+
+import aiohttp
+import requests
+from time import monotonic
+from uuid import uuid4
+
+from typing import Optional, Mapping, IO, Tuple, Any, Iterable, Iterator, AsyncIterator, Callable, TypeVar, Union, \
+    Awaitable, Set, Sequence
+
+from nessus.base import LibNessusBase, NessusRequestAttempts
+from nessus.cache import NessusTtlCache, NessusResultCache
+from nessus.codec import decode
+from nessus.error import NessusError
+from nessus.editor import NessusTemplate, NessusTemplateType, LibNessusEditorRequests
+from nessus.file import NessusFile, NessusRemoteFile, LibNessusFileRequests
+from nessus.metrics import NessusRequestHook
+from nessus.policies import NessusPolicy, LibNessusPoliciesRequests
+from nessus.ratelimit import NessusRateLimiter, scanner_rate_limiter
+from nessus.retry import NessusRetryPolicy, NessusCircuitBreaker
+from nessus.scans import NessusScan, NessusScanCreated, NessusScanDetails, NessusScanHost, NessusScanHostDetails, \
+    NessusScanPluginOutputDetails, NessusScanPluginOutput, NessusScanExportFormat, NessusScanIndex, \
+    NessusScanWaitPace, NessusScanExportPace, NessusPluginsOutputHarvest, LibNessusScansRequests, \
+    TERMINAL_SCAN_STATUSES
+from nessus.targets import shard_targets, normalize_targets
+
+T = TypeVar('T')
+
+
+@contextmanager
+def _network_errors() -> Iterator[None]:
+    """
+    raise the network failures of aiohttp as the ones of requests, which the rest of the library knows (as
+    `is_transient` for the retries and the circuit breaker)
+    """
+    try:
+        yield
+    except asyncio.TimeoutError as e:
+        raise requests.Timeout(e) from e
+    except aiohttp.ClientConnectionError as e:
+        raise requests.ConnectionError(e) from e
+    except aiohttp.ClientPayloadError as e:
+        raise requests.exceptions.ChunkedEncodingError(e) from e
+
+
+class AsyncNessusResponse:
+    """
+    aiohttp response with the small part of `requests.Response` that the error mapping and the models are using
+    """
+
+    def __init__(self, status_code: int, content: bytes, raw: Optional[aiohttp.ClientResponse] = None) -> None:
+        """
+        :param status_code: http status of the response
+        :param content: body of the response, empty if streamed
+        :param raw: response whose body is still to be read with `iter_content`, for a streamed request
+        """
+        self.status_code = status_code
+        self.content = content
+        self.raw = raw
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """
+        :return: headers of a streamed response, as its Content-Length, empty otherwise
+        """
+        if self.raw is not None:
+            return self.raw.headers
+        return {}
+
+    def json(self) -> Any:
+        return decode(self.content)
+
+    async def iter_content(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """
+        :param chunk_size: bytes read from the network at once
+        :return: the body of a streamed response, chunk by chunk
+        """
+        with _network_errors():
+            async for chunk in self.raw.content.iter_chunked(chunk_size):
+                yield chunk
+
+    def close(self) -> None:
+        """
+        give the connection of a streamed response back to the pool
+        """
+        if self.raw is not None:
+            self.raw.release()
+
+
+def _decode(response: AsyncNessusResponse) -> Any:
+    return response.json()
+
+
+def _as_is(response: AsyncNessusResponse) -> AsyncNessusResponse:
+    return response
+
+
+class AsyncNessusTransport:
+    """
+    pooled aiohttp session to a nessus scanner, shared by every submodule of AsyncLibNessus
+    """
+
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str, pool_size: int = 100,
+                 retry_policy: Optional[NessusRetryPolicy] = None,
+                 circuit_breaker: Optional[NessusCircuitBreaker] = None,
+                 rate_limiter: Optional[NessusRateLimiter] = None, hooks: Iterable[NessusRequestHook] = (),
+                 scheme: str = 'https') -> None:
+        """
+        :param host: host to connect to which has nessus
+        :param port: port on the host to connect
+        :param api_access_key: access key to the API
+        :param api_secret_key: secret key to the API
+        :param pool_size: maximum number of connections to the scanner, so of in-flight requests
+        :param retry_policy: how to retry the requests failing because of the scanner, never retried if not given
+        :param circuit_breaker: refuse the requests while the scanner is failing, always sent if not given
+        :param rate_limiter: budget of requests to the scanner (see `scanner_rate_limiter`), not limited if not given
+        :param hooks: told about every request sent (see `NessusMetricsCollector`)
+        :param scheme: 'https' as nessus, 'http' for a local stand-in (see `nessus.testing`)
+        """
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.hooks = list(hooks)
+        self.scheme = scheme
+
+        self.__api_access_key = api_access_key
+        self.__api_secret_key = api_secret_key
+
+        self.__session_cache = None  # type: aiohttp.ClientSession
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        return a session with some useful fields already set, created on first use as it has to be done inside the
+        event loop
+        :return: session object suitable to connect to nessus
+        """
+        if self.__session_cache is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ssl=False)
+            headers = {'X-ApiKeys': 'accessKey={}; secretKey={};'.format(self.__api_access_key,
+                                                                         self.__api_secret_key)}
+            self.__session_cache = aiohttp.ClientSession(connector=connector, headers=headers)
+
+        return self.__session_cache
+
+    def url(self, path: str) -> str:
+        """
+        :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
+        :return: full url to the given path
+        """
+        return '{}://{}:{}/{}'.format(self.scheme, self.host, self.port, path)
+
+    async def close(self) -> None:
+        """
+        close every connection, the session will be recreated if used again
+        """
+        if self.__session_cache is not None:
+            await self.__session_cache.close()
+            self.__session_cache = None
+
+
+class AsyncLibNessusBase:
+    """
+    as LibNessusBase, but with coroutines
+    """
+
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str,
+                 transport: Optional[AsyncNessusTransport] = None) -> None:
+        """
+        :param host: host to connect to which has nessus
+        :param port: port on the host to connect
+        :param api_access_key: access key to the API
+        :param api_secret_key: secret key to the API
+        :param transport: connection to share with other submodules, a private one is created if not given
+        """
+        if transport is None:
+            transport = AsyncNessusTransport(host=host, port=port, api_access_key=api_access_key,
+                                             api_secret_key=api_secret_key)
+        self.__transport = transport
+
+    @property
+    def transport(self) -> AsyncNessusTransport:
+        """
+        :return: connection used to talk to nessus
+        """
+        return self.__transport
+
+    async def __request(self, method: str, path: str, read: Callable[[AsyncNessusResponse], T],
+                        stream: bool = False, **kwargs) -> T:
+        """
+        common method to allow even more code compaction, retried and refused as LibNessusBase does
+        :param method: http method to use
+        :param path: path in nessus
+        :param read: what to get from the response, timed as decoding
+        :param stream: do not read the body, it has to be consumed with `iter_content` and closed
+        :param kwargs: forwarded to aiohttp.ClientSession.request
+        :return: what was read from the response
+        """
+        assert not path.startswith('/')
+
+        session = self.__transport.session
+        url = self.__transport.url(path)
+        rate_limiter = self.__transport.rate_limiter
+        attempts = NessusRequestAttempts(self.__transport, method, path, stream)
+
+        while True:
+            attempts.start()
+            try:
+                try:
+                    if rate_limiter is not None:
+                        await rate_limiter.acquire_async()
+                    ans = None
+                    try:
+                        attempts.sending()
+                        ans = await self.__send(session, method, url, stream, **kwargs)
+                    finally:
+                        attempts.sent(ans)
+                    LibNessusBase._check_error(ans)  # pylint: disable=protected-access
+                except Exception as e:
+                    delay = attempts.failed(e)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                attempts.succeeded()
+            finally:
+                attempts.finish()
+
+            return attempts.read(read)
+
+    @staticmethod
+    async def __send(session: aiohttp.ClientSession, method: str, url: str, stream: bool,
+                     **kwargs) -> AsyncNessusResponse:
+        with _network_errors():
+            raw = await session.request(method=method, url=url, **kwargs)
+            if stream and raw.status == 200:
+                return AsyncNessusResponse(raw.status, b'', raw)
+            try:
+                return AsyncNessusResponse(raw.status, await raw.read())
+            finally:
+                raw.release()
+
+    async def _get(self, path: str) -> Any:
+        """
+        GET request to nessus
+        :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
+        :return: decoded json of the response
+        """
+        return await self.__request('GET', path, _decode)
+
+    async def _stream(self, path: str) -> AsyncNessusResponse:
+        """
+        GET request to nessus, the body is not read, so it has to be consumed with `iter_content` and closed, which
+        also gives back the slot of the request to the rate limiter
+        :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
+        :return: response, with its body still to read
+        """
+        return await self.__request('GET', path, _as_is, stream=True)
+
+    async def _delete(self, path: str) -> Any:
+        """
+        DELETE request to nessus
+        :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
+        :return: decoded json of the response, None if empty
+        """
+        return await self.__request('DELETE', path, _decode)
+
+    async def _post(self, path: str, json: Optional[Mapping[str, Any]] = None,
+                    files: Optional[Mapping[str, Tuple[str, IO[bytes]]]] = None) -> Any:
+        """
+        POST request to nessus
+        :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
+        :param json: POST data to pass to aiohttp
+        :param files: opened file to passe to aiohttp
+        :return: decoded json of the response
+        """
+        if files is None:
+            return await self.__request('POST', path, _decode, json=json)
+
+        data = aiohttp.FormData()
+        for field, (filename, io) in files.items():
+            data.add_field(field, io, filename=filename)
+        return await self.__request('POST', path, _decode, data=data)
+
+
+class AsyncLibNessusFile(AsyncLibNessusBase, LibNessusFileRequests):
+    async def upload(self, nessus_file: NessusFile) -> NessusRemoteFile:
+        """
+        Uploads a file.
+        ~lies: the data field name 'Filedata' is not documented in Nessus
+        :param nessus_file: file to upload
+        :return: the filename on nessus
+        """
+        with open(nessus_file.path, 'rb') as io:
+            json = await self._post(path='file/upload', files=self._upload_files(io))
+
+            filename = json['fileuploaded']
+            return NessusRemoteFile(filename)
+
+
+class AsyncLibNessusEditor(AsyncLibNessusBase, LibNessusEditorRequests):
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str,
+                 transport: Optional[AsyncNessusTransport] = None, cache_ttl: float = 0) -> None:
+        """
+        :param cache_ttl: seconds to keep the templates before asking them again, nothing is kept if not positive
+        """
+        super().__init__(host, port, api_access_key, api_secret_key, transport)
+
+        self.__templates = NessusTtlCache(cache_ttl)  # type: NessusTtlCache[Mapping[str, NessusTemplate]]
+
+    async def list(self, template_type: NessusTemplateType) -> Iterable[NessusTemplate]:
+        return set((await self.__templates_by_name(template_type)).values())
+
+    async def template_by_name(self, template_type: NessusTemplateType, name: str) -> Optional[NessusTemplate]:
+        """
+        :param template_type: type of the template
+        :param name: name of the template, as 'discovery' or 'basic'
+        :return: the template or None if there is none with this name
+        """
+        return (await self.__templates_by_name(template_type)).get(name)
+
+    def invalidate(self) -> None:
+        """
+        forget the kept templates
+        """
+        self.__templates.invalidate()
+
+    async def __templates_by_name(self, template_type: NessusTemplateType) -> Mapping[str, NessusTemplate]:
+        async def fetch() -> Mapping[str, NessusTemplate]:
+            return self._templates_by_name(await self._get(self._templates_path(template_type)))
+
+        return await self.__templates.get_or_fetch_async(template_type, fetch)
+
+
+class AsyncLibNessusPolicies(AsyncLibNessusBase, LibNessusPoliciesRequests):
+    """
+    modules handling /policies
+    """
+
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str,
+                 transport: Optional[AsyncNessusTransport] = None, cache_ttl: float = 0) -> None:
+        """
+        :param cache_ttl: seconds to keep the policies before asking them again, nothing is kept if not positive, it
+                          is forgotten on `create`, `delete` and `import_`
+        """
+        super().__init__(host, port, api_access_key, api_secret_key, transport)
+
+        self.__policies = NessusTtlCache(cache_ttl)  # type: NessusTtlCache[Mapping[int, NessusPolicy]]
+
+    async def list(self) -> Iterable[NessusPolicy]:
+        """
+        Returns the policy list.
+        :return: iterable of available policy
+        """
+        return set((await self.__policies_by_id()).values())
+
+    async def policy_by_id(self, policy_id: int) -> Optional[NessusPolicy]:
+        """
+        :param policy_id: id of the policy, as given by `create`
+        :return: the policy or None if there is none with this id
+        """
+        return (await self.__policies_by_id()).get(policy_id)
+
+    async def policy_by_name(self, name: str) -> Optional[NessusPolicy]:
+        """
+        :param name: name of the policy
+        :return: one of the policies with this name or None if there is none
+        """
+        return next((p for p in (await self.__policies_by_id()).values() if p.name == name), None)
+
+    def invalidate(self) -> None:
+        """
+        forget the kept policies
+        """
+        self.__policies.invalidate()
+
+    async def __policies_by_id(self) -> Mapping[int, NessusPolicy]:
+        async def fetch() -> Mapping[int, NessusPolicy]:
+            return self._policies_by_id(await self._get('policies'))
+
+        return await self.__policies.get_or_fetch_async(None, fetch)
+
+    async def delete(self, policy: NessusPolicy) -> None:
+        """
+        Delete a policy.
+        :param policy: one to delete
+        """
+        try:
+            await self._delete(self._policy_path(policy))
+        finally:
+            self.invalidate()
+
+    async def create(self, template: NessusTemplate, name: Optional[str] = None) -> Tuple[int, str]:
+        """
+        Creates a policy.
+        :param template: what to create
+        :param name: name of the policy
+        :return: (policy_id, policy_name)
+        """
+        try:
+            created = await self._post('policies', json=self._create_json(template, name))
+        finally:
+            self.invalidate()
+        return created['policy_id'], created['policy_name']
+
+    async def import_(self, remote_file: NessusRemoteFile) -> NessusPolicy:
+        """
+        Import an existing policy uploaded using Nessus.file (.nessus format only).
+        sorry about the name, but in python 'import' is a reserved keyword
+        :param remote_file: file to treat as nessus policy
+        """
+        try:
+            imported = await self._post('policies/import', json=self._import_json(remote_file))
+        finally:
+            self.invalidate()
+        return NessusPolicy.from_json(imported)
+
+
+class AsyncLibNessusScans(AsyncLibNessusBase, LibNessusScansRequests):
+    """
+    module handling /scans
+    """
+
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str,
+                 transport: Optional[AsyncNessusTransport] = None,
+                 result_cache: Optional[NessusResultCache] = None) -> None:
+        """
+        :param result_cache: where to keep the results of finished scans, nothing is kept if not given
+        """
+        super().__init__(host, port, api_access_key, api_secret_key, transport)
+
+        self.__result_cache = result_cache
+
+        # scans known from previous `list`, to only ask for the modified ones
+        self.__index = NessusScanIndex()
+        self.__index_lock = None  # type: Optional[asyncio.Lock]
+
+    async def create(self, policy: NessusPolicy, name: Optional[str] = None,
+                     template: Optional[NessusTemplate] = None,
+                     default_targets: Iterable[str] = ('localhost',), normalize: bool = False) -> NessusScanCreated:
+        """
+        Creates a scan.
+        :param policy: policy to use
+        :param name: name you want for the scan
+        :param template: template will be taken from policy if not given
+        :param default_targets: need to have at least an element
+        :param normalize: merge the targets in the fewest networks first (see `normalize_targets`), which reorders
+                          them: the addresses sorted, the hostnames last
+        :return: created scan
+        """
+        created = await self._post('scans', json=self._create_json(policy, name, template,
+                                                                    default_targets, normalize))
+
+        return NessusScanCreated.from_json(created['scan'])
+
+    async def list(self, incremental: bool = False) -> Iterable[NessusScan]:
+        """
+        Returns the scan list.
+        :param incremental: only fetch what was modified since the previous call (see `LibNessusScans.list`)
+        :return: iterable of the scans
+        """
+        if self.__index_lock is None:
+            # created on first use as it has to be done inside the event loop
+            self.__index_lock = asyncio.Lock()
+
+        async with self.__index_lock:
+            since = self.__index.timestamp if incremental else None
+            return self.__index.update(await self._get(self._list_path(since)), since is not None)
+
+    async def delete(self, scan: NessusScan) -> None:
+        """
+        Deletes a scan.
+        Scans in running, paused or stopping states can not be deleted.
+        :param scan: the soon-to-be-deleted
+        """
+        await self._delete(self._scan_path(scan))
+        self.__index.forget(scan)
+
+    async def launch(self, scan: NessusScan, alt_targets: Optional[Iterable[str]] = None,
+                     normalize: bool = False) -> str:
+        """
+        Launches a scan.
+        :param scan: the soon-to-be-launch
+        :param alt_targets: target to scan, if not given, default to the one set during scan creation
+        :param normalize: merge the targets in the fewest networks first (see `create`)
+        :return: uuid of the launched scan
+        """
+        launched = await self._post(self._launch_path(scan), json=self._launch_json(alt_targets, normalize))
+        return launched['scan_uuid']
+
+    async def details(self, scan: NessusScan, history_id: Optional[int] = None,
+                      lazy: bool = False) -> NessusScanDetails:
+        """
+        Returns details for the given scan.
+        :param scan: scan to look at, served from the result cache if it is finished
+        :param history_id: run of the scan to look at, default to the latest one
+        :param lazy: only parse each section on first access (see NessusScanLazyDetails)
+        :return: details of the scan
+        """
+        async def fetch() -> NessusScanDetails:
+            return await self.__fetch_details(scan, history_id, lazy)
+
+        return await self.__cached(scan, history_id, 'lazy_details' if lazy else 'details', '', fetch)
+
+    async def __fetch_details(self, scan: NessusScan, history_id: Optional[int] = None,
+                              lazy: bool = False) -> NessusScanDetails:
+        return self._details_type(lazy).from_json(await self._get(self._scan_path(scan, history_id)))
+
+    async def host_details(self, scan: NessusScan, host: NessusScanHost,
+                           history_id: Optional[int] = None) -> NessusScanHostDetails:
+        """
+        Returns details for the given host.
+        :param scan: scan to look at, served from the result cache if it is finished
+        :param host: host of the scan to look at
+        :param history_id: run of the scan to look at, default to the latest one
+        :return: details of the host
+        """
+        async def fetch() -> NessusScanHostDetails:
+            return NessusScanHostDetails.from_json(await self._get(self._host_details_path(scan, host, history_id)))
+
+        return await self.__cached(scan, history_id, 'host_details', str(host.host_id), fetch)
+
+    async def plugin_output(self, scan: NessusScan, host: NessusScanHost, plugin_id: int,
+                            history_id: Optional[int] = None) -> NessusScanPluginOutputDetails:
+        """
+        Returns the output for a given plugin.
+        :param scan: scan to look at, served from the result cache if it is finished
+        :param host: host of the scan to look at
+        :param plugin_id: plugin which generated the output
+        :param history_id: run of the scan to look at, default to the latest one
+        :return: output of the plugin
+        """
+        async def fetch() -> NessusScanPluginOutputDetails:
+            url = self._plugin_output_path(scan, host, plugin_id, history_id)
+            return NessusScanPluginOutputDetails.from_json(await self._get(url))
+
+        return await self.__cached(scan, history_id, 'plugin_output', '{}/{}'.format(host.host_id, plugin_id), fetch)
+
+    async def __cached(self, scan: NessusScan, history_id: Optional[int], kind: str, item: str,
+                       fetch: Callable[[], Awaitable[T]]) -> T:
+        """
+        only the results of scans known to be finished are cached, as the others can still change
+        """
+        if self.__result_cache is None or getattr(scan, 'status', None) not in TERMINAL_SCAN_STATUSES:
+            return await fetch()
+
+        return await self.__result_cache.get_or_fetch_async(scan.id, history_id, scan.last_modification_date, kind,
+                                                            item, fetch)
+
+    async def all_host_details(self, scan: NessusScan, max_workers: int = 10,
+                               hosts: Optional[Iterable[NessusScanHost]] = None) \
+            -> AsyncIterator[Tuple[NessusScanHost, Union[NessusScanHostDetails, Exception]]]:
+        """
+        Fetch the details of every host of a scan, with at most `max_workers` requests in flight.
+        a failing host does not abort the batch, its error is given in place of the details, the requests still in
+        flight are cancelled if the iteration is left early
+        :param scan: scan to harvest
+        :param max_workers: number of concurrent requests, should not be greater than the pool size of the transport
+        :param hosts: hosts to fetch, default to every host of the scan
+        :return: (host, details or error) as soon as they are completed
+        """
+        if hosts is None:
+            hosts = (await self.details(scan)).hosts
+
+        pending_hosts = iter(hosts)
+        running = dict()
+
+        def submit_next() -> None:
+            host = next(pending_hosts, None)
+            if host is not None:
+                running[asyncio.ensure_future(self.host_details(scan, host))] = host
+
+        try:
+            for _ in range(max_workers):
+                submit_next()
+
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    host = running.pop(task)
+                    submit_next()
+
+                    try:
+                        yield host, task.result()
+                    except (NessusError, requests.RequestException) as error:
+                        yield host, error
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def plugins_output(self, scan: NessusScan, plugin_ids: Iterable[int],
+                             hosts: Optional[Iterable[NessusScanHost]] = None, max_workers: int = 10) \
+            -> Mapping[NessusScanHost, Mapping[int, Union[Set[NessusScanPluginOutput], Exception]]]:
+        """
+        Fetch the outputs of the given plugins for every host of a scan, with at most `max_workers` requests in flight.
+        only the hosts which reported a plugin are asked for it (see NessusPluginsOutputHarvest)
+        a failing request does not abort the harvest, its error is given in place of the outputs of its host and plugin
+        :param scan: scan to harvest
+        :param plugin_ids: plugins to fetch
+        :param hosts: hosts to fetch, default to every host of the scan
+        :param max_workers: number of concurrent requests, should not be greater than the pool size of the transport
+        :return: host -> plugin id -> outputs or error, hosts without any output for a plugin do not have it as key
+        """
+        if hosts is None:
+            hosts = (await self.details(scan)).hosts
+        hosts = list(hosts)
+        harvest = NessusPluginsOutputHarvest(plugin_ids, hosts)
+        async for host, host_details in self.all_host_details(scan, max_workers, hosts):
+            harvest.add_host(host, host_details)
+
+        running = dict()
+
+        def submit_next() -> None:
+            pair = harvest.next_pair()
+            if pair is not None:
+                running[asyncio.ensure_future(self.plugin_output(scan, *pair))] = pair
+
+        try:
+            for _ in range(max_workers):
+                submit_next()
+
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pair = running.pop(task)
+                    try:
+                        harvest.add_output(pair, task.result())
+                    except (NessusError, requests.RequestException) as error:
+                        harvest.add_output(pair, error)
+                    submit_next()
+        finally:
+            for task in running:
+                task.cancel()
+
+        return harvest.outputs()
+
+    async def wait(self, scan_uuid: str, timeout: Optional[float] = None, min_interval: float = 1,
+                   max_interval: float = 60,
+                   on_progress: Optional[Callable[[float, Optional[float]], None]] = None) -> NessusScan:
+        """
+        Wait for a launched scan to be in one of TERMINAL_SCAN_STATUSES.
+        only the details of the scan are polled, as often as NessusScanWaitPace tells, and only their `info` and `hosts`
+        are parsed
+        :param scan_uuid: uuid given by `launch`
+        :param timeout: seconds after which NessusTimeoutError is raised, wait forever if not given
+        :param min_interval: minimal seconds between two polls
+        :param max_interval: maximal seconds between two polls
+        :param on_progress: called after each poll with the progress (between 0 and 1) and the estimated seconds left
+        :return: the scan in its final state
+        """
+        pace = NessusScanWaitPace(scan_uuid, timeout, min_interval, max_interval, on_progress)
+        scan = self._scan_by_uuid(await self.list(), scan_uuid)
+
+        while True:
+            # never from the result cache, the scan listed before the launch can look finished, and lazy as the pace
+            # only looks at `info` and `hosts`
+            interval = pace.next_interval(await self.__fetch_details(scan, lazy=True))
+            if interval is None:
+                return self._scan_by_uuid(await self.list(), scan_uuid)
+            await asyncio.sleep(interval)
+
+    async def create_sharded(self, policy: NessusPolicy, targets: Iterable[str], shards: int,
+                             name: Optional[str] = None,
+                             template: Optional[NessusTemplate] = None) -> Sequence[NessusScanCreated]:
+        """
+        Creates a scan per chunk of the targets, each with the same number of hosts (see `shard_targets`).
+        :param policy: policy to use
+        :param targets: every target to scan
+        :param shards: number of scans wanted, less are created if there is not enough hosts
+        :param name: name of the scans, suffixed by their position
+        :param template: template will be taken from policy if not given
+        :return: created scans, in the order of the normalized targets
+        """
+        if name is None:
+            name = str(uuid4())
+
+        chunks = shard_targets(normalize_targets(targets), shards)
+        return [await self.create(policy, name='{} [{}/{}]'.format(name, index, len(chunks)), template=template,
+                                  default_targets=chunk)
+                for index, chunk in enumerate(chunks, start=1)]
+
+    async def merged_details(self, scans: Iterable[NessusScan], max_workers: int = 10) -> NessusScanDetails:
+        """
+        Returns the details of the shards of a scan, as a single one (see `NessusScanDetails.merge`, the hosts keep the
+        `host_id` of their shard).
+        :param scans: shards, as given by `create_sharded`, or by `wait` to use the result cache
+        :param max_workers: number of concurrent requests, should not be greater than the pool size of the transport
+        :return: details of the whole
+        """
+        workers = asyncio.Semaphore(max(1, max_workers))
+
+        async def details(scan: NessusScan) -> NessusScanDetails:
+            async with workers:
+                return await self.details(scan)
+
+        return NessusScanDetails.merge(await asyncio.gather(*map(details, scans)))
+
+    async def run_sharded(self, policy: NessusPolicy, targets: Iterable[str], shards: int,
+                          name: Optional[str] = None, template: Optional[NessusTemplate] = None,
+                          timeout: Optional[float] = None, **kwargs) -> NessusScanDetails:
+        """
+        Creates the shards of a scan (see `create_sharded`), launches them all, waits for them to finish and returns
+        their merged details.
+        the shards are waited for concurrently
+        :param timeout: seconds after which NessusTimeoutError is raised, for the whole, wait forever if not given
+        :param kwargs: as `wait`
+        :return: details of the whole
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+
+        uuids = [await self.launch(scan) for scan in await self.create_sharded(policy, targets, shards, name, template)]
+        finished = await asyncio.gather(*(
+            self.wait(scan_uuid, timeout=None if deadline is None else max(0, deadline - monotonic()), **kwargs)
+            for scan_uuid in uuids))
+        return await self.merged_details(finished)
+
+    async def export(self, scan: NessusScan, destination: Union[str, IO[bytes]],
+                     format: NessusScanExportFormat = NessusScanExportFormat.nessus, timeout: Optional[float] = None,
+                     chunk_size: int = 1 << 20) -> int:
+        """
+        Export the given scan and download the report.
+        the report is streamed in chunks to the destination, never being fully held in memory
+        :param scan: scan to export
+        :param destination: path or opened binary file where to write the report, a path is only written once the
+                            whole report is downloaded
+        :param format: format of the report
+        :param timeout: seconds after which NessusTimeoutError is raised if the report is still not ready
+        :param chunk_size: bytes read from the network at once
+        :return: number of bytes written
+        """
+        # pylint: disable=redefined-builtin
+        pace = NessusScanExportPace(scan, timeout)
+        file_id = (await self._post(self._export_path(scan), json={'format': format.value}))['file']
+
+        while True:
+            interval = pace.next_interval(file_id, await self._get(self._export_status_path(scan, file_id)))
+            if interval is None:
+                break
+            await asyncio.sleep(interval)
+
+        url = self._export_download_path(scan, file_id)
+        if not isinstance(destination, str):
+            return await self.__download(url, destination, chunk_size)
+
+        with self._partial_file(destination) as io:
+            return await self.__download(url, io, chunk_size)
+
+    async def __download(self, url: str, io: IO[bytes], chunk_size: int) -> int:
+        written = 0
+        ans = await self._stream(url)
+        try:
+            async for chunk in ans.iter_content(chunk_size):
+                io.write(chunk)
+                written += len(chunk)
+        finally:
+            ans.close()
+        return written
+
+
+class AsyncLibNessus:
+    """
+    as LibNessus, but every call is a coroutine, for example: `await nessus.policies.list()`
+    the connections have to be closed with `await nessus.close()` or by using it as `async with`
+    """
+
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str,
+                 pool_size: int = 100, result_cache: Optional[NessusResultCache] = None, cache_ttl: float = 0,
+                 retry_policy: Optional[NessusRetryPolicy] = None,
+                 circuit_breaker: Optional[NessusCircuitBreaker] = None, rate_limit: Optional[float] = None,
+                 max_concurrent: Optional[int] = None, hooks: Iterable[NessusRequestHook] = (),
+                 scheme: str = 'https') -> None:
+        """
+        :param host: host to connect to which has nessus
+        :param port: port on the host to connect
+        :param api_access_key: access key to the API
+        :param api_secret_key: secret key to the API
+        :param pool_size: maximum number of in-flight requests to the scanner, shared by every submodule
+        :param result_cache: where to keep the results of finished scans, nothing is kept if not given
+        :param cache_ttl: seconds to keep the templates and policies before asking them again, nothing is kept if not
+                          positive
+        :param retry_policy: how to retry the requests failing because of the scanner, never retried if not given
+        :param circuit_breaker: refuse the requests while the scanner is failing, always sent if not given
+        :param rate_limit: requests per second to the scanner, shared with every client of the process using it
+        :param max_concurrent: requests in flight to the scanner, shared with every client of the process using it
+        :param hooks: told about every request sent (see `NessusMetricsCollector`)
+        :param scheme: 'https' as nessus, 'http' for a local stand-in (see `nessus.testing`)
+        """
+        rate_limiter = None
+        if rate_limit is not None or max_concurrent is not None:
+            rate_limiter = scanner_rate_limiter(host, port, rate=rate_limit, max_concurrent=max_concurrent)
+
+        self.transport = AsyncNessusTransport(host=host, port=port, api_access_key=api_access_key,
+                                              api_secret_key=api_secret_key, pool_size=pool_size,
+                                              retry_policy=retry_policy, circuit_breaker=circuit_breaker,
+                                              rate_limiter=rate_limiter, hooks=hooks, scheme=scheme)
+
+        args = {
+            'host': host,
+            'port': port,
+            'api_access_key': api_access_key,
+            'api_secret_key': api_secret_key,
+            'transport': self.transport,
+        }
+
+        self.file = AsyncLibNessusFile(**args)
+        self.scans = AsyncLibNessusScans(result_cache=result_cache, **args)
+        self.policies = AsyncLibNessusPolicies(cache_ttl=cache_ttl, **args)
+        self.editor = AsyncLibNessusEditor(cache_ttl=cache_ttl, **args)
+
+    async def close(self) -> None:
+        await self.transport.close()
+
+    async def __aenter__(self) -> 'AsyncLibNessus':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -1,11 +1,187 @@
 import logging
-import re
+from time import sleep, perf_counter
 
 import requests
-from typing import Optional, Mapping, IO, Tuple, Any
+from typing import Optional, Mapping, IO, Tuple, Any, Callable, TypeVar
 
-from nessus.error import NessusInternalServerError, NessusNetworkError, NessusPolicyInUseError, \
-    NessusDuplicateFilenameLimitError, NessusScanIsActiveError, NessusWeirdNetworkError
+from nessus.codec import decode
+from nessus.error import network_error, NessusCircuitOpenError
+from nessus.metrics import NessusRequestEvent, endpoint
+from nessus.ratelimit import NessusRateLimiter
+from nessus.transport import NessusTransport
+
+T = TypeVar('T')
+
+
+def _decode(response: requests.Response) -> Any:
+    return decode(response.content)
+
+
+def _as_is(response: requests.Response) -> requests.Response:
+    return response
+
+
+class NessusRequestAttempts:
+    """
+    bookkeeping of the attempts of a single request, shared by the blocking and the asyncio clients which only do the
+    waits (rate limiter, delay between the attempts) and the sending:
+     - the circuit breaker is asked before each attempt and told how it went
+     - the hooks are told about each attempt, even the ones refused by the circuit breaker
+     - the rate limiter is given back its slot once the response is received, or once a streamed one is closed
+     - the retry policy decides whether a failed attempt is followed by another one
+    """
+
+    def __init__(self, transport: NessusTransport, method: str, path: str, streamed: bool = False) -> None:
+        """
+        :param transport: connection used for the request (or AsyncNessusTransport, having the same fields)
+        :param method: http method used
+        :param path: path in nessus
+        :param streamed: the body of the response is not read while sending
+        """
+        self.method = method
+        self.streamed = streamed
+        self.attempt = 0
+
+        self.__retry_policy = transport.retry_policy
+        self.__circuit_breaker = transport.circuit_breaker
+        self.__rate_limiter = transport.rate_limiter
+        self.__hooks = transport.hooks
+        if self.__hooks:
+            self.__scanner = '{}:{}'.format(transport.host, transport.port)
+            self.__endpoint = endpoint(path)
+
+        self.__probe = False
+        self.__start = 0.0
+        self.__network_time = 0.0
+        self.__response = None  # type: Any
+
+    def start(self) -> None:
+        """
+        called before each attempt, raise NessusCircuitOpenError if the circuit breaker refuses it
+        """
+        self.__response, self.__network_time = None, 0.0
+        try:
+            self.__probe = self.__circuit_breaker is not None and self.__circuit_breaker.before_request()
+        except NessusCircuitOpenError as e:
+            # refused without being sent, but still a failed request of the endpoint
+            self.__send_hooks()
+            self.__notify(e)
+            raise
+        self.__send_hooks()
+
+    def sending(self) -> None:
+        """
+        called once the rate limiter let the attempt go, right before sending it
+        """
+        self.__start = perf_counter()
+
+    def sent(self, response: Any) -> None:
+        """
+        called once the attempt is sent, even if it failed
+        :param response: response got, None if there is none
+        """
+        self.__network_time = perf_counter() - self.__start
+        self.__response = response
+        if self.__rate_limiter is None:
+            return
+        if self.streamed and response is not None and response.status_code == 200:
+            # the body is still to be downloaded
+            self.__release_on_close(response, self.__rate_limiter)
+        else:
+            self.__rate_limiter.release()
+
+    def failed(self, error: Exception) -> Optional[float]:
+        """
+        called when the attempt failed, from sending to checking the status of the response
+        :param error: why it failed
+        :return: seconds to wait before the next attempt, None if the error has to be raised
+        """
+        self.__notify(error)
+        if self.__circuit_breaker is not None:
+            self.__circuit_breaker.after_request(error)
+        if self.__retry_policy is None or not self.__retry_policy.should_retry(self.method, error, self.attempt):
+            return None
+
+        if self.__response is not None:
+            # give its connection back to the pool before the next attempt
+            self.__response.close()
+        delay = self.__retry_policy.delay(self.attempt)
+        self.attempt += 1
+        return delay
+
+    def succeeded(self) -> None:
+        """
+        called when the attempt got a successful response
+        """
+        if self.__circuit_breaker is not None:
+            self.__circuit_breaker.after_request()
+
+    def finish(self) -> None:
+        """
+        called after each attempt, however it ended
+        """
+        if self.__probe:
+            # `after_request` was not reached if interrupted, the breaker must not wait for it forever
+            self.__probe = False
+            self.__circuit_breaker.cancel_probe()
+
+    def read(self, read: Callable[[Any], T]) -> T:
+        """
+        :param read: what to get from the successful response, timed as decoding
+        :return: what was read
+        """
+        if not self.__hooks:
+            return read(self.__response)
+        start = perf_counter()
+        try:
+            return read(self.__response)
+        finally:
+            self.__notify(decode_time=perf_counter() - start)
+
+    @staticmethod
+    def __release_on_close(response: Any, rate_limiter: NessusRateLimiter) -> None:
+        """
+        give the slot back once the response is closed, as done after reading its body (or by `failed`)
+        """
+        close = response.close
+        released = False
+
+        def close_and_release() -> None:
+            nonlocal released
+            try:
+                close()
+            finally:
+                if not released:
+                    released = True
+                    rate_limiter.release()
+
+        response.close = close_and_release
+
+    def __send_hooks(self) -> None:
+        for hook in self.__hooks:
+            hook.on_send(self.__scanner, self.method, self.__endpoint)
+
+    def __notify(self, error: Optional[Exception] = None, decode_time: float = 0.0) -> None:
+        if not self.__hooks:
+            return
+
+        status, size = self.__received()
+        event = NessusRequestEvent(self.__scanner, self.method, self.__endpoint, status, size, self.__network_time,
+                                   decode_time, self.attempt, None if error is None else type(error).__name__)
+        for hook in self.__hooks:
+            hook.on_request(event)
+
+    def __received(self) -> Tuple[Optional[int], int]:
+        """
+        :return: status and size of the body of the response
+        """
+        ans = self.__response
+        if ans is None:
+            return None, 0
+        if self.streamed and ans.status_code == 200:
+            # the body is not read yet
+            return ans.status_code, int(ans.headers.get('Content-Length', 0))
+        return ans.status_code, len(ans.content or b'')
 
 
 class LibNessusBase:
@@ -13,87 +189,109 @@ class LibNessusBase:
     entry point for the nessus library, welcome!
     """
 
-    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str) -> None:
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str,
+                 transport: Optional[NessusTransport] = None) -> None:
         """
         create a nessus session with the given credentials
         :param host: host to connect to which has nessus
         :param port: port on the host to connect
         :param api_access_key: access key to the API
         :param api_secret_key: secret key to the API
+        :param transport: connection to share with other submodules, a private one is created if not given
         """
-        self.__host = host
-        self.__port = port
-        self.__api_access_key = api_access_key
-        self.__api_secret_key = api_secret_key
-
-        self.__get_session_cache = None  # type: requests.Session
+        if transport is None:
+            transport = NessusTransport(host=host, port=port, api_access_key=api_access_key,
+                                        api_secret_key=api_secret_key)
+        self.__transport = transport
 
         logging.captureWarnings(True)
 
-    def __get_session(self) -> requests.Session:
+    @property
+    def transport(self) -> NessusTransport:
         """
-        return a session with some useful fields already set
-        :return: session object suitable to connect to nessus
+        :return: connection used to talk to nessus
         """
+        return self.__transport
 
-        if self.__get_session_cache is not None:
-            return self.__get_session_cache
-
-        session = requests.Session()
-
-        session.headers['X-ApiKeys'] = 'accessKey={}; secretKey={};'.format(self.__api_access_key,
-                                                                            self.__api_secret_key)
-
-        self.__get_session_cache = session
-        return session
-
-    def __request(self, method: str, path: str, **kwargs) -> requests.Response:
+    def __request(self, method: str, path: str, read: Callable[[requests.Response], T], **kwargs) -> T:
         """
         common method to allow even more code compaction
         :param method: http method to use
         :param path: path in nessus
+        :param read: what to get from the response, timed as decoding
         :param kwargs: forwarded to requests.session.request
-        :return: response from requests
+        :return: what was read from the response
         """
         assert not path.startswith('/')
 
-        session = self.__get_session()
-        url = 'https://{}:{}/{}'.format(self.__host, self.__port, path)
+        session = self.__transport.session
+        url = self.__transport.url(path)
+        rate_limiter = self.__transport.rate_limiter
+        attempts = NessusRequestAttempts(self.__transport, method, path, kwargs.get('stream', False))
 
-        ans = session.request(method=method, url=url, verify=False, **kwargs)
-        self.__check_error(ans)
+        while True:
+            attempts.start()
+            try:
+                try:
+                    if rate_limiter is not None:
+                        rate_limiter.acquire()
+                    ans = None
+                    try:
+                        attempts.sending()
+                        ans = session.request(method=method, url=url, verify=False, **kwargs)
+                    finally:
+                        attempts.sent(ans)
+                    self._check_error(ans)
+                except Exception as e:
+                    delay = attempts.failed(e)
+                    if delay is None:
+                        raise
+                    sleep(delay)
+                    continue
+                attempts.succeeded()
+            finally:
+                attempts.finish()
 
-        return ans
+            return attempts.read(read)
 
-    def _get(self, path: str) -> requests.Response:
+    def _get(self, path: str) -> Any:
         """
         GET request to nessus
         :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
+        :return: decoded json of the response
+        """
+        return self.__request('GET', path, _decode)
+
+    def _stream(self, path: str) -> requests.Response:
+        """
+        GET request to nessus, the body is not read, so it has to be consumed with `iter_content` and closed, which
+        also gives back the slot of the request to the rate limiter
+        :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
         :return: response from requests
         """
-        return self.__request('GET', path)
+        return self.__request('GET', path, _as_is, stream=True)
 
-    def _delete(self, path: str) -> requests.Response:
+    def _delete(self, path: str) -> Any:
         """
         DELETE request to nessus
         :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
-        :return: response from requests
+        :return: decoded json of the response, None if empty
         """
-        return self.__request('DELETE', path)
+        return self.__request('DELETE', path, _decode)
 
     def _post(self, path: str, json: Optional[Mapping[str, Any]] = None,
-              files: Optional[Mapping[str, Tuple[str, IO[bytes]]]] = None) -> requests.Response:
+              files: Optional[Mapping[str, Tuple[str, IO[bytes]]]] = None) -> Any:
         """
         POST request to nessus
         :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
         :param json: POST data to pass to requests
         :param files: opened file to passe to requests
-        :return: response from requests
+        :return: decoded json of the response
         """
-        return self.__request('POST', path, json=json, files=files)
+        return self.__request('POST', path, _decode, json=json, files=files)
 
     @staticmethod
-    def __check_error(response: requests.Response) -> None:
+    def _check_error(response: requests.Response) -> None:
         """
         raise an error if needed
         :param response: response got from nessus
@@ -102,28 +300,4 @@ class LibNessusBase:
         if response.status_code == 200:
             return
 
-        if (not response.text.startswith('{')) or ('error' not in response.json()):
-            raise NessusWeirdNetworkError(response=response)
-
-        error_str = response.json()['error']
-
-        if error_str == 'An internal server error occurred':
-            raise NessusInternalServerError(response=response)
-        elif error_str == 'Can not delete an active scan':
-            raise NessusScanIsActiveError(response=response)
-
-        regex = {
-            'Policy "([^"]+)" \(ID (\d+)\) cannot be deleted since it is currently used by one or more scans.':
-                NessusPolicyInUseError,
-            "could not upload file '([^']+)': duplicate filename limit exceeded":
-                NessusDuplicateFilenameLimitError,
-        }
-
-        regex_compiled = {re.compile(k): v for k, v in regex.items()}
-        for reg, excep in regex_compiled.items():
-            match = reg.match(error_str)
-            if match:
-                args = (response,) + match.groups()
-                raise excep(*args)
-
-        raise NessusNetworkError(response=response)
+        raise network_error(response)
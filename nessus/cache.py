@@ -0,0 +1,215 @@
+"""
+caches to avoid asking nessus again for what we already know
+"""
+import pickle
+import sqlite3
+from threading import Lock
+from time import time, monotonic
+
+from typing import Optional, Callable, TypeVar, Generic, Hashable, MutableMapping, Tuple, Awaitable
+
+T = TypeVar('T')
+
+
+class NessusTtlCache(Generic[T]):
+    """
+    in memory cache, keeping each value for a given time
+    """
+
+    def __init__(self, ttl: float) -> None:
+        """
+        :param ttl: seconds to keep a value, nothing is kept if not positive
+        """
+        self.__ttl = ttl
+        self.__lock = Lock()
+        self.__values = dict()  # type: MutableMapping[Hashable, Tuple[float, T]]
+        self.__generation = 0
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        """
+        return the kept value, or fetch it and keep it
+        :param key: what to look for
+        :param fetch: how to get the value if not kept or expired
+        :return: the value
+        """
+        if self.__ttl <= 0:
+            return fetch()
+
+        kept, generation, now = self.__lookup(key)
+        if kept is not None:
+            return kept[0]
+
+        value = fetch()
+        self.__keep(key, value, generation, now)
+        return value
+
+    async def get_or_fetch_async(self, key: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+        """
+        as `get_or_fetch`, for a coroutine fetching the value (see `nessus.aio`)
+        """
+        if self.__ttl <= 0:
+            return await fetch()
+
+        kept, generation, now = self.__lookup(key)
+        if kept is not None:
+            return kept[0]
+
+        value = await fetch()
+        self.__keep(key, value, generation, now)
+        return value
+
+    def invalidate(self) -> None:
+        """
+        drop every kept value
+        """
+        with self.__lock:
+            self.__values.clear()
+            self.__generation += 1
+
+    def __lookup(self, key: Hashable) -> Tuple[Optional[Tuple[T]], int, float]:
+        """
+        :return: the kept value if not expired, the generation and the time of the lookup to keep a fetched one
+        """
+        now = monotonic()
+        with self.__lock:
+            expiration, value = self.__values.get(key, (now, None))
+            generation = self.__generation
+        return ((value,) if expiration > now else None), generation, now
+
+    def __keep(self, key: Hashable, value: T, generation: int, now: float) -> None:
+        with self.__lock:
+            # do not keep what was fetched before an invalidation
+            if generation == self.__generation:
+                self.__values[key] = (now + self.__ttl, value)
+
+
+class NessusResultCache:
+    """
+    on-disk cache of the results of finished scans, backed by sqlite so it can be shared between processes
+    a result is stored for a scan id, a history id and the `last_modification_date` of the scan, so it becomes invalid
+    as soon as the scan is modified, the older ones are then dropped
+    """
+
+    def __init__(self, path: str, max_size: Optional[int] = None, max_age: Optional[float] = None) -> None:
+        """
+        :param path: sqlite database to use, created if not existing
+        :param max_size: bytes of stored results after which the least recently used are evicted
+        :param max_age: seconds after which a stored result is evicted
+        """
+        self.__max_size = max_size
+        self.__max_age = max_age
+
+        self.__lock = Lock()
+        self.__db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.__db.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                scan_id INTEGER NOT NULL,
+                history_id INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                item TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (scan_id, history_id, kind, item)
+            )''')
+        self.__db.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+
+    def get_or_fetch(self, scan_id: int, history_id: Optional[int], version: int, kind: str, item: str,
+                     fetch: Callable[[], T]) -> T:
+        """
+        return the stored result, or fetch it and store it
+        :param scan_id: id of the scan
+        :param history_id: id of the history of the scan, None for the latest one
+        :param version: `last_modification_date` of the scan
+        :param kind: type of result (for example 'details')
+        :param item: what in the scan (for example the host id)
+        :param fetch: how to get the result if not stored
+        :return: the result
+        """
+        history_id = -1 if history_id is None else history_id
+
+        value = self.__get(scan_id, history_id, version, kind, item)
+        if value is not None:
+            return pickle.loads(value)
+
+        result = fetch()
+        self.__put(scan_id, history_id, version, kind, item, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        return result
+
+    async def get_or_fetch_async(self, scan_id: int, history_id: Optional[int], version: int, kind: str, item: str,
+                                 fetch: Callable[[], Awaitable[T]]) -> T:
+        """
+        as `get_or_fetch`, for a coroutine fetching the result (see `nessus.aio`)
+        sqlite is still asked in the event loop, which a local database answers quickly enough
+        """
+        history_id = -1 if history_id is None else history_id
+
+        value = self.__get(scan_id, history_id, version, kind, item)
+        if value is not None:
+            return pickle.loads(value)
+
+        result = await fetch()
+        self.__put(scan_id, history_id, version, kind, item, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        return result
+
+    def invalidate(self, scan_id: Optional[int] = None) -> None:
+        """
+        drop the stored results
+        :param scan_id: only drop the one of this scan
+        """
+        with self.__lock:
+            if scan_id is None:
+                self.__db.execute('DELETE FROM results')
+            else:
+                self.__db.execute('DELETE FROM results WHERE scan_id = ?', (scan_id,))
+
+    def close(self) -> None:
+        self.__db.close()
+
+    def __get(self, scan_id: int, history_id: int, version: int, kind: str, item: str) -> Optional[bytes]:
+        now = time()
+        with self.__lock:
+            row = self.__db.execute('SELECT version, value, created FROM results '
+                                    'WHERE scan_id = ? AND history_id = ? AND kind = ? AND item = ?',
+                                    (scan_id, history_id, kind, item)).fetchone()
+            if row is None:
+                return None
+
+            stored_version, value, created = row
+            if stored_version != version:
+                # the scan was modified, nothing stored for it is valid anymore
+                self.__db.execute('DELETE FROM results WHERE scan_id = ? AND version != ?', (scan_id, version))
+                return None
+
+            if self.__max_age is not None and created < now - self.__max_age:
+                self.__db.execute('DELETE FROM results WHERE created < ?', (now - self.__max_age,))
+                return None
+
+            self.__db.execute('UPDATE results SET accessed = ? '
+                              'WHERE scan_id = ? AND history_id = ? AND kind = ? AND item = ?',
+                              (now, scan_id, history_id, kind, item))
+            return value
+
+    def __put(self, scan_id: int, history_id: int, version: int, kind: str, item: str, value: bytes) -> None:
+        now = time()
+        with self.__lock:
+            self.__db.execute('DELETE FROM results WHERE scan_id = ? AND version != ?', (scan_id, version))
+            self.__db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                              (scan_id, history_id, version, kind, item, value, len(value), now, now))
+
+            if self.__max_size is None:
+                return
+
+            total, = self.__db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()
+            if total <= self.__max_size:
+                return
+
+            # drop the least recently used until we fit again
+            to_free = total - self.__max_size
+            for rowid, size in self.__db.execute('SELECT rowid, size FROM results ORDER BY accessed').fetchall():
+                if to_free <= 0:
+                    break
+                self.__db.execute('DELETE FROM results WHERE rowid = ?', (rowid,))
+                to_free -= size
@@ -0,0 +1,284 @@
+"""
+many nessus scanners seen as a single one, the scans are placed on the least loaded scanner and every call about a
+scan goes to the scanner owning it
+"""
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
+
+from typing import Iterable, Mapping, Optional, MutableMapping, Set, Callable, TypeVar, Any, Union, IO, Sequence
+
+from nessus import LibNessus
+from nessus.editor import NessusTemplateType
+from nessus.error import NessusError
+from nessus.scans import NessusScan, NessusScanCreated, NessusScanDetails, NessusScanHost, NessusScanHostDetails, \
+    NessusScanPluginOutputDetails, NessusScanExportFormat, TERMINAL_SCAN_STATUSES, NessusScanStatus
+from nessus.targets import shard_targets, normalize_targets
+
+T = TypeVar('T')
+
+
+class NessusClusterScan:
+    """
+    a scan of one of the scanners of the cluster, it has every attribute of the wrapped scan
+    the scan ids are only unique per scanner, so a scan is identified by its node and its id
+    """
+
+    __slots__ = ('node', 'scan')
+
+    def __init__(self, node: str, scan: Union[NessusScan, NessusScanCreated]) -> None:
+        """
+        :param node: name of the scanner owning the scan
+        :param scan: scan as given by this scanner
+        """
+        self.node = node
+        self.scan = scan
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('__') or name in self.__slots__:
+            # not set yet, as while unpickling
+            raise AttributeError(name)
+        return getattr(self.scan, name)
+
+    def __eq__(self, other):
+        return isinstance(other, NessusClusterScan) and (self.node, self.scan.id) == (other.node, other.scan.id)
+
+    def __hash__(self):
+        return hash((self.node, self.scan.id))
+
+    def __repr__(self) -> str:
+        return 'NessusClusterScan({!r}, {!r})'.format(self.node, self.scan)
+
+
+class LibNessusClusterScans:
+    """
+    as LibNessusScans, but for every scanner of the cluster
+    """
+
+    def __init__(self, nodes: Mapping[str, LibNessus]) -> None:
+        """
+        :param nodes: scanners, by name
+        """
+        self.__nodes = nodes
+
+        self.__lock = Lock()
+        # one placement at a time, so that a scan is counted before the next one is placed
+        self.__placement_lock = Lock()
+        # scans created through the cluster and not yet seen finished, to count them before nessus lists them running
+        self.__placed = {node: set() for node in nodes}  # type: MutableMapping[str, Set[int]]
+        # uuid given by `launch` -> node, to know where to wait for it
+        self.__launched = dict()  # type: MutableMapping[str, str]
+
+    def list(self) -> Iterable[NessusClusterScan]:
+        """
+        Returns the scans of every scanner, asked in parallel.
+        :return: iterable of the scans
+        """
+        return {NessusClusterScan(node, scan) for node, scans in self.__on_each(self.__list).items() for scan in scans}
+
+    def loads(self) -> Mapping[str, int]:
+        """
+        :return: number of scans running (or about to) on each scanner
+        """
+        listed = self.__on_each(self.__list)
+
+        with self.__lock:
+            loads = dict()
+            for node, scans in listed.items():
+                finished = {scan.id for scan in scans if scan.status in TERMINAL_SCAN_STATUSES}
+                running = {scan.id for scan in scans if scan.status not in TERMINAL_SCAN_STATUSES and
+                           scan.status is not NessusScanStatus.empty}
+                self.__placed[node] -= finished
+                loads[node] = len(running | self.__placed[node])
+            return loads
+
+    def create(self, policy_name: str, name: Optional[str] = None, template_name: Optional[str] = None,
+               default_targets: Iterable[str] = ('localhost',), node: Optional[str] = None) -> NessusClusterScan:
+        """
+        Creates a scan on the least loaded scanner.
+        the policies and templates have different ids on each scanner, so they are given by name
+        :param policy_name: name of the policy to use, it has to exist on every scanner
+        :param name: name you want for the scan
+        :param template_name: name of the scan template, as 'basic', taken from policy if not given
+        :param default_targets: need to have at least an element
+        :param node: scanner to use instead of the least loaded one
+        :return: created scan
+        """
+        if node is not None:
+            return self.__create_on(node, policy_name, name, template_name, default_targets)
+
+        with self.__placement_lock:
+            loads = self.loads()
+            node = min(loads, key=lambda n: (loads[n], n))
+            return self.__create_on(node, policy_name, name, template_name, default_targets)
+
+    def __create_on(self, node: str, policy_name: str, name: Optional[str], template_name: Optional[str],
+                    default_targets: Iterable[str]) -> NessusClusterScan:
+        nessus = self.__nodes[node]
+
+        policy = nessus.policies.policy_by_name(policy_name)
+        if policy is None:
+            raise NessusError('no policy named {!r} on {}'.format(policy_name, node))
+
+        template = None
+        if template_name is not None:
+            template = nessus.editor.template_by_name(NessusTemplateType.scan, template_name)
+            if template is None:
+                raise NessusError('no scan template named {!r} on {}'.format(template_name, node))
+
+        created = nessus.scans.create(policy, name=name, template=template, default_targets=default_targets)
+        with self.__lock:
+            self.__placed[node].add(created.id)
+        return NessusClusterScan(node, created)
+
+    def launch(self, scan: NessusClusterScan, alt_targets: Optional[Iterable[str]] = None) -> str:
+        """
+        Launches a scan on its scanner.
+        :param scan: the soon-to-be-launch
+        :param alt_targets: target to scan, if not given, default to the one set during scan creation
+        :return: uuid of the launched scan
+        """
+        scan_uuid = self.__nodes[scan.node].scans.launch(scan.scan, alt_targets=alt_targets)
+        with self.__lock:
+            self.__placed[scan.node].add(scan.scan.id)
+            self.__launched[scan_uuid] = scan.node
+        return scan_uuid
+
+    def delete(self, scan: NessusClusterScan) -> None:
+        """
+        Deletes a scan from its scanner.
+        :param scan: the soon-to-be-deleted
+        """
+        self.__nodes[scan.node].scans.delete(scan.scan)
+        with self.__lock:
+            self.__placed[scan.node].discard(scan.scan.id)
+
+    def wait(self, scan_uuid: str, **kwargs) -> NessusClusterScan:
+        """
+        Wait for a scan launched through the cluster to be in one of TERMINAL_SCAN_STATUSES.
+        :param scan_uuid: uuid given by `launch`
+        :param kwargs: as LibNessusScans.wait
+        :return: the scan in its final state
+        """
+        with self.__lock:
+            node = self.__launched[scan_uuid]
+
+        scan = self.__nodes[node].scans.wait(scan_uuid, **kwargs)
+        with self.__lock:
+            self.__placed[node].discard(scan.id)
+            self.__launched.pop(scan_uuid, None)
+        return NessusClusterScan(node, scan)
+
+    def details(self, scan: NessusClusterScan, history_id: Optional[int] = None,
+                lazy: bool = False) -> NessusScanDetails:
+        """
+        Returns details for the given scan, from its scanner.
+        """
+        return self.__nodes[scan.node].scans.details(scan.scan, history_id=history_id, lazy=lazy)
+
+    def host_details(self, scan: NessusClusterScan, host: NessusScanHost,
+                     history_id: Optional[int] = None) -> NessusScanHostDetails:
+        """
+        Returns details for the given host, from the scanner of the scan.
+        """
+        return self.__nodes[scan.node].scans.host_details(scan.scan, host, history_id=history_id)
+
+    def plugin_output(self, scan: NessusClusterScan, host: NessusScanHost, plugin_id: int,
+                      history_id: Optional[int] = None) -> NessusScanPluginOutputDetails:
+        """
+        Returns the output for a given plugin, from the scanner of the scan.
+        """
+        return self.__nodes[scan.node].scans.plugin_output(scan.scan, host, plugin_id, history_id=history_id)
+
+    def all_host_details(self, scan: NessusClusterScan, **kwargs):
+        """
+        as LibNessusScans.all_host_details, on the scanner of the scan
+        """
+        return self.__nodes[scan.node].scans.all_host_details(scan.scan, **kwargs)
+
+    def plugins_output(self, scan: NessusClusterScan, plugin_ids: Iterable[int], **kwargs):
+        """
+        as LibNessusScans.plugins_output, on the scanner of the scan
+        """
+        return self.__nodes[scan.node].scans.plugins_output(scan.scan, plugin_ids, **kwargs)
+
+    def export(self, scan: NessusClusterScan, destination: Union[str, IO[bytes]],
+               format: NessusScanExportFormat = NessusScanExportFormat.nessus, **kwargs) -> int:
+        """
+        as LibNessusScans.export, from the scanner of the scan
+        """
+        return self.__nodes[scan.node].scans.export(scan.scan, destination, format=format, **kwargs)
+
+    def create_sharded(self, policy_name: str, targets: Iterable[str], shards: int, name: Optional[str] = None,
+                       template_name: Optional[str] = None) -> Sequence[NessusClusterScan]:
+        """
+        as LibNessusScans.create_sharded, each shard being placed on the least loaded scanner at its creation
+        :param policy_name: name of the policy to use, it has to exist on every scanner
+        :param targets: every target to scan
+        :param shards: number of scans wanted, less are created if there is not enough hosts
+        :param name: name of the scans, suffixed by their position
+        :param template_name: name of the scan template, as 'basic', taken from policy if not given
+        :return: created scans, in the order of the targets
+        """
+        if name is None:
+            name = str(uuid4())
+
+        chunks = shard_targets(normalize_targets(targets), shards)
+        return [self.create(policy_name, name='{} [{}/{}]'.format(name, index, len(chunks)),
+                            template_name=template_name, default_targets=chunk)
+                for index, chunk in enumerate(chunks, start=1)]
+
+    def merged_details(self, scans: Iterable[NessusClusterScan]) -> NessusScanDetails:
+        """
+        as LibNessusScans.merged_details, each shard being asked to its scanner
+        """
+        scans = list(scans)
+        with ThreadPoolExecutor(max_workers=max(1, len(scans))) as executor:
+            return NessusScanDetails.merge(list(executor.map(self.details, scans)))
+
+    def run_sharded(self, policy_name: str, targets: Iterable[str], shards: int, name: Optional[str] = None,
+                    template_name: Optional[str] = None, timeout: Optional[float] = None,
+                    **kwargs) -> NessusScanDetails:
+        """
+        as LibNessusScans.run_sharded, the shards being spread over the scanners
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+
+        uuids = [self.launch(scan) for scan in self.create_sharded(policy_name, targets, shards, name, template_name)]
+        finished = [self.wait(scan_uuid, timeout=None if deadline is None else max(0, deadline - monotonic()),
+                              **kwargs)
+                    for scan_uuid in uuids]
+        return self.merged_details(finished)
+
+    @staticmethod
+    def __list(nessus: LibNessus) -> Iterable[NessusScan]:
+        return nessus.scans.list(incremental=True)
+
+    def __on_each(self, call: Callable[[LibNessus], T]) -> Mapping[str, T]:
+        """
+        call on every scanner in parallel
+        :return: result of each scanner, by name
+        """
+        with ThreadPoolExecutor(max_workers=len(self.__nodes)) as executor:
+            futures = {node: executor.submit(call, nessus) for node, nessus in self.__nodes.items()}
+        return {node: future.result() for node, future in futures.items()}
+
+
+class LibNessusCluster:
+    """
+    gather many scanners, for example: `cluster.scans.create('my policy')` places the scan on the least loaded one
+    the scanners are still reachable one by one in `nodes`
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, nodes: Union[Mapping[str, LibNessus], Iterable[LibNessus]]) -> None:
+        """
+        :param nodes: scanners, either by name or named after their 'host:port'
+        """
+        if not isinstance(nodes, Mapping):
+            nodes = {'{}:{}'.format(nessus.transport.host, nessus.transport.port): nessus for nessus in nodes}
+        assert nodes
+
+        self.nodes = dict(nodes)  # type: Mapping[str, LibNessus]
+        self.scans = LibNessusClusterScans(self.nodes)
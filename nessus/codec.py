@@ -0,0 +1,27 @@
+"""
+decoding of the json sent by nessus, with the fastest decoder installed (`pip install nessus[fast]`), as the details
+of a big scan are tens of megabytes
+"""
+from typing import Any
+
+try:
+    from orjson import loads
+    BACKEND = 'orjson'
+except ImportError:
+    try:
+        from ujson import loads
+        BACKEND = 'ujson'
+    except ImportError:
+        from json import loads
+        BACKEND = 'json'
+
+
+def decode(content: bytes) -> Any:
+    """
+    :param content: body of a response from nessus
+    :return: decoded json, None for an empty body
+    """
+    # `loads` is looked up on each call, so that it can be replaced
+    if not content:
+        return None
+    return loads(content)
@@ -1,9 +1,11 @@
 from enum import Enum
 
-from typing import Mapping, Union, Iterable
+from typing import Mapping, Iterable, Optional, Any
 
 from nessus.base import LibNessusBase
-from nessus.model import lying_exist, Object
+from nessus.cache import NessusTtlCache
+from nessus.model import Object, Field, LyingExist
+from nessus.transport import NessusTransport
 
 
 class NessusTemplate(Object):
@@ -12,6 +14,8 @@ class NessusTemplate(Object):
      - `description` which is not always there
     """
 
+    __slots__ = ('uuid', 'name', 'title', 'description', 'cloud_only', 'subscription_only', 'is_agent', 'more_info')
+
     def __init__(self, uuid: str, name: str, title: str, description: str, cloud_only: bool, subscription_only: bool,
                  is_agent: bool, more_info: str) -> None:
         self.uuid = uuid
@@ -29,18 +33,11 @@ class NessusTemplate(Object):
     def __hash__(self):
         return hash(self.uuid)
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusTemplate':
-        uuid = str(json_dict['uuid'])
-        name = str(json_dict['name'])
-        title = str(json_dict['title'])
-        description = lying_exist(json_dict, 'description', str)
-        cloud_only = bool(json_dict['cloud_only'])
-        subscription_only = bool(json_dict['subscription_only'])
-        is_agent = bool(json_dict['is_agent'])
-        more_info = lying_exist(json_dict, 'more_info', str)
-
-        return NessusTemplate(uuid, name, title, description, cloud_only, subscription_only, is_agent, more_info)
+    _json_fields = (
+        Field('uuid', str), Field('name', str), Field('title', str), LyingExist('description', str),
+        Field('cloud_only', bool), Field('subscription_only', bool), Field('is_agent', bool),
+        LyingExist('more_info', str),
+    )
 
 
 class NessusTemplateType(Enum):
@@ -48,9 +45,49 @@ class NessusTemplateType(Enum):
     policy = 'policy'
 
 
-class LibNessusEditor(LibNessusBase):
+class LibNessusEditorRequests:
+    """
+    what is sent to nessus about the templates, shared by LibNessusEditor and its asyncio flavour (see `nessus.aio`)
+    """
+
+    @staticmethod
+    def _templates_path(template_type: NessusTemplateType) -> str:
+        return 'editor/{type}/templates'.format(type=template_type.value)
+
+    @staticmethod
+    def _templates_by_name(json: Mapping[str, Any]) -> Mapping[str, NessusTemplate]:
+        return {t.name: t for t in (NessusTemplate.from_json(t) for t in json['templates'])}
+
+
+class LibNessusEditor(LibNessusBase, LibNessusEditorRequests):
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str,
+                 transport: Optional[NessusTransport] = None, cache_ttl: float = 0) -> None:
+        """
+        :param cache_ttl: seconds to keep the templates before asking them again, nothing is kept if not positive
+        """
+        super().__init__(host, port, api_access_key, api_secret_key, transport)
+
+        self.__templates = NessusTtlCache(cache_ttl)  # type: NessusTtlCache[Mapping[str, NessusTemplate]]
+
     def list(self, template_type: NessusTemplateType) -> Iterable[NessusTemplate]:
-        url = 'editor/{type}/templates'.format(type=template_type.value)
-        ans = self._get(url)
+        return set(self.__templates_by_name(template_type).values())
+
+    def template_by_name(self, template_type: NessusTemplateType, name: str) -> Optional[NessusTemplate]:
+        """
+        :param template_type: type of the template
+        :param name: name of the template, as 'discovery' or 'basic'
+        :return: the template or None if there is none with this name
+        """
+        return self.__templates_by_name(template_type).get(name)
+
+    def invalidate(self) -> None:
+        """
+        forget the kept templates
+        """
+        self.__templates.invalidate()
+
+    def __templates_by_name(self, template_type: NessusTemplateType) -> Mapping[str, NessusTemplate]:
+        def fetch() -> Mapping[str, NessusTemplate]:
+            return self._templates_by_name(self._get(self._templates_path(template_type)))
 
-        return {NessusTemplate.from_json(t) for t in ans.json()['templates']}
+        return self.__templates.get_or_fetch(template_type, fetch)
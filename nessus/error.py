@@ -1,7 +1,12 @@
 """
 error generated from nessus, everything derive from NessusError
 """
+import re
+
 import requests
+from typing import Optional, Type, MutableMapping, Pattern, List, Tuple
+
+from nessus.codec import decode
 
 
 class NessusError(Exception):
@@ -11,13 +16,15 @@ class NessusError(Exception):
 
 
 class NessusNetworkError(NessusError):
-    def __init__(self, response: requests.Response) -> None:
+    def __init__(self, response: requests.Response, error: Optional[str] = None) -> None:
         """
         wrap some useful information
         :param response: response we got from nessus, in which there _must_ be json with an 'error' field
+        :param error: the 'error' field, if already decoded
         """
-        assert 'error' in response.json()
-        super().__init__(response.json()['error'])
+        if error is None:
+            error = decode(response.content)['error']
+        super().__init__(error)
         self.response = response
 
 
@@ -50,8 +57,9 @@ class NessusPolicyInUseError(NessusNetworkError):
     policy in use (usually when wanting to delete it)
     """
 
-    def __init__(self, response: requests.Response, policy_name: str, policy_id: int) -> None:
-        super().__init__(response)
+    def __init__(self, response: requests.Response, policy_name: str, policy_id: int,
+                 error: Optional[str] = None) -> None:
+        super().__init__(response, error)
         self.policy_name = policy_name
         self.policy_id = policy_id
 
@@ -61,6 +69,126 @@ class NessusDuplicateFilenameLimitError(NessusNetworkError):
     if you upload to much file with the same filename, it will fail
     """
 
-    def __init__(self, response: requests.Response, filename: int) -> None:
-        super().__init__(response)
+    def __init__(self, response: requests.Response, filename: int, error: Optional[str] = None) -> None:
+        super().__init__(response, error)
         self.filename = filename
+
+
+class NessusTimeoutError(NessusError):
+    """
+    waited too long for nessus to reach the wanted state
+    """
+    pass
+
+
+class NessusCircuitOpenError(NessusError):
+    """
+    the scanner failed too many times in a row, requests are refused without being sent for a while
+    """
+
+    def __init__(self, retry_in: float) -> None:
+        """
+        :param retry_in: seconds before a request is let through again
+        """
+        super().__init__('scanner considered down, retry in {:.1f}s'.format(retry_in))
+        self.retry_in = retry_in
+
+
+# 'error' field -> exception, for the messages which are always the same
+__by_message = dict()  # type: MutableMapping[str, Type[NessusNetworkError]]
+# (pattern, exception) in order of registration, the groups of the pattern are given to the exception
+__by_pattern = list()  # type: List[Tuple[str, Type[NessusNetworkError]]]
+# every pattern merged in a single regex, with the group index and the exception of each alternative
+__merged = None, dict()  # type: Tuple[Optional[Pattern], MutableMapping[int, Tuple[int, Type[NessusNetworkError]]]]
+
+
+def register_network_error(error: Type[NessusNetworkError], message: Optional[str] = None,
+                           pattern: Optional[str] = None) -> None:
+    """
+    raise the given error when the 'error' field of a failed response is the given message or matches the given
+    pattern, it is created with the response, then the groups of the pattern, then the message as `error`
+    :param error: exception to raise
+    :param message: exact 'error' field
+    :param pattern: regex matching the start of the 'error' field, tried in order of registration, it is merged
+                    with the others so it can not use backreferences
+    """
+    global __merged
+
+    assert (message is None) != (pattern is None)
+
+    if message is not None:
+        __by_message[message] = error
+        return
+
+    __by_pattern.append((pattern, error))
+    __merged = __merge(__by_pattern)
+
+
+def unregister_network_error(error: Type[NessusNetworkError]) -> None:
+    """
+    stop raising the given error, for every message and pattern it was registered with
+    :param error: exception given to `register_network_error`
+    """
+    global __merged
+
+    for message in [m for m, registered in __by_message.items() if registered is error]:
+        del __by_message[message]
+
+    __by_pattern[:] = [(p, registered) for p, registered in __by_pattern if registered is not error]
+    __merged = __merge(__by_pattern)
+
+
+def __merge(by_pattern: List[Tuple[str, Type[NessusNetworkError]]]) \
+        -> Tuple[Optional[Pattern], MutableMapping[int, Tuple[int, Type[NessusNetworkError]]]]:
+    """
+    :return: every pattern merged in a single regex, with the group index and the exception of each alternative
+    """
+    if not by_pattern:
+        return None, dict()
+
+    alternatives = list()
+    groups = dict()
+    index = 1
+    for registered, registered_error in by_pattern:
+        alternatives.append('({})'.format(registered))
+        groups[index] = (re.compile(registered).groups, registered_error)
+        index += 1 + groups[index][0]
+    return re.compile('|'.join(alternatives)), groups
+
+
+def network_error(response: requests.Response) -> NessusError:
+    """
+    find the error matching a failed response, the body is decoded only once
+    :param response: response got from nessus
+    :return: the exception to raise
+    """
+    try:
+        json = decode(response.content) if response.content.startswith(b'{') else None
+    except ValueError:
+        json = None
+    if not isinstance(json, dict) or 'error' not in json:
+        return NessusWeirdNetworkError(response=response)
+
+    error_str = json['error']
+
+    error = __by_message.get(error_str)
+    if error is not None:
+        return error(response, error=error_str)
+
+    regex, groups = __merged
+    match = regex and regex.match(error_str)
+    if match:
+        # the alternative closes after its own groups, so it is the last matched one
+        count, error = groups[match.lastindex]
+        args = match.groups()[match.lastindex:match.lastindex + count]
+        return error(response, *args, error=error_str)
+
+    return NessusNetworkError(response=response, error=error_str)
+
+
+register_network_error(NessusInternalServerError, message='An internal server error occurred')
+register_network_error(NessusScanIsActiveError, message='Can not delete an active scan')
+register_network_error(NessusPolicyInUseError, pattern=r'Policy "([^"]+)" \(ID (\d+)\) cannot be deleted since it is '
+                                                       r'currently used by one or more scans.')
+register_network_error(NessusDuplicateFilenameLimitError,
+                       pattern=r"could not upload file '([^']+)': duplicate filename limit exceeded")
@@ -1,5 +1,7 @@
 from uuid import uuid4
 
+from typing import IO, Mapping, Tuple
+
 from nessus.base import LibNessusBase
 
 
@@ -13,7 +15,20 @@ class NessusRemoteFile:
         self.name = name
 
 
-class LibNessusFile(LibNessusBase):
+class LibNessusFileRequests:
+    """
+    what is sent to nessus about the files, shared by LibNessusFile and its asyncio flavour (see `nessus.aio`)
+    """
+
+    @staticmethod
+    def _upload_files(io: IO[bytes]) -> Mapping[str, Tuple[str, IO[bytes]]]:
+        """
+        ~lies: the data field name 'Filedata' is not documented in Nessus
+        """
+        return {'Filedata': (str(uuid4()), io)}
+
+
+class LibNessusFile(LibNessusBase, LibNessusFileRequests):
     def upload(self, nessus_file: NessusFile) -> NessusRemoteFile:
         """
         Uploads a file.
@@ -22,10 +37,7 @@ class LibNessusFile(LibNessusBase):
         :return: the filename on nessus
         """
         with open(nessus_file.path, 'rb') as io:
-            filename = str(uuid4())
-            files = {'Filedata': (filename, io)}
-
-            ans = self._post(path='file/upload', files=files)
+            json = self._post(path='file/upload', files=self._upload_files(io))
 
-            filename = ans.json()['fileuploaded']
+            filename = json['fileuploaded']
             return NessusRemoteFile(filename)
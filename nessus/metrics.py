@@ -0,0 +1,290 @@
+"""
+instrumentation of the requests sent to nessus, to see where the time goes: a `NessusRequestHook` given to the transport
+is told about every request, `NessusMetricsCollector` keeps latency histograms per endpoint of each scanner
+"""
+from bisect import bisect_left
+from threading import Lock
+
+from typing import Optional, Sequence, MutableMapping, Tuple, List
+
+from nessus.model import Object
+
+# name of the id following a collection in a path, the others are named `id`
+_IDS = {
+    'scans': 'scan_id',
+    'hosts': 'host_id',
+    'plugins': 'plugin_id',
+    'policies': 'policy_id',
+    'export': 'file_id',
+    'folders': 'folder_id',
+    'history': 'history_id',
+    'tokens': 'token',
+}
+
+
+def endpoint(path: str) -> str:
+    """
+    :param path: path in nessus, as 'scans/12/hosts/3?history_id=4'
+    :return: path with the ids replaced by their name, as 'scans/{scan_id}/hosts/{host_id}'
+    """
+    segments = path.split('?', 1)[0].split('/')
+    for index in range(1, len(segments)):
+        previous = segments[index - 1]
+        if segments[index].isdigit() or previous == 'tokens':
+            segments[index] = '{' + _IDS.get(previous, 'id') + '}'
+    return '/'.join(segments)
+
+
+class NessusRequestEvent(Object):
+    """
+    what happened to a request sent to nessus, each retry being a request on its own
+    """
+
+    __slots__ = ('scanner', 'method', 'endpoint', 'status', 'size', 'network_time', 'decode_time', 'attempt', 'error')
+
+    def __init__(self, scanner: str, method: str, endpoint: str, status: Optional[int], size: int,
+                 network_time: float, decode_time: float, attempt: int = 0, error: Optional[str] = None) -> None:
+        """
+        :param scanner: 'host:port' of the scanner
+        :param method: http method used
+        :param endpoint: path of the request, with the ids replaced by their name (see `endpoint`)
+        :param status: http status of the response, None if there was no response (as for a connection error)
+        :param size: bytes in the body of the response, from the Content-Length of a streamed response
+        :param network_time: seconds from sending the request to getting the whole response, without the wait for the
+                             rate limiter
+        :param decode_time: seconds spent decoding the json of the response, 0 if not decoded
+        :param attempt: 0 for the first try of the request, then the number of the retry
+        :param error: class name of the error raised for the request (as 'NessusInternalServerError'), if any
+        """
+        self.scanner = scanner
+        self.method = method
+        self.endpoint = endpoint
+        self.status = status
+        self.size = size
+        self.network_time = network_time
+        self.decode_time = decode_time
+        self.attempt = attempt
+        self.error = error
+
+
+class NessusRequestHook:
+    """
+    told about every request sent through the transports it is given to, from the threads (or the event loop) sending
+    them, so it has to be quick and thread safe
+    """
+
+    def on_send(self, scanner: str, method: str, endpoint: str) -> None:
+        """
+        the request is about to be sent, possibly after waiting for the rate limiter, `on_request` is called once it
+        is done, whatever happened
+        """
+
+    def on_request(self, event: NessusRequestEvent) -> None:
+        """
+        the request is done, or was refused without being sent (as by an open circuit breaker)
+        """
+
+
+class NessusLatencyHistogram:
+    """
+    count of the observed seconds falling in each bucket, the quantiles are estimated from them
+    not thread safe, `NessusMetricsCollector` is locking around it
+    """
+
+    # from a local scanner answering from memory to the details of a huge scan
+    DEFAULT_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BOUNDS) -> None:
+        """
+        :param bounds: upper bound (included) of each bucket, a last one takes what is greater
+        """
+        self.bounds = tuple(sorted(bounds))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None  # type: Optional[float]
+        self.max = None  # type: Optional[float]
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def copy(self) -> 'NessusLatencyHistogram':
+        copy = NessusLatencyHistogram(self.bounds)
+        copy.counts = list(self.counts)
+        copy.count, copy.sum, copy.min, copy.max = self.count, self.sum, self.min, self.max
+        return copy
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        :param q: between 0 and 1, as 0.95
+        :return: estimated value below which `q` of the observed ones are, linearly placed in their bucket, None if
+                 nothing was observed
+        """
+        assert 0 <= q <= 1
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.bounds[index - 1] if index > 0 else 0.0
+                high = self.bounds[index] if index < len(self.bounds) else self.max
+                value = low + (high - low) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+
+class NessusEndpointSummary(Object):
+    """
+    requests to an endpoint of a scanner, the times are in seconds
+    """
+
+    __slots__ = (
+        'scanner', 'method', 'endpoint', 'count', 'errors', 'size', 'network_time', 'decode_time', 'p50', 'p95', 'p99',
+        'max',
+    )
+
+    def __init__(self, scanner: str, method: str, endpoint: str, count: int, errors: int, size: int,
+                 network_time: float, decode_time: float, p50: float, p95: float, p99: float, max: float) -> None:
+        """
+        :param count: number of requests
+        :param errors: number of requests without a 200 response
+        :param size: bytes received
+        :param network_time: total time on the network
+        :param decode_time: total time decoding the json
+        :param p50: median time on the network
+        :param p95: 95th percentile of the time on the network
+        :param p99: 99th percentile of the time on the network
+        :param max: slowest time on the network
+        """
+        # pylint: disable=redefined-builtin
+        self.scanner = scanner
+        self.method = method
+        self.endpoint = endpoint
+        self.count = count
+        self.errors = errors
+        self.size = size
+        self.network_time = network_time
+        self.decode_time = decode_time
+        self.p50 = p50
+        self.p95 = p95
+        self.p99 = p99
+        self.max = max
+
+
+class NessusEndpointStats:
+    """
+    what is known of the requests to an endpoint of a scanner
+    """
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.network_time = NessusLatencyHistogram(bounds)
+        self.decode_time = NessusLatencyHistogram(bounds)
+        self.errors = 0
+        # number of errors, by class name
+        self.errors_by_type = dict()  # type: MutableMapping[str, int]
+        self.retries = 0
+        self.size = 0
+        self.in_flight = 0
+
+    def observe(self, event: NessusRequestEvent) -> None:
+        self.network_time.observe(event.network_time)
+        self.decode_time.observe(event.decode_time)
+        self.errors += event.status != 200
+        if event.error is not None:
+            self.errors_by_type[event.error] = self.errors_by_type.get(event.error, 0) + 1
+        self.retries += event.attempt > 0
+        self.size += event.size
+
+    def copy(self) -> 'NessusEndpointStats':
+        copy = NessusEndpointStats(self.network_time.bounds)
+        copy.network_time, copy.decode_time = self.network_time.copy(), self.decode_time.copy()
+        copy.errors, copy.errors_by_type = self.errors, dict(self.errors_by_type)
+        copy.retries, copy.size, copy.in_flight = self.retries, self.size, self.in_flight
+        return copy
+
+
+class NessusMetricsCollector(NessusRequestHook):
+    """
+    keeps in memory the histograms of the network and decoding times of the requests, per endpoint of each scanner,
+    for example: `LibNessus(..., hooks=[collector])` then `print(collector.report())`
+    """
+
+    def __init__(self, bounds: Sequence[float] = NessusLatencyHistogram.DEFAULT_BOUNDS) -> None:
+        """
+        :param bounds: upper bound of each bucket of the histograms, in seconds
+        """
+        self.bounds = tuple(bounds)
+
+        self.__lock = Lock()
+        self.__stats = dict()  # type: MutableMapping[Tuple[str, str, str], NessusEndpointStats]
+
+    def on_send(self, scanner: str, method: str, endpoint: str) -> None:
+        with self.__lock:
+            self.__endpoint_stats(scanner, method, endpoint).in_flight += 1
+
+    def on_request(self, event: NessusRequestEvent) -> None:
+        with self.__lock:
+            stats = self.__endpoint_stats(event.scanner, event.method, event.endpoint)
+            stats.in_flight = max(0, stats.in_flight - 1)
+            stats.observe(event)
+
+    def __endpoint_stats(self, scanner: str, method: str, path: str) -> NessusEndpointStats:
+        stats = self.__stats.get((scanner, method, path))
+        if stats is None:
+            stats = self.__stats[(scanner, method, path)] = NessusEndpointStats(self.bounds)
+        return stats
+
+    def stats(self) -> MutableMapping[Tuple[str, str, str], NessusEndpointStats]:
+        """
+        :return: copy of the stats, by (scanner, method, endpoint), to be read without blocking the requests
+        """
+        with self.__lock:
+            return {key: stats.copy() for key, stats in self.__stats.items()}
+
+    def summary(self) -> List[NessusEndpointSummary]:
+        """
+        :return: summary of every endpoint of every scanner, the ones taking the most time in total first
+        """
+        summaries = [
+            NessusEndpointSummary(scanner, method, path, stats.network_time.count, stats.errors, stats.size,
+                                  stats.network_time.sum, stats.decode_time.sum, stats.network_time.quantile(0.5),
+                                  stats.network_time.quantile(0.95), stats.network_time.quantile(0.99),
+                                  stats.network_time.max)
+            for (scanner, method, path), stats in self.stats().items() if stats.network_time.count
+        ]
+        summaries.sort(key=lambda summary: summary.network_time + summary.decode_time, reverse=True)
+        return summaries
+
+    def report(self) -> str:
+        """
+        :return: `summary` as a table, in milliseconds
+        """
+        lines = ['{:<24} {:<6} {:<48} {:>7} {:>6} {:>12} {:>10} {:>10} {:>9} {:>9} {:>9} {:>9}'.format(
+            'scanner', 'method', 'endpoint', 'count', 'errors', 'bytes', 'network', 'decode', 'p50', 'p95', 'p99',
+            'max')]
+        for summary in self.summary():
+            lines.append('{:<24} {:<6} {:<48} {:>7} {:>6} {:>12} {:>10.1f} {:>10.1f} {:>9.1f} {:>9.1f} {:>9.1f} '
+                         '{:>9.1f}'.format(summary.scanner, summary.method, summary.endpoint, summary.count,
+                                           summary.errors, summary.size, summary.network_time * 1000,
+                                           summary.decode_time * 1000, summary.p50 * 1000, summary.p95 * 1000,
+                                           summary.p99 * 1000, summary.max * 1000))
+        return '\n'.join(lines)
+
+    def reset(self) -> None:
+        """
+        forget everything collected so far, but the requests in flight
+        """
+        with self.__lock:
+            for key, stats in list(self.__stats.items()):
+                if stats.in_flight:
+                    self.__stats[key] = NessusEndpointStats(self.bounds)
+                    self.__stats[key].in_flight = stats.in_flight
+                else:
+                    del self.__stats[key]
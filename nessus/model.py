@@ -2,9 +2,13 @@
 dear Nessus dev, if you want to see where there is issues with your REST API, please modify `lying_type` and
 `lying_exist` to become NOP
 """
+import ast
 import functools
+import inspect
+import textwrap
+from operator import attrgetter
 
-from typing import TypeVar, Mapping, Union, Callable, Any, Optional
+from typing import TypeVar, Mapping, Union, Callable, Any, Optional, Tuple, MutableMapping, Sequence
 
 T = TypeVar('T')
 U = TypeVar('U')
@@ -14,28 +18,71 @@ JsonType = Union[int, str, bool]
 
 
 class Object:
+    """
+    base of the models, they are using `__slots__` to not have a `__dict__` per instance, as there can be millions of
+    them in memory (on 1M NessusScanHostVulnerability, it goes from 160 to 112 bytes per instance)
+    a model declaring `_json_fields` (a `Field` per arg of its `__init__`, in order) gets a generated `from_json`,
+    setting the slots directly when `__init__` only stores its args
+    """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if '_json_fields' in cls.__dict__:
+            cls.from_json = staticmethod(generate_from_json(cls, cls.__dict__['_json_fields']))
+
+    # per class (repr template, attributes matching the init args, getter of their values), computed on first use
+    __layouts = dict()  # type: MutableMapping[type, Tuple[str, Tuple[str, ...], Callable]]
+
     def __repr__(self) -> str:
         """
-        more magic, we want a generic way to repr a model, so we take the current values of self and the args to the
-        init function and try to match them together
+        more magic, we want a generic way to repr a model, so we take the args to the init function and match them to
+        the attributes of self, it is done once per class
         :return: repr of the model
         """
-        classname = self.__class__.__name__
-        init = getattr(self, '__init__')
-        args = init.__code__.co_varnames[1:]
-        args_str = ['{{{}!r}}'.format(a) for a in args]
+        template, _, getter = self.__layout()
+        return template.format(*getter(self))
+
+    def to_dict(self) -> Mapping[str, Any]:
+        """
+        shallow serialization, nested models are not converted
+        :return: attributes of the model, by name
+        """
+        _, attributes, getter = self.__layout()
+        return dict(zip(attributes, getter(self)))
+
+    def __layout(self) -> Tuple[str, Tuple[str, ...], Callable[['Object'], Tuple]]:
+        cls = type(self)
+        layout = Object.__layouts.get(cls)
+        if layout is None:
+            layout = Object.__layouts[cls] = Object.__compute_layout(self)
+        return layout
 
-        ret = '{classname}({args})'.format(classname=classname, args=', '.join(args_str))
+    @staticmethod
+    def __compute_layout(instance: 'Object') -> Tuple[str, Tuple[str, ...], Callable[['Object'], Tuple]]:
+        cls = type(instance)
+        init = getattr(cls, '__init__')
+        args = init.__code__.co_varnames[1:init.__code__.co_argcount]
 
-        values = dict()
-        for k, v in self.__dict__.items():
-            if k in args:
-                real_key = k
+        names = [name for klass in cls.__mro__ for name in klass.__dict__.get('__slots__', ())]
+        names.extend(getattr(instance, '__dict__', {}))
+
+        # an arg is stored either as is or without its prefix (`scan_id` -> `id`)
+        attributes = list()
+        for arg in args:
+            if arg in names:
+                attributes.append(arg)
             else:
-                real_key = next(arg for arg in args if arg.endswith(k))
-            values[real_key] = v
+                attributes.append(max((name for name in names if arg.endswith(name)), key=len))
+
+        template = '{}({})'.format(cls.__name__, ', '.join('{!r}' for _ in args))
+        if len(attributes) == 1:
+            attribute = attributes[0]
+            getter = lambda obj: (getattr(obj, attribute),)
+        else:
+            getter = attrgetter(*attributes)
 
-        return ret.format(**values)
+        return template, tuple(attributes), getter
 
 
 def lying_type(value: U, excepted_type: Callable[[U], Any], actual_type: Callable[[U], T] = lambda x: x,
@@ -106,3 +153,241 @@ def lying_exist(json_dict: Mapping[str, JsonType], excepted_name: str, excepted_
         return to_call(json_dict[excepted_name])
     else:
         return to_call()
+
+
+class Field:
+    """
+    a value to take from the json, the NOP of the lies: `excepted_type(json_dict[excepted_name])`
+    the field only generates the python expression doing it, so that a whole `from_json` is a single function
+    """
+
+    def __init__(self, excepted_name: str, excepted_type: Callable[[Any], T] = None) -> None:
+        """
+        :param excepted_name: key of the value in the json
+        :param excepted_type: how to convert the value, taken as is if not given
+        """
+        self.excepted_name = excepted_name
+        self.excepted_type = excepted_type
+
+    # conversions giving back the value itself when it already is of their type, as the json mostly has the right
+    # types, the call (costing more than the whole rest of a field) is only made when it is not
+    _IDENTITIES = (int, str, float, bool)
+
+    # the value is always read, so it can be read once into a local of the generated function (see `expression`)
+    _bindable = True
+
+    def expression(self, namespace: MutableMapping[str, Any], value: Optional[str] = None) -> str:
+        """
+        :param namespace: globals of the generated function, where to add what the expression is using
+        :param value: local holding `json_dict[excepted_name]`, only given if `_bindable`
+        :return: python expression reading the value from `json_dict`
+        """
+        return self._convert_value(namespace, self.excepted_type, value)
+
+    def _value(self) -> str:
+        return 'json_dict[{!r}]'.format(self.excepted_name)
+
+    def _convert_value(self, namespace: MutableMapping[str, Any], function: Optional[Callable],
+                       value: Optional[str] = None) -> str:
+        if value is None:
+            value = self._value()
+        if any(function is identity for identity in Field._IDENTITIES):
+            name = self._name(namespace, function)
+            return '({0} if {0}.__class__ is {1} else {1}({0}))'.format(value, name)
+        return self._convert(namespace, function, value)
+
+    def _missing(self) -> str:
+        return '{!r} not in json_dict'.format(self.excepted_name)
+
+    @staticmethod
+    def _convert(namespace: MutableMapping[str, Any], function: Optional[Callable], *args: str) -> str:
+        if function is None:
+            return args[0]
+        return '{}({})'.format(Field._name(namespace, function), ', '.join(args))
+
+    @staticmethod
+    def _name(namespace: MutableMapping[str, Any], value: Any) -> str:
+        name = '_{}'.format(len(namespace))
+        namespace[name] = value
+        return name
+
+
+class LyingType(Field):
+    """
+    as `lying_type`: the value is not of the excepted type, `actual_type` is used instead
+    """
+
+    def __init__(self, excepted_name: str, excepted_type: Callable[[Any], T],
+                 actual_type: Callable[[Any], U] = None) -> None:
+        super().__init__(excepted_name, excepted_type)
+        self.actual_type = actual_type
+
+    def expression(self, namespace: MutableMapping[str, Any], value: Optional[str] = None) -> str:
+        return self._convert_value(namespace, self.actual_type, value)
+
+
+class LyingExist(Field):
+    """
+    as `lying_exist`: the key may not be there, then `default` is used or `excepted_type()` if not given
+    """
+
+    _bindable = False
+
+    def __init__(self, excepted_name: str, excepted_type: Callable[[Any], T], default: U = ...) -> None:
+        super().__init__(excepted_name, excepted_type)
+        self.default = default
+
+    def expression(self, namespace: MutableMapping[str, Any]) -> str:
+        if self.default is ...:
+            default = self._convert(namespace, self.excepted_type)
+        else:
+            default = self._name(namespace, self.default)
+        return '({} if {} else {})'.format(default, self._missing(), super().expression(namespace))
+
+
+class AllowToExist(LyingExist):
+    """
+    as `allow_to_exist`: the key may not be there, then it is None
+    """
+
+    def __init__(self, excepted_name: str, excepted_type: Callable[[Any], T]) -> None:
+        super().__init__(excepted_name, excepted_type, None)
+
+
+class LyingExistAndType(LyingExist):
+    """
+    as `lying_exist_and_type`: the key may not be there, then it is `default`, and if there, `actual_type` is used
+    """
+
+    def __init__(self, excepted_name: str, excepted_type: Callable[[Any], T], actual_type: Callable[[Any], U],
+                 default: Optional[U] = None) -> None:
+        super().__init__(excepted_name, excepted_type, default)
+        self.actual_type = actual_type
+
+    def expression(self, namespace: MutableMapping[str, Any]) -> str:
+        value = self._convert_value(namespace, self.actual_type)
+        return '({} if {} else {})'.format(self._name(namespace, self.default), self._missing(), value)
+
+
+class SetOf(Field):
+    """
+    set of models, built from the iterable given by an other field
+    """
+
+    _bindable = False
+
+    def __init__(self, element_type: Callable[[Any], T], field: Field) -> None:
+        super().__init__(field.excepted_name, element_type)
+        self.field = field
+
+    def expression(self, namespace: MutableMapping[str, Any]) -> str:
+        return '{{{} for element in {}}}'.format(self._convert(namespace, self.excepted_type, 'element'),
+                                                 self.field.expression(namespace))
+
+
+def generate_from_json(cls: type, fields: Sequence[Field]) -> Callable[[Mapping[str, Any]], Any]:
+    """
+    write and compile the `from_json` of a model, as `code_gen.awk` would have done it by hand
+    :param cls: model to build
+    :param fields: one per arg of `cls.__init__`, in order
+    :return: function taking the json and returning the model
+    """
+    namespace = {'cls': cls, 'new': object.__new__}
+    attributes = __stored_args(cls)
+    if attributes is None or len(attributes) != len(fields):
+        args = ',\n        '.join(field.expression(namespace) for field in fields)
+        source = 'def from_json(json_dict):\n    return cls(\n        {})\n'.format(args)
+        return __compile('{}.from_json'.format(cls.__qualname__), source, namespace)
+
+    # `__init__` only stores its args, so it is skipped and the slots are set directly, each value read once
+    lines = ['def from_json(json_dict):', '    self = new(cls)']
+    for attribute, field in zip(attributes, fields):
+        if field._bindable:  # pylint: disable=protected-access
+            lines.append('    value = json_dict[{!r}]'.format(field.excepted_name))
+            lines.append('    self.{} = {}'.format(attribute, field.expression(namespace, 'value')))
+        else:
+            lines.append('    self.{} = {}'.format(attribute, field.expression(namespace)))
+    lines.append('    return self\n')
+
+    return __compile('{}.from_json'.format(cls.__qualname__), '\n'.join(lines), namespace)
+
+
+def __stored_args(cls: type) -> Optional[Sequence[str]]:
+    """
+    :return: the attributes set by `cls.__init__` if it only does `self.attribute = arg` for each of its args, in
+             order, else None
+    """
+    if cls.__new__ is not object.__new__:
+        return None
+    try:
+        source = textwrap.dedent(inspect.getsource(getattr(cls, '__init__')))
+    except (OSError, TypeError):
+        return None
+
+    function = ast.parse(source).body[0]
+    args = [arg.arg for arg in function.args.args]
+    body = function.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+        body = body[1:]
+
+    attributes, stored = list(), list()
+    for statement in body:
+        if not isinstance(statement, ast.Assign) or len(statement.targets) != 1:
+            return None
+        target, value = statement.targets[0], statement.value
+        if not isinstance(target, ast.Attribute) or not isinstance(target.value, ast.Name) or \
+                target.value.id != args[0] or not isinstance(value, ast.Name):
+            return None
+        attributes.append(target.attr)
+        stored.append(value.id)
+
+    if stored != args[1:] or function.args.vararg or function.args.kwarg or function.args.kwonlyargs:
+        return None
+    return attributes
+
+
+def generate_parser(cls: type, name: str, field: Field) -> Callable[[Mapping[str, Any]], Any]:
+    """
+    write and compile the parser of a single field of a model, to build it separately from the others
+    :param cls: model having the field
+    :param name: name of the field in the model
+    :param field: how to read it
+    :return: function taking the json of the model and returning the field
+    """
+    namespace = dict()
+    source = 'def from_json(json_dict):\n    return {}\n'.format(field.expression(namespace))
+
+    return __compile('{}.{}.from_json'.format(cls.__qualname__, name), source, namespace)
+
+
+def __compile(qualname: str, source: str, namespace: MutableMapping[str, Any]) -> Callable[[Mapping[str, Any]], Any]:
+    exec(compile(source, '<{}>'.format(qualname), 'exec'), namespace)  # pylint: disable=exec-used
+
+    function = namespace['from_json']
+    function.__qualname__ = qualname
+    function.__doc__ = 'generated parser of {}\n{}'.format(qualname, source)
+    return function
+
+
+def lazy_field(cls: type, name: str) -> property:
+    """
+    property parsing a field of a model on first access, from the json kept in `self.json`, then stored in the slot
+    of the model, so it is parsed only once
+    :param cls: model declaring the field in its `_json_fields` and its `__slots__`
+    :param name: arg of `cls.__init__` stored in the slot of the same name
+    :return: property to put in a subclass of `cls` having a `json` slot
+    """
+    init = getattr(cls, '__init__')
+    args = init.__code__.co_varnames[1:init.__code__.co_argcount]
+    slot = cls.__dict__[name]
+    parse = generate_parser(cls, name, cls.__dict__['_json_fields'][args.index(name)])
+
+    def get(self) -> Any:
+        try:
+            return slot.__get__(self)
+        except AttributeError:
+            value = parse(self.json)
+            slot.__set__(self, value)
+            return value
+
+    return property(get, slot.__set__, doc='{} parsed on first access'.format(name))
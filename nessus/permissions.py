@@ -1,9 +1,7 @@
 from enum import Enum
 
-from typing import Mapping, Union
-
 from nessus.error import NessusError
-from nessus.model import Object, lying_type
+from nessus.model import Object, Field, LyingType
 
 
 class NessusPermissionType(Enum):
@@ -25,6 +23,8 @@ class NessusPermission(Object):
      - `permissions_id` could be None
     """
 
+    __slots__ = ('owner', 'type', 'permissions', 'id', 'name')
+
     def __init__(self, owner: int, permission_type: str, permissions: int, permission_id: int, name: str) -> None:
         if permissions not in (0, 16, 32, 64, 128):
             raise NessusPermissionValueError(permissions)
@@ -35,12 +35,9 @@ class NessusPermission(Object):
         self.id = permission_id
         self.name = name
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusPermission':
-        owner = lying_type(json_dict['owner'], int)  # it's None actually
-        permission_type = str(json_dict['type'])
-        permissions = int(json_dict['permissions'])
-        permission_id = lying_type(json_dict['id'], int)  # it's None actually
-        name = str(json_dict['name'])
-
-        return NessusPermission(owner, permission_type, permissions, permission_id, name)
+    _json_fields = (
+        LyingType('owner', int),  # it's None actually
+        Field('type', str), Field('permissions', int),
+        LyingType('id', int),  # it's None actually
+        Field('name', str),
+    )
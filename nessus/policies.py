@@ -4,12 +4,14 @@ sub modules for everything about the policies
 from enum import Enum
 from uuid import uuid4
 
-from typing import Iterable, Mapping, Union, Tuple, Optional
+from typing import Iterable, Mapping, Tuple, Optional, Any
 
 from nessus.base import LibNessusBase
+from nessus.cache import NessusTtlCache
 from nessus.editor import NessusTemplate
 from nessus.file import NessusRemoteFile
-from nessus.model import lying_exist, Object
+from nessus.model import Object, Field, LyingExist
+from nessus.transport import NessusTransport
 
 
 class NessusPolicyVisibility(Enum):
@@ -26,6 +28,11 @@ class NessusPolicy(Object):
      - `visibility` which is not always there and which is an int
     """
 
+    __slots__ = (
+        'id', 'template_uuid', 'name', 'description', 'owner_id', 'owner', 'shared', 'user_permissions',
+        'creation_date', 'last_modification_date', 'visibility', 'no_target',
+    )
+
     # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-few-public-methods
 
@@ -52,51 +59,102 @@ class NessusPolicy(Object):
     def __hash__(self):
         return hash(self.id)
 
-    # pylint: disable=too-many-arguments
+    _json_fields = (
+        Field('id', int), Field('template_uuid', str), Field('name', str), Field('description', str),
+        Field('owner_id', str), Field('owner', str), Field('shared', int), Field('user_permissions', int),
+        Field('creation_date', int), Field('last_modification_date', int),
+        LyingExist('visibility', NessusPolicyVisibility, None), Field('no_target', bool),
+    )
+
+
+class LibNessusPoliciesRequests:
+    """
+    what is sent to nessus about the policies, shared by LibNessusPolicies and its asyncio flavour (see `nessus.aio`)
+    """
+
     @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusPolicy':
-        """
-        generate a NessusPolicy by parsing the given json
-        :param json_dict: json encoded NessusPolicy
-        :return: extracted NessusPolicy
-        """
-        policy_id = int(json_dict['id'])
-        template_uuid = str(json_dict['template_uuid'])
-        name = str(json_dict['name'])
-        description = str(json_dict['description'])
-        owner_id = str(json_dict['owner_id'])
-        owner = str(json_dict['owner'])
-        shared = int(json_dict['shared'])
-        user_permissions = int(json_dict['user_permissions'])
-        creation_date = int(json_dict['creation_date'])
-        last_modification_date = int(json_dict['last_modification_date'])
-        visibility = lying_exist(json_dict, 'visibility', NessusPolicyVisibility, None)
-        no_target = bool(json_dict['no_target'])
-
-        return NessusPolicy(policy_id, template_uuid, name, description, owner_id, owner, shared, user_permissions,
-                            creation_date, last_modification_date, visibility, no_target)
-
-
-class LibNessusPolicies(LibNessusBase):
+    def _policies_by_id(json: Mapping[str, Any]) -> Mapping[int, NessusPolicy]:
+        return {p.id: p for p in (NessusPolicy.from_json(policy) for policy in json['policies'])}
+
+    @staticmethod
+    def _policy_path(policy: NessusPolicy) -> str:
+        return 'policies/{}'.format(policy.id)
+
+    @staticmethod
+    def _create_json(template: NessusTemplate, name: Optional[str] = None) -> Mapping[str, Any]:
+        if name is None:
+            name = str(uuid4())
+
+        return {
+            'uuid': template.uuid,
+            'settings': {
+                'name': name
+            },
+            'audits': {},
+        }
+
+    @staticmethod
+    def _import_json(remote_file: NessusRemoteFile) -> Mapping[str, Any]:
+        return {'file': remote_file.name}
+
+
+class LibNessusPolicies(LibNessusBase, LibNessusPoliciesRequests):
     """
     modules handling /policies
     """
 
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str,
+                 transport: Optional[NessusTransport] = None, cache_ttl: float = 0) -> None:
+        """
+        :param cache_ttl: seconds to keep the policies before asking them again, nothing is kept if not positive, it
+                          is forgotten on `create`, `delete` and `import_`
+        """
+        super().__init__(host, port, api_access_key, api_secret_key, transport)
+
+        self.__policies = NessusTtlCache(cache_ttl)  # type: NessusTtlCache[Mapping[int, NessusPolicy]]
+
     def list(self) -> Iterable[NessusPolicy]:
         """
         Returns the policy list.
         :return: iterable of available policy
         """
-        ans = self._get('policies')
-        return {NessusPolicy.from_json(policy) for policy in ans.json()['policies']}
+        return set(self.__policies_by_id().values())
+
+    def policy_by_id(self, policy_id: int) -> Optional[NessusPolicy]:
+        """
+        :param policy_id: id of the policy, as given by `create`
+        :return: the policy or None if there is none with this id
+        """
+        return self.__policies_by_id().get(policy_id)
+
+    def policy_by_name(self, name: str) -> Optional[NessusPolicy]:
+        """
+        :param name: name of the policy
+        :return: one of the policies with this name or None if there is none
+        """
+        return next((p for p in self.__policies_by_id().values() if p.name == name), None)
+
+    def invalidate(self) -> None:
+        """
+        forget the kept policies
+        """
+        self.__policies.invalidate()
+
+    def __policies_by_id(self) -> Mapping[int, NessusPolicy]:
+        def fetch() -> Mapping[int, NessusPolicy]:
+            return self._policies_by_id(self._get('policies'))
+
+        return self.__policies.get_or_fetch(None, fetch)
 
     def delete(self, policy: NessusPolicy) -> None:
         """
         Delete a policy.
         :param policy: one to delete
         """
-        url = 'policies/{}'.format(policy.id)
-        self._delete(url)
+        try:
+            self._delete(self._policy_path(policy))
+        finally:
+            self.invalidate()
 
     # pylint: disable=bad-whitespace
     def create(self, template: NessusTemplate, name: Optional[str] = None) -> Tuple[int, str]:
@@ -106,18 +164,11 @@ class LibNessusPolicies(LibNessusBase):
         :param name: name of the policy
         :return: (policy_id, policy_name)
         """
-        if name is None:
-            name = str(uuid4())
-
-        json = {
-            'uuid': template.uuid,
-            'settings': {
-                'name': name
-            },
-            'audits': {},
-        }
-        ans = self._post('policies', json=json)
-        return ans.json()['policy_id'], ans.json()['policy_name']
+        try:
+            created = self._post('policies', json=self._create_json(template, name))
+        finally:
+            self.invalidate()
+        return created['policy_id'], created['policy_name']
 
     def import_(self, remote_file: NessusRemoteFile) -> NessusPolicy:
         """
@@ -125,6 +176,8 @@ class LibNessusPolicies(LibNessusBase):
         sorry about the name, but in python 'import' is a reserved keyword
         :param remote_file: file to treat as nessus policy
         """
-        json = {'file': remote_file.name}
-        ans = self._post('policies/import', json=json)
-        return NessusPolicy.from_json(ans.json())
+        try:
+            imported = self._post('policies/import', json=self._import_json(remote_file))
+        finally:
+            self.invalidate()
+        return NessusPolicy.from_json(imported)
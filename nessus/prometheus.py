@@ -0,0 +1,143 @@
+"""
+export of what a `NessusMetricsCollector` saw, in the text format of Prometheus, served over http or written to a file
+(as for the textfile collector of node_exporter), without needing `prometheus_client`
+"""
+import os
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Thread
+
+from typing import Mapping, List, Tuple
+
+from nessus.metrics import NessusMetricsCollector, NessusLatencyHistogram
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(labels: Mapping[str, str]) -> str:
+    return '{' + ','.join('{}="{}"'.format(name, _escape(str(value))) for name, value in labels.items()) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class NessusPrometheusExporter:
+    """
+    render the metrics of a collector, for example:
+    `collector = NessusMetricsCollector()`, `LibNessus(..., hooks=[collector])` then
+    `NessusPrometheusExporter(collector).serve(9464)`
+    every metric is labelled by `scanner` ('host:port'), `method` and `endpoint` (as 'scans/{scan_id}')
+    """
+
+    def __init__(self, collector: NessusMetricsCollector, namespace: str = 'nessus_client') -> None:
+        """
+        :param collector: hook given to the clients to watch
+        :param namespace: prefix of the metric names
+        """
+        self.collector = collector
+        self.namespace = namespace
+
+    def render(self) -> str:
+        """
+        :return: every metric, in the text format of Prometheus
+        """
+        stats = sorted(self.collector.stats().items())
+        lines = list()  # type: List[str]
+
+        def family(name: str, kind: str, help_text: str, samples: List[Tuple[str, Mapping[str, str], float]]) -> None:
+            name = '{}_{}'.format(self.namespace, name)
+            lines.append('# HELP {} {}'.format(name, help_text))
+            lines.append('# TYPE {} {}'.format(name, kind))
+            for suffix, labels, value in samples:
+                lines.append('{}{}{} {}'.format(name, suffix, _labels(labels), _number(value)))
+
+        def histogram(name: str, help_text: str, attribute: str) -> None:
+            samples = list()
+            for key, endpoint_stats in stats:
+                samples.extend(self.__histogram_samples(self.__key_labels(key), getattr(endpoint_stats, attribute)))
+            family(name, 'histogram', help_text, samples)
+
+        family('requests_total', 'counter', 'Requests sent to nessus, each retry included.',
+               [('', self.__key_labels(key), s.network_time.count) for key, s in stats])
+        family('errors_total', 'counter', 'Requests which failed, by class of the error raised.',
+               [('', dict(self.__key_labels(key), error=error), count)
+                for key, s in stats for error, count in sorted(s.errors_by_type.items())])
+        family('retries_total', 'counter', 'Requests sent again after a failure.',
+               [('', self.__key_labels(key), s.retries) for key, s in stats])
+        family('in_flight_requests', 'gauge', 'Requests sent and not answered yet, the ones waiting for the rate '
+                                              'limiter included.',
+               [('', self.__key_labels(key), s.in_flight) for key, s in stats])
+        family('response_bytes_total', 'counter', 'Bytes received in the bodies of the responses.',
+               [('', self.__key_labels(key), s.size) for key, s in stats])
+        histogram('request_duration_seconds', 'Time from sending a request to getting its whole response.',
+                  'network_time')
+        histogram('decode_duration_seconds', 'Time spent decoding the json of the responses.', 'decode_time')
+
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def __key_labels(key: Tuple[str, str, str]) -> Mapping[str, str]:
+        scanner, method, endpoint = key
+        return {'scanner': scanner, 'method': method, 'endpoint': endpoint}
+
+    @staticmethod
+    def __histogram_samples(labels: Mapping[str, str], histogram: NessusLatencyHistogram) \
+            -> List[Tuple[str, Mapping[str, str], float]]:
+        samples = list()
+        cumulated = 0
+        for bound, count in zip(histogram.bounds + (float('inf'),), histogram.counts):
+            cumulated += count
+            samples.append(('_bucket', dict(labels, le='+Inf' if bound == float('inf') else _number(float(bound))),
+                            cumulated))
+        samples.append(('_sum', labels, histogram.sum))
+        samples.append(('_count', labels, histogram.count))
+        return samples
+
+    def write(self, path: str) -> None:
+        """
+        Write the metrics to a file, atomically replaced so that a reader never sees it half written.
+        call it periodically, as after each harvest of a daemon
+        :param path: file to write, as '/var/lib/node_exporter/nessus.prom'
+        """
+        temporary = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary, 'w', encoding='utf-8') as io:
+            io.write(self.render())
+        os.replace(temporary, path)
+
+    def serve(self, port: int = 9464, host: str = '127.0.0.1') -> HTTPServer:
+        """
+        Serve the metrics on http://host:port/metrics, from a daemon thread.
+        :param port: port to listen on, 0 for any free one
+        :param host: address to listen on, only local by default
+        :return: the running server, stopped by `shutdown()` then `server_close()`
+        """
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = _ThreadingHTTPServer((host, port), Handler)
+        Thread(target=server.serve_forever, name='nessus-prometheus', daemon=True).start()
+        return server
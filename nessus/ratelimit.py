@@ -0,0 +1,167 @@
+"""
+client-side limit of the load put on a scanner, shared by every client of the process talking to it
+"""
+import asyncio
+from collections import deque
+from threading import Lock, Event
+from time import monotonic, sleep
+
+from typing import Optional, Callable, MutableMapping, Tuple, Deque
+
+from nessus.error import NessusError
+
+
+class NessusRateLimiter:
+    """
+    token bucket for the requests per second and semaphore for the requests in flight, usable from threads
+    (`with limiter:`) and from asyncio tasks (`async with limiter:`) at the same time, as a single budget
+    the waiters are served in order, a thread waiting does not block the event loop and the other way around
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None,
+                 max_concurrent: Optional[int] = None) -> None:
+        """
+        :param rate: requests per second, not limited if not given
+        :param burst: requests which can be sent at once after being idle, default to one second of `rate`
+        :param max_concurrent: requests in flight, not limited if not given
+        """
+        assert rate is None or rate > 0
+        assert max_concurrent is None or max_concurrent > 0
+
+        self.rate = rate
+        self.burst = max(1, int(rate)) if burst is None and rate is not None else burst
+        self.max_concurrent = max_concurrent
+
+        self.__lock = Lock()
+        self.__tokens = self.burst
+        self.__updated = monotonic()
+        self.__in_flight = 0
+        # wake up a waiter, handing over a slot
+        self.__waiters = deque()  # type: Deque[Callable[[], None]]
+
+    def acquire(self) -> None:
+        """
+        wait for a slot and a token, the slot has to be given back with `release`
+        """
+        event = Event()
+        if not self.__take_slot(event.set):
+            event.wait()
+
+        delay = self.__take_token()
+        if delay > 0:
+            sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """
+        as `acquire` but waiting without blocking the event loop
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        if not self.__take_slot(wake):
+            try:
+                await future
+            except asyncio.CancelledError:
+                self.__abandon(wake)
+                raise
+
+        try:
+            delay = self.__take_token()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """
+        give back the slot taken by `acquire`, to the next waiter if any
+        """
+        with self.__lock:
+            if not self.__waiters:
+                self.__in_flight -= 1
+                return
+            wake = self.__waiters.popleft()
+        wake()
+
+    def __take_slot(self, wake: Callable[[], None]) -> bool:
+        """
+        :param wake: how to wake up the caller when a slot is handed to it
+        :return: whether a slot was taken, else the caller has to wait to be woken up
+        """
+        with self.__lock:
+            if self.max_concurrent is None or self.__in_flight < self.max_concurrent:
+                self.__in_flight += 1
+                return True
+            self.__waiters.append(wake)
+            return False
+
+    def __abandon(self, wake: Callable[[], None]) -> None:
+        with self.__lock:
+            try:
+                self.__waiters.remove(wake)
+                return
+            except ValueError:
+                pass
+        # the slot was already handed over
+        self.release()
+
+    def __take_token(self) -> float:
+        """
+        reserve the next token, the tokens can go negative, so that the waiters are spread at `rate`
+        :return: seconds to wait for the reserved token
+        """
+        if self.rate is None:
+            return 0
+
+        with self.__lock:
+            now = monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            self.__tokens -= 1
+            return max(0, -self.__tokens / self.rate)
+
+    def __enter__(self) -> 'NessusRateLimiter':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    async def __aenter__(self) -> 'NessusRateLimiter':
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+__limiters = dict()  # type: MutableMapping[Tuple[str, int], NessusRateLimiter]
+__limiters_lock = Lock()
+
+
+def scanner_rate_limiter(host: str, port: int, rate: Optional[float] = None, burst: Optional[int] = None,
+                         max_concurrent: Optional[int] = None) -> NessusRateLimiter:
+    """
+    the limiter of a scanner, shared by every client of the process, created with the given limits on first call
+    :param host: host of the scanner
+    :param port: port of the scanner, as an int or a str
+    :param rate: requests per second, not limited if not given
+    :param burst: requests which can be sent at once after being idle, default to one second of `rate`
+    :param max_concurrent: requests in flight, not limited if not given
+    :return: limiter to use for every request to this scanner
+    :raise NessusError: if the limiter of the scanner was created with other limits, as a budget can not have two
+    """
+    key = (host, int(port))
+    asked = NessusRateLimiter(rate=rate, burst=burst, max_concurrent=max_concurrent)
+    with __limiters_lock:
+        limiter = __limiters.setdefault(key, asked)
+
+    limits = (limiter.rate, limiter.burst, limiter.max_concurrent)
+    if limits != (asked.rate, asked.burst, asked.max_concurrent):
+        raise NessusError('scanner {}:{} is already limited to rate={}, burst={}, max_concurrent={}'.format(
+            host, port, *limits))
+    return limiter
@@ -0,0 +1,120 @@
+"""
+read .nessus reports (as given by `scans.export` or accepted by `file.upload`) without loading them fully
+"""
+from xml.etree.ElementTree import iterparse
+
+from typing import Union, IO, Iterator, Optional, Mapping
+
+from nessus.file import NessusFile
+from nessus.model import Object
+from nessus.scans import NessusScanHostDetailsInfo, NessusScanHostVulnerability, NessusScanPluginOutput, \
+    NessusScanPluginOutputPort, Transport, Protocol
+
+
+class NessusReportHost(Object):
+    """
+    a `ReportHost` of the report, it comes before all its items
+    lies:
+     - `host_id` is not in the report, it is the position of the host in it, starting at 1
+    """
+
+    __slots__ = ('host_id', 'name', 'info')
+
+    def __init__(self, host_id: int, name: str, info: NessusScanHostDetailsInfo) -> None:
+        self.host_id = host_id
+        self.name = name
+        self.info = info
+
+
+class NessusReportItem(Object):
+    """
+    a `ReportItem` of the report, shaped as what `scans.host_details` and `scans.plugin_output` give
+    lies:
+     - `vulnerability.count` is always 1 and `vulnerability.vuln_index` is None, as an item is a single finding
+     - `vulnerability.severity_index` is the severity, there is no index in the report
+     - `output.ports[0].protocol` is None for services unknown to Protocol
+    """
+
+    __slots__ = ('host_id', 'vulnerability', 'output')
+
+    def __init__(self, host_id: int, vulnerability: NessusScanHostVulnerability,
+                 output: NessusScanPluginOutput) -> None:
+        self.host_id = host_id
+        self.vulnerability = vulnerability
+        self.output = output
+
+
+def __host_info(name: str, tags: Mapping[str, str]) -> NessusScanHostDetailsInfo:
+    json_dict = {
+        'host_start': tags.get('HOST_START', ''),
+        'host_end': tags.get('HOST_END', ''),
+        'host-ip': tags.get('host-ip', name),
+    }
+    for key in ('mac-address', 'host-fqdn', 'operating-system'):
+        if key in tags:
+            json_dict[key] = tags[key]
+
+    return NessusScanHostDetailsInfo.from_json(json_dict)
+
+
+def __item(host_id: int, hostname: str, element) -> NessusReportItem:
+    severity = int(element.get('severity'))
+    plugin_id = int(element.get('pluginID'))
+
+    vulnerability = NessusScanHostVulnerability(host_id=host_id, hostname=hostname, plugin_id=plugin_id,
+                                                plugin_name=element.get('pluginName'),
+                                                plugin_family=element.get('pluginFamily'), count=1, vuln_index=None,
+                                                severity_index=severity, severity=severity)
+
+    transport = __enum(Transport, element.get('protocol'))
+    protocol = __enum(Protocol, element.get('svc_name'))
+    port = NessusScanPluginOutputPort(number=int(element.get('port')), transport=transport, protocol=protocol,
+                                      hosts={hostname})
+    output = NessusScanPluginOutput(plugin_output=element.findtext('plugin_output', ''), hosts=hostname,
+                                    severity=severity, ports=[port])
+
+    return NessusReportItem(host_id, vulnerability, output)
+
+
+def __enum(enum, value: Optional[str]):
+    try:
+        return enum(value)
+    except ValueError:
+        return None
+
+
+def parse_report(source: Union[str, NessusFile, IO[bytes]]) -> Iterator[Union[NessusReportHost, NessusReportItem]]:
+    """
+    parse incrementally a .nessus report, every element is dropped as soon as it was read, so that the memory used
+    does not grow with the size of the report
+    :param source: path, local file or opened binary file
+    :return: for each host, its NessusReportHost followed by its NessusReportItem
+    """
+    if isinstance(source, NessusFile):
+        source = source.path
+
+    parents = list()
+    host_id = 0
+    hostname = None
+
+    for event, element in iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            if element.tag == 'ReportHost':
+                host_id += 1
+                hostname = element.get('name')
+            continue
+
+        parents.pop()
+
+        if element.tag == 'HostProperties':
+            tags = {tag.get('name'): tag.text for tag in element.iter('tag')}
+            yield NessusReportHost(host_id, hostname, __host_info(hostname, tags))
+        elif element.tag == 'ReportItem':
+            yield __item(host_id, hostname, element)
+        elif element.tag not in ('ReportHost', 'Policy'):
+            continue
+
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
@@ -0,0 +1,141 @@
+"""
+resilience to a flaky or overloaded scanner: retry of the transient failures and circuit breaker
+"""
+import random
+from threading import Lock
+from time import monotonic
+
+import requests
+from typing import Optional, AbstractSet
+
+from nessus.error import NessusInternalServerError, NessusWeirdNetworkError, NessusCircuitOpenError
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    :param error: raised while talking to nessus
+    :return: whether the scanner failed, and so asking again later may work, and not the request itself
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, NessusInternalServerError)):
+        return True
+    if isinstance(error, NessusWeirdNetworkError):
+        # an html page from a proxy or from the scanner restarting, but not a plain 404
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return False
+
+
+class NessusRetryPolicy:
+    """
+    retry the idempotent requests failing because of the scanner, with exponential backoff and full jitter
+    """
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 30,
+                 methods: AbstractSet[str] = frozenset({'GET', 'DELETE'})) -> None:
+        """
+        :param attempts: retries after the first request, so at most `attempts + 1` requests are sent
+        :param base_delay: seconds to wait, at most, before the first retry, it doubles on each retry
+        :param max_delay: seconds to wait, at most, before any retry
+        :param methods: http methods safe to send again, POST is not as it creates or launches things
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.methods = methods
+
+    def should_retry(self, method: str, error: Exception, attempt: int) -> bool:
+        """
+        :param method: http method of the failed request
+        :param error: why it failed
+        :param attempt: number of retries already done
+        :return: whether to send the request again
+        """
+        return attempt < self.attempts and method in self.methods and is_transient(error)
+
+    def delay(self, attempt: int) -> float:
+        """
+        :param attempt: number of retries already done
+        :return: seconds to wait before the next one, random so that clients failing together do not retry together
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class NessusCircuitBreaker:
+    """
+    stop sending requests to a scanner failing repeatedly, to fail fast instead of piling more on it
+    after `failure_threshold` transient failures in a row, every request fails with NessusCircuitOpenError for
+    `reset_timeout` seconds, then a single request is let through to probe the scanner: its success closes the
+    circuit, its failure opens it again
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        """
+        :param failure_threshold: transient failures in a row to open the circuit
+        :param reset_timeout: seconds to wait before probing the scanner again
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.__lock = Lock()
+        self.__failures = 0
+        self.__opened_at = None  # type: Optional[float]
+        self.__probing = False
+
+    @property
+    def is_open(self) -> bool:
+        """
+        :return: whether requests are currently refused
+        """
+        with self.__lock:
+            return self.__opened_at is not None
+
+    def before_request(self) -> bool:
+        """
+        to call before sending a request
+        :raise NessusCircuitOpenError: if the scanner is considered down
+        :return: whether the request is the probe, then `cancel_probe` has to be called if it ends without
+                 `after_request` (as when interrupted)
+        """
+        with self.__lock:
+            if self.__opened_at is None:
+                return False
+
+            remaining = self.__opened_at + self.reset_timeout - monotonic()
+            if remaining > 0 or self.__probing:
+                raise NessusCircuitOpenError(max(remaining, 0))
+            self.__probing = True
+            return True
+
+    def cancel_probe(self) -> None:
+        """
+        the probe ended without telling whether the scanner is back, let the next request probe it
+        """
+        with self.__lock:
+            self.__probing = False
+
+    def after_request(self, error: Optional[Exception] = None) -> None:
+        """
+        to call with the outcome of each request let through by `before_request`
+        :param error: why the request failed, None if it succeeded
+        """
+        with self.__lock:
+            self.__probing = False
+
+            if error is None or not is_transient(error):
+                # the scanner answered, even if it was to refuse the request
+                self.__failures = 0
+                self.__opened_at = None
+                return
+
+            self.__failures += 1
+            if self.__opened_at is not None or self.__failures >= self.failure_threshold:
+                self.__opened_at = monotonic()
+
+    def reset(self) -> None:
+        """
+        close the circuit, for example when the scanner is known to be back
+        """
+        with self.__lock:
+            self.__failures = 0
+            self.__opened_at = None
+            self.__probing = False
+
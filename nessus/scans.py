@@ -2,16 +2,31 @@
 sub modules for everything about the scans
 """
 
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
 from enum import Enum
+from threading import Lock
+from time import monotonic, sleep
 from uuid import uuid4
 
-from typing import Iterable, Mapping, Union, Optional, MutableMapping
+import requests
+from typing import Iterable, Mapping, Union, Optional, MutableMapping, Iterator, Tuple, Set, Callable, IO, TypeVar, \
+    Any, Sequence, List, Dict
 
 from nessus.base import LibNessusBase
+from nessus.cache import NessusResultCache
 from nessus.editor import NessusTemplate
-from nessus.model import lying_exist, lying_type, Object, lying_exist_and_type, allow_to_exist
+from nessus.error import NessusError, NessusTimeoutError
+from nessus.model import Object, Field, LyingExist, LyingType, LyingExistAndType, AllowToExist, SetOf, lying_exist, \
+    lazy_field
 from nessus.permissions import NessusPermission
 from nessus.policies import NessusPolicy
+from nessus.targets import shard_targets, normalize_targets
+from nessus.transport import NessusTransport
+
+T = TypeVar('T')
 
 
 class NessusScanType(Enum):
@@ -49,6 +64,17 @@ class NessusScanStatus(Enum):
     processing = 'processing'
 
 
+# status after which a scan will not change anymore by itself
+TERMINAL_SCAN_STATUSES = frozenset({
+    NessusScanStatus.completed,
+    NessusScanStatus.aborted,
+    NessusScanStatus.imported,
+    NessusScanStatus.cancelled,
+    NessusScanStatus.canceled,
+    NessusScanStatus.stopped,
+})
+
+
 class NessusScan(Object):
     """
     nessus is lying with:
@@ -57,6 +83,11 @@ class NessusScan(Object):
      - `use_dashboard` which do not always exists
     """
 
+    __slots__ = (
+        'id', 'uuid', 'name', 'type', 'owner', 'enabled', 'folder_id', 'read', 'status', 'shared', 'user_permissions',
+        'creation_date', 'last_modification_date', 'control', 'starttime', 'timezone', 'rrules', 'use_dashboard',
+    )
+
     def __init__(self, scan_id: int, uuid: str, name: str, type: NessusScanType, owner: str, enabled: bool,
                  folder_id: int,
                  read: bool, status: NessusScanStatus, shared: bool, user_permissions: int, creation_date: int,
@@ -87,30 +118,13 @@ class NessusScan(Object):
     def __hash__(self):
         return hash(self.id)
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScan':
-        scan_id = int(json_dict['id'])
-        uuid = str(json_dict['uuid'])
-        name = str(json_dict['name'])
-        scan_type = lying_type(json_dict['type'], NessusScanType)
-        owner = str(json_dict['owner'])
-        enabled = bool(json_dict['enabled'])
-        folder_id = int(json_dict['folder_id'])
-        read = bool(json_dict['read'])
-        status = NessusScanStatus(json_dict['status'])
-        shared = bool(json_dict['shared'])
-        user_permissions = int(json_dict['user_permissions'])
-        creation_date = int(json_dict['creation_date'])
-        last_modification_date = int(json_dict['last_modification_date'])
-        control = bool(json_dict['control'])
-        starttime = str(json_dict['starttime'])
-        timezone = str(json_dict['timezone'])
-        rrules = str(json_dict['rrules'])
-        use_dashboard = lying_exist(json_dict, 'use_dashboard', bool)
-
-        return NessusScan(scan_id, uuid, name, scan_type, owner, enabled, folder_id, read, status, shared,
-                          user_permissions,
-                          creation_date, last_modification_date, control, starttime, timezone, rrules, use_dashboard)
+    _json_fields = (
+        Field('id', int), Field('uuid', str), Field('name', str), LyingType('type', NessusScanType),
+        Field('owner', str), Field('enabled', bool), Field('folder_id', int), Field('read', bool),
+        Field('status', NessusScanStatus), Field('shared', bool), Field('user_permissions', int),
+        Field('creation_date', int), Field('last_modification_date', int), Field('control', bool),
+        Field('starttime', str), Field('timezone', str), Field('rrules', str), LyingExist('use_dashboard', bool),
+    )
 
 
 class NessusScanCreated(Object):
@@ -120,6 +134,13 @@ class NessusScanCreated(Object):
      - `tag_id` does not always exist
     """
 
+    __slots__ = (
+        'creation_date', 'custom_targets', 'default_permisssions', 'description', 'emails', 'id',
+        'last_modification_date', 'name', 'notification_filter_type', 'notification_filters', 'owner', 'owner_id',
+        'policy_id', 'enabled', 'rrules', 'scanner_id', 'shared', 'starttime', 'tag_id', 'timezone', 'type',
+        'user_permissions', 'uuid', 'use_dashboard',
+    )
+
     def __init__(self, creation_date: int, custom_targets: str, default_permisssions: int, description: str,
                  emails: str, scan_id: int, last_modification_date: int, name: str, notification_filter_type: str,
                  notification_filters: str, owner: str, owner_id: int, policy_id: int, enabled: bool, rrules: str,
@@ -150,37 +171,15 @@ class NessusScanCreated(Object):
         self.uuid = uuid
         self.use_dashboard = use_dashboard
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanCreated':
-        creation_date = int(json_dict['creation_date'])
-        custom_targets = str(json_dict['custom_targets'])
-        default_permisssions = int(json_dict['default_permisssions'])
-        description = str(json_dict['description'])
-        emails = str(json_dict['emails'])
-        scan_id = int(json_dict['id'])
-        last_modification_date = int(json_dict['last_modification_date'])
-        name = str(json_dict['name'])
-        notification_filter_type = lying_exist(json_dict, 'notification_filter_type', str)
-        notification_filters = str(json_dict['notification_filters'])
-        owner = str(json_dict['owner'])
-        owner_id = int(json_dict['owner_id'])
-        policy_id = int(json_dict['policy_id'])
-        enabled = bool(json_dict['enabled'])
-        rrules = str(json_dict['rrules'])
-        scanner_id = int(json_dict['scanner_id'])
-        shared = int(json_dict['shared'])
-        starttime = str(json_dict['starttime'])
-        tag_id = lying_exist(json_dict, 'tag_id', int)
-        timezone = str(json_dict['timezone'])
-        scan_type = str(json_dict['type'])
-        user_permissions = int(json_dict['user_permissions'])
-        uuid = str(json_dict['uuid'])
-        use_dashboard = bool(json_dict['use_dashboard'])
-
-        return NessusScanCreated(creation_date, custom_targets, default_permisssions, description, emails, scan_id,
-                                 last_modification_date, name, notification_filter_type, notification_filters, owner,
-                                 owner_id, policy_id, enabled, rrules, scanner_id, shared, starttime, tag_id, timezone,
-                                 scan_type, user_permissions, uuid, use_dashboard)
+    _json_fields = (
+        Field('creation_date', int), Field('custom_targets', str), Field('default_permisssions', int),
+        Field('description', str), Field('emails', str), Field('id', int), Field('last_modification_date', int),
+        Field('name', str), LyingExist('notification_filter_type', str), Field('notification_filters', str),
+        Field('owner', str), Field('owner_id', int), Field('policy_id', int), Field('enabled', bool),
+        Field('rrules', str), Field('scanner_id', int), Field('shared', int), Field('starttime', str),
+        LyingExist('tag_id', int), Field('timezone', str), Field('type', str), Field('user_permissions', int),
+        Field('uuid', str), Field('use_dashboard', bool),
+    )
 
 
 class NessusScanDetailsInfo(Object):
@@ -199,6 +198,12 @@ class NessusScanDetailsInfo(Object):
      - `scan_end` is not always existing
     """
 
+    __slots__ = (
+        'acls', 'edit_allowed', 'status', 'policy', 'pci_can_upload', 'hasaudittrail', 'scan_start', 'folder_id',
+        'targets', 'timestamp', 'object_id', 'scanner_name', 'haskb', 'uuid', 'hostcount', 'scan_end', 'name',
+        'user_permissions', 'control',
+    )
+
     def __init__(self, acls: Iterable[NessusPermission], edit_allowed: bool, status: str, policy: str,
                  pci_can_upload: bool, hasaudittrail: bool,
                  scan_start: str, folder_id: int, targets: str, timestamp: int, object_id: int, scanner_name: str,
@@ -224,31 +229,15 @@ class NessusScanDetailsInfo(Object):
         self.user_permissions = user_permissions
         self.control = control
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanDetailsInfo':
-        acls = {NessusPermission.from_json(acl) for acl in json_dict['acls']}
-        edit_allowed = lying_exist(json_dict, 'edit_allowed', bool)
-        status = str(json_dict['status'])
-        policy = lying_exist(json_dict, 'policy', str)
-        pci_can_upload = lying_exist(json_dict, 'pci-can-upload', bool)
-        hasaudittrail = lying_exist(json_dict, 'hasaudittrail', bool)
-        scan_start = str(json_dict['scan_start'])
-        folder_id = lying_type(json_dict['folder_id'], int)  # it's None actually
-        targets = lying_exist(json_dict, 'targets', str)
-        timestamp = lying_exist(json_dict, 'timestamp', int)
-        object_id = int(json_dict['object_id'])
-        scanner_name = str(json_dict['scanner_name'])
-        haskb = lying_exist(json_dict, 'haskb', bool)
-        uuid = lying_exist(json_dict, 'uuid', str)
-        hostcount = lying_exist(json_dict, 'hostcount', int)
-        scan_end = lying_exist(json_dict, 'scan_end', str)
-        name = str(json_dict['name'])
-        user_permissions = int(json_dict['user_permissions'])
-        control = bool(json_dict['control'])
-
-        return NessusScanDetailsInfo(acls, edit_allowed, status, policy, pci_can_upload, hasaudittrail, scan_start,
-                                     folder_id, targets, timestamp, object_id, scanner_name, haskb, uuid, hostcount,
-                                     scan_end, name, user_permissions, control)
+    _json_fields = (
+        SetOf(NessusPermission.from_json, Field('acls')), LyingExist('edit_allowed', bool), Field('status', str),
+        LyingExist('policy', str), LyingExist('pci-can-upload', bool), LyingExist('hasaudittrail', bool),
+        Field('scan_start', str),
+        LyingType('folder_id', int),  # it's None actually
+        LyingExist('targets', str), LyingExist('timestamp', int), Field('object_id', int), Field('scanner_name', str),
+        LyingExist('haskb', bool), LyingExist('uuid', str), LyingExist('hostcount', int), LyingExist('scan_end', str),
+        Field('name', str), Field('user_permissions', int), Field('control', bool),
+    )
 
 
 class NessusScanHost(Object):
@@ -257,6 +246,11 @@ class NessusScanHost(Object):
      - `hostname` can be str
     """
 
+    __slots__ = (
+        'host_id', 'host_index', 'hostname', 'progress', 'critical', 'high', 'medium', 'low', 'info',
+        'totalchecksconsidered', 'numchecksconsidered', 'scanprogresstotal', 'scanprogresscurrent', 'score',
+    )
+
     def __init__(self, host_id: int, host_index: str, hostname: int, progress: str, critical: int, high: int,
                  medium: int, low: int, info: int, totalchecksconsidered: int, numchecksconsidered: int,
                  scanprogresstotal: int, scanprogresscurrent: int, score: int) -> None:
@@ -275,58 +269,39 @@ class NessusScanHost(Object):
         self.scanprogresscurrent = scanprogresscurrent
         self.score = score
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanHost':
-        host_id = int(json_dict['host_id'])
-        host_index = str(json_dict['host_index'])
-        hostname = lying_type(json_dict['hostname'], int, str)
-        progress = str(json_dict['progress'])
-        critical = int(json_dict['critical'])
-        high = int(json_dict['high'])
-        medium = int(json_dict['medium'])
-        low = int(json_dict['low'])
-        info = int(json_dict['info'])
-        totalchecksconsidered = int(json_dict['totalchecksconsidered'])
-        numchecksconsidered = int(json_dict['numchecksconsidered'])
-        scanprogresstotal = int(json_dict['scanprogresstotal'])
-        scanprogresscurrent = int(json_dict['scanprogresscurrent'])
-        score = int(json_dict['score'])
-
-        return NessusScanHost(host_id, host_index, hostname, progress, critical, high, medium, low, info,
-                              totalchecksconsidered, numchecksconsidered, scanprogresstotal, scanprogresscurrent,
-                              score)
+    _json_fields = (
+        Field('host_id', int), Field('host_index', str), LyingType('hostname', int, str), Field('progress', str),
+        Field('critical', int), Field('high', int), Field('medium', int), Field('low', int), Field('info', int),
+        Field('totalchecksconsidered', int), Field('numchecksconsidered', int), Field('scanprogresstotal', int),
+        Field('scanprogresscurrent', int), Field('score', int),
+    )
 
 
 class NessusScanNote(Object):
+    __slots__ = ('title', 'message', 'severity')
+
     def __init__(self, title: str, message: str, severity: int) -> None:
         self.title = title
         self.message = message
         self.severity = severity
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanNote':
-        title = str(json_dict['title'])
-        message = str(json_dict['message'])
-        severity = int(json_dict['severity'])
-
-        return NessusScanNote(title, message, severity)
+    _json_fields = (
+        Field('title', str), Field('message', str), Field('severity', int),
+    )
 
 
 class NessusScanRemediation(Object):
+    __slots__ = ('value', 'remediation', 'hosts', 'vulns')
+
     def __init__(self, value: str, remediation: str, hosts: int, vulns: int) -> None:
         self.value = value
         self.remediation = remediation
         self.hosts = hosts
         self.vulns = vulns
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanRemediation':
-        value = str(json_dict['value'])
-        remediation = str(json_dict['remediation'])
-        hosts = int(json_dict['hosts'])
-        vulns = int(json_dict['vulns'])
-
-        return NessusScanRemediation(value, remediation, hosts, vulns)
+    _json_fields = (
+        Field('value', str), Field('remediation', str), Field('hosts', int), Field('vulns', int),
+    )
 
 
 class NessusScanDetailsRemediations(Object):
@@ -335,6 +310,8 @@ class NessusScanDetailsRemediations(Object):
      - `remediations` can be None
     """
 
+    __slots__ = ('remediations', 'num_hosts', 'num_cves', 'num_impacted_hosts', 'num_remediated_cves')
+
     def __init__(self, remediations: Iterable[NessusScanRemediation], num_hosts: int, num_cves: int,
                  num_impacted_hosts: int, num_remediated_cves: int) -> None:
         self.remediations = remediations
@@ -343,20 +320,16 @@ class NessusScanDetailsRemediations(Object):
         self.num_impacted_hosts = num_impacted_hosts
         self.num_remediated_cves = num_remediated_cves
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanDetailsRemediations':
-        remediations = {NessusScanRemediation(remediation) for remediation in
-                        lying_type(json_dict['remediations'], list, lambda x: None, list())}
-        num_hosts = int(json_dict['num_hosts'])
-        num_cves = int(json_dict['num_cves'])
-        num_impacted_hosts = int(json_dict['num_impacted_hosts'])
-        num_remediated_cves = int(json_dict['num_remediated_cves'])
-
-        return NessusScanDetailsRemediations(remediations, num_hosts, num_cves, num_impacted_hosts,
-                                             num_remediated_cves)
+    _json_fields = (
+        SetOf(NessusScanRemediation.from_json, LyingType('remediations', list, lambda x: list())),
+        Field('num_hosts', int), Field('num_cves', int), Field('num_impacted_hosts', int),
+        Field('num_remediated_cves', int),
+    )
 
 
 class NessusScanVulnerability(Object):
+    __slots__ = ('plugin_id', 'plugin_name', 'plugin_family', 'count', 'vuln_index', 'severity_index')
+
     def __init__(self, plugin_id: int, plugin_name: str, plugin_family: str, count: int, vuln_index: int,
                  severity_index: int) -> None:
         self.plugin_id = plugin_id
@@ -366,19 +339,15 @@ class NessusScanVulnerability(Object):
         self.vuln_index = vuln_index
         self.severity_index = severity_index
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanVulnerability':
-        plugin_id = int(json_dict['plugin_id'])
-        plugin_name = str(json_dict['plugin_name'])
-        plugin_family = str(json_dict['plugin_family'])
-        count = int(json_dict['count'])
-        vuln_index = int(json_dict['vuln_index'])
-        severity_index = int(json_dict['severity_index'])
-
-        return NessusScanVulnerability(plugin_id, plugin_name, plugin_family, count, vuln_index, severity_index)
+    _json_fields = (
+        Field('plugin_id', int), Field('plugin_name', str), Field('plugin_family', str), Field('count', int),
+        Field('vuln_index', int), Field('severity_index', int),
+    )
 
 
 class NessusScanHistory(Object):
+    __slots__ = ('history_id', 'uuid', 'owner_id', 'status', 'creation_date', 'last_modification_date')
+
     def __init__(self, history_id: int, uuid: str, owner_id: int, status: str, creation_date: int,
                  last_modification_date: int) -> None:
         self.history_id = history_id
@@ -388,16 +357,10 @@ class NessusScanHistory(Object):
         self.creation_date = creation_date
         self.last_modification_date = last_modification_date
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanHistory':
-        history_id = int(json_dict['history_id'])
-        uuid = str(json_dict['uuid'])
-        owner_id = int(json_dict['owner_id'])
-        status = str(json_dict['status'])
-        creation_date = int(json_dict['creation_date'])
-        last_modification_date = int(json_dict['last_modification_date'])
-
-        return NessusScanHistory(history_id, uuid, owner_id, status, creation_date, last_modification_date)
+    _json_fields = (
+        Field('history_id', int), Field('uuid', str), Field('owner_id', int), Field('status', str),
+        Field('creation_date', int), Field('last_modification_date', int),
+    )
 
 
 class NessusScanFilterControl(Object):
@@ -408,6 +371,8 @@ class NessusScanFilterControl(Object):
      - `options` is not always there
     """
 
+    __slots__ = ('type', 'readable_regest', 'regex', 'options')
+
     # FIXME what is the type of `options`?
     def __init__(self, type: str, readable_regest: str, regex: str, options: Iterable) -> None:
         self.type = type
@@ -415,14 +380,9 @@ class NessusScanFilterControl(Object):
         self.regex = regex
         self.options = options
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanFilterControl':
-        type = str(json_dict['type'])
-        readable_regest = lying_exist(json_dict, 'readable_regest', str)
-        regex = lying_exist(json_dict, 'regex', str)
-        options = lying_exist(json_dict, 'options', str)
-
-        return NessusScanFilterControl(type, readable_regest, regex, options)
+    _json_fields = (
+        Field('type', str), LyingExist('readable_regest', str), LyingExist('regex', str), LyingExist('options', str),
+    )
 
 
 class NessusScanFilterOperator(Enum):
@@ -439,6 +399,8 @@ class NessusScanFilterOperator(Enum):
 
 
 class NessusScanFilter(Object):
+    __slots__ = ('name', 'readable_name', 'operators', 'control')
+
     def __init__(self, name: str, readable_name: str, operators: Iterable[NessusScanFilterOperator],
                  control: NessusScanFilterControl) -> None:
         self.name = name
@@ -446,14 +408,10 @@ class NessusScanFilter(Object):
         self.operators = operators
         self.control = control
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanFilter':
-        name = str(json_dict['name'])
-        readable_name = str(json_dict['readable_name'])
-        operators = {NessusScanFilterOperator(operator) for operator in json_dict['operators']}
-        control = NessusScanFilterControl.from_json(json_dict['control'])
-
-        return NessusScanFilter(name, readable_name, operators, control)
+    _json_fields = (
+        Field('name', str), Field('readable_name', str), SetOf(NessusScanFilterOperator, Field('operators')),
+        Field('control', NessusScanFilterControl.from_json),
+    )
 
 
 class NessusScanDetails(Object):
@@ -471,6 +429,10 @@ class NessusScanDetails(Object):
      - `filters` not always existing
     """
 
+    __slots__ = (
+        'info', 'hosts', 'comphosts', 'notes', 'remediations', 'vulnerabilites', 'compliance', 'history', 'filters',
+    )
+
     def __init__(self, info: NessusScanDetailsInfo, hosts: Iterable[NessusScanHost],
                  comphosts: Iterable[NessusScanHost], notes: Iterable[NessusScanNote],
                  remediations: NessusScanDetailsRemediations, vulnerabilites: Iterable[NessusScanVulnerability],
@@ -486,24 +448,109 @@ class NessusScanDetails(Object):
         self.history = history
         self.filters = filters
 
+    _json_fields = (
+        Field('info', NessusScanDetailsInfo.from_json),
+        SetOf(NessusScanHost.from_json, LyingExist('hosts', list)),
+        SetOf(NessusScanHost.from_json, LyingExist('comphosts', list)),
+        SetOf(NessusScanNote.from_json, LyingExistAndType('notes', list, lambda x: list(), list())),
+        LyingExist('remediations', NessusScanDetailsRemediations.from_json, None),
+        SetOf(NessusScanVulnerability.from_json, LyingExist('vulnerabilities', list)),
+        SetOf(NessusScanVulnerability.from_json, LyingExist('compliance', list)),
+        SetOf(NessusScanHistory.from_json, LyingType('history', list, lambda x: list())),
+        SetOf(NessusScanFilter.from_json, LyingExist('filters', list)),
+    )
+
+    @staticmethod
+    def merge(shards: Sequence['NessusScanDetails']) -> 'NessusScanDetails':
+        """
+        gather the details of scans run on parts of the same targets (see `LibNessusScans.run_sharded`) as a single one
+        the vulnerabilities and remediations are summed by plugin and by value, the other fields (as `filters`,
+        `info.uuid` or `info.name`) are taken from the first shard
+        the hosts are the ones of the shards, keeping the `host_id` given by the scan of their shard and no record of
+        it, so to ask nessus about a host (as `LibNessusScans.host_details`), use the scan whose details contain it:
+        `next(scan for scan, shard in zip(scans, shards) if host in shard.hosts)`
+        :param shards: details of every shard, at least one
+        :return: details of the whole
+        """
+        assert shards
+        infos = [shard.info for shard in shards]
+
+        def defined(name: str) -> List[Any]:
+            return [getattr(info, name) for info in infos if getattr(info, name) is not None]
+
+        statuses = [info.status for info in infos]
+        targets, hostcount = defined('targets'), defined('hostcount')
+        info = NessusScanDetailsInfo(**dict(
+            infos[0].to_dict(),
+            # the whole is only completed once every shard is
+            status=next((status for status in statuses if status != NessusScanStatus.completed.value), statuses[0]),
+            targets=','.join(targets) if targets else None,
+            hostcount=sum(hostcount) if hostcount else None,
+            scan_start=min(defined('scan_start'), default=None),
+            scan_end=max(defined('scan_end'), default=None),
+            timestamp=max(defined('timestamp'), default=None),
+        ))
+
+        remediations = None
+        if any(shard.remediations is not None for shard in shards):
+            parts = [shard.remediations for shard in shards if shard.remediations is not None]
+            by_value = dict()  # type: MutableMapping[str, NessusScanRemediation]
+            for remediation in (remediation for part in parts for remediation in part.remediations):
+                known = by_value.get(remediation.value)
+                by_value[remediation.value] = remediation if known is None else NessusScanRemediation(
+                    known.value, known.remediation, known.hosts + remediation.hosts, known.vulns + remediation.vulns)
+            # the same cve can be found by many shards, so only a lower bound is known
+            remediations = NessusScanDetailsRemediations(
+                set(by_value.values()), sum(part.num_hosts for part in parts), max(part.num_cves for part in parts),
+                sum(part.num_impacted_hosts for part in parts), max(part.num_remediated_cves for part in parts))
+
+        def by_plugin(name: str) -> Set[NessusScanVulnerability]:
+            vulnerabilities = dict()  # type: MutableMapping[int, NessusScanVulnerability]
+            for vulnerability in (vulnerability for shard in shards for vulnerability in getattr(shard, name)):
+                known = vulnerabilities.get(vulnerability.plugin_id)
+                vulnerabilities[vulnerability.plugin_id] = vulnerability if known is None else NessusScanVulnerability(
+                    known.plugin_id, known.plugin_name, known.plugin_family, known.count + vulnerability.count,
+                    known.vuln_index, max(known.severity_index, vulnerability.severity_index))
+            return set(vulnerabilities.values())
+
+        def joined(name: str) -> Set[Any]:
+            return {elem for shard in shards for elem in getattr(shard, name)}
+
+        return NessusScanDetails(info=info, hosts=joined('hosts'), comphosts=joined('comphosts'), notes=joined('notes'),
+                                 remediations=remediations, vulnerabilites=by_plugin('vulnerabilites'),
+                                 compliance=by_plugin('compliance'), history=joined('history'),
+                                 filters=shards[0].filters)
+
+
+class NessusScanLazyDetails(NessusScanDetails):
+    """
+    NessusScanDetails keeping the json given by nessus, each section is only parsed on its first access, as most
+    callers only look at `info` or `hosts`
+    the other fields of the json (as `dashboard`) are available in `json`, and a section missing from it only raises
+    when accessed
+    """
+
+    __slots__ = ('json',)
+
+    info = lazy_field(NessusScanDetails, 'info')
+    hosts = lazy_field(NessusScanDetails, 'hosts')
+    comphosts = lazy_field(NessusScanDetails, 'comphosts')
+    notes = lazy_field(NessusScanDetails, 'notes')
+    remediations = lazy_field(NessusScanDetails, 'remediations')
+    vulnerabilites = lazy_field(NessusScanDetails, 'vulnerabilites')
+    compliance = lazy_field(NessusScanDetails, 'compliance')
+    history = lazy_field(NessusScanDetails, 'history')
+    filters = lazy_field(NessusScanDetails, 'filters')
+
+    def __getstate__(self) -> Tuple[None, Mapping[str, Any]]:
+        # only the json is kept, the sections are parsed again when needed
+        return None, {'json': self.json}
+
     @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanDetails':
-        info = NessusScanDetailsInfo.from_json(json_dict['info'])
-        hosts = {NessusScanHost.from_json(host) for host in lying_exist(json_dict, 'hosts', list)}
-        comphosts = {NessusScanHost.from_json(host) for host in lying_exist(json_dict, 'comphosts', list)}
-        notes = {NessusScanNote.from_json(note) for note in
-                 lying_exist_and_type(json_dict, 'notes', list, lambda x: list(), list())}
-        remediations = lying_exist(json_dict, 'remediations', NessusScanDetailsRemediations.from_json, None)
-        vulnerabilities = {NessusScanVulnerability.from_json(vulnerability) for vulnerability in
-                           lying_exist(json_dict, 'vulnerabilities', list)}
-        compliance = {NessusScanVulnerability.from_json(vulnerability) for vulnerability in
-                      lying_exist(json_dict, 'compliance', list)}
-        history = {NessusScanHistory.from_json(history) for history in
-                   lying_type(json_dict['history'], list, lambda x: list())}
-        filters = {NessusScanFilter.from_json(filtered) for filtered in lying_exist(json_dict, 'filters', list)}
-
-        return NessusScanDetails(info, hosts, comphosts, notes, remediations, vulnerabilities, compliance, history,
-                                 filters)
+    def from_json(json_dict: Mapping[str, Any]) -> 'NessusScanLazyDetails':
+        details = NessusScanLazyDetails.__new__(NessusScanLazyDetails)
+        details.json = json_dict
+        return details
 
 
 class NessusScanHostDetailsInfo(Object):
@@ -513,6 +560,8 @@ class NessusScanHostDetailsInfo(Object):
      - `host-fqdn` not always existing
     """
 
+    __slots__ = ('host_start', 'mac_address', 'host_fqdn', 'host_end', 'operating_system', 'host_ip')
+
     def __init__(self, host_start: str, mac_address: str, host_fqdn: str, host_end: str, operating_system: str,
                  host_ip: str) -> None:
         self.host_start = host_start
@@ -522,19 +571,17 @@ class NessusScanHostDetailsInfo(Object):
         self.operating_system = operating_system
         self.host_ip = host_ip
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanHostDetailsInfo':
-        host_start = str(json_dict['host_start'])
-        mac_address = lying_exist(json_dict, 'mac-address', str)
-        host_fqdn = lying_exist(json_dict, 'host-fqdn', str)
-        host_end = str(json_dict['host_end'])
-        operating_system = lying_exist(json_dict, 'operating-system', str)
-        host_ip = str(json_dict['host-ip'])
-
-        return NessusScanHostDetailsInfo(host_start, mac_address, host_fqdn, host_end, operating_system, host_ip)
+    _json_fields = (
+        Field('host_start', str), LyingExist('mac-address', str), LyingExist('host-fqdn', str),
+        Field('host_end', str), LyingExist('operating-system', str), Field('host-ip', str),
+    )
 
 
 class NessusScanHostCompliance(Object):
+    __slots__ = (
+        'host_id', 'hostname', 'plugin_id', 'plugin_name', 'plugin_family', 'count', 'severity_index', 'severity',
+    )
+
     def __init__(self, host_id: int, hostname: str, plugin_id: int, plugin_name: str, plugin_family: str, count: int,
                  severity_index: int, severity: int) -> None:
         self.host_id = host_id
@@ -546,22 +593,18 @@ class NessusScanHostCompliance(Object):
         self.severity_index = severity_index
         self.severity = severity
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanHostCompliance':
-        host_id = int(json_dict['host_id'])
-        hostname = str(json_dict['hostname'])
-        plugin_id = int(json_dict['plugin_id'])
-        plugin_name = str(json_dict['plugin_name'])
-        plugin_family = str(json_dict['plugin_family'])
-        count = int(json_dict['count'])
-        severity_index = int(json_dict['severity_index'])
-        severity = int(json_dict['severity'])
-
-        return NessusScanHostCompliance(host_id, hostname, plugin_id, plugin_name, plugin_family, count, severity_index,
-                                        severity)
+    _json_fields = (
+        Field('host_id', int), Field('hostname', str), Field('plugin_id', int), Field('plugin_name', str),
+        Field('plugin_family', str), Field('count', int), Field('severity_index', int), Field('severity', int),
+    )
 
 
 class NessusScanHostVulnerability(Object):
+    __slots__ = (
+        'host_id', 'hostname', 'plugin_id', 'plugin_name', 'plugin_family', 'count', 'vuln_index', 'severity_index',
+        'severity',
+    )
+
     def __init__(self, host_id: int, hostname: str, plugin_id: int, plugin_name: str, plugin_family: str, count: int,
                  vuln_index: int, severity_index: int, severity: int) -> None:
         self.host_id = host_id
@@ -574,37 +617,27 @@ class NessusScanHostVulnerability(Object):
         self.severity_index = severity_index
         self.severity = severity
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanHostVulnerability':
-        host_id = int(json_dict['host_id'])
-        hostname = str(json_dict['hostname'])
-        plugin_id = int(json_dict['plugin_id'])
-        plugin_name = str(json_dict['plugin_name'])
-        plugin_family = str(json_dict['plugin_family'])
-        count = int(json_dict['count'])
-        vuln_index = int(json_dict['vuln_index'])
-        severity_index = int(json_dict['severity_index'])
-        severity = int(json_dict['severity'])
-
-        return NessusScanHostVulnerability(host_id, hostname, plugin_id, plugin_name, plugin_family, count, vuln_index,
-                                           severity_index, severity)
+    _json_fields = (
+        Field('host_id', int), Field('hostname', str), Field('plugin_id', int), Field('plugin_name', str),
+        Field('plugin_family', str), Field('count', int), Field('vuln_index', int), Field('severity_index', int),
+        Field('severity', int),
+    )
 
 
 class NessusScanHostDetails(Object):
+    __slots__ = ('info', 'compliance', 'vulnerabilities')
+
     def __init__(self, info: NessusScanHostDetailsInfo, compliance: Iterable[NessusScanHostCompliance],
                  vulnerabilities: Iterable[NessusScanHostVulnerability]) -> None:
         self.info = info
         self.compliance = compliance
         self.vulnerabilities = vulnerabilities
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanHostDetails':
-        info = NessusScanHostDetailsInfo.from_json(json_dict['info'])
-        compliance = {NessusScanHostCompliance.from_json(compliance) for compliance in json_dict['compliance']}
-        vulnerabilities = {NessusScanHostVulnerability.from_json(vulnerability) for vulnerability in
-                           json_dict['vulnerabilities']}
-
-        return NessusScanHostDetails(info, compliance, vulnerabilities)
+    _json_fields = (
+        Field('info', NessusScanHostDetailsInfo.from_json),
+        SetOf(NessusScanHostCompliance.from_json, Field('compliance')),
+        SetOf(NessusScanHostVulnerability.from_json, Field('vulnerabilities')),
+    )
 
 
 class NessusScanPluginOutputInfoDescriptionAttributesRiskInformation(Object):
@@ -618,6 +651,10 @@ class NessusScanPluginOutputInfoDescriptionAttributesRiskInformation(Object):
       - `cvss_temporal_vector`: str
     """
 
+    __slots__ = (
+        'risk_factor', 'cvss_base_score', 'cvss_score', 'cvss_vector', 'cvss_temporal_score', 'cvss_temporal_vector',
+    )
+
     def __init__(self, risk_factor: str, cvss_base_score: Optional[float], cvss_score: Optional[float],
                  cvss_vector: Optional[str], cvss_temporal_score: Optional[float],
                  cvss_temporal_vector: Optional[str]) -> None:
@@ -628,79 +665,64 @@ class NessusScanPluginOutputInfoDescriptionAttributesRiskInformation(Object):
         self.cvss_temporal_score = cvss_temporal_score
         self.cvss_temporal_vector = cvss_temporal_vector
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) \
-            -> 'NessusScanPluginOutputInfoDescriptionAttributesRiskInformation':
-        risk_factor = str(json_dict['risk_factor'])
-        cvss_base_score = allow_to_exist(json_dict, 'cvss_base_score', float)
-        cvss_score = allow_to_exist(json_dict, 'cvss_score', float)
-        cvss_vector = allow_to_exist(json_dict, 'cvss_vector', str)
-        cvss_temporal_score = allow_to_exist(json_dict, 'cvss_temporal_score', float)
-        cvss_temporal_vector = allow_to_exist(json_dict, 'cvss_temporal_vector', str)
-
-        args = [risk_factor, cvss_base_score, cvss_score, cvss_vector, cvss_temporal_score, cvss_temporal_vector]
-        return NessusScanPluginOutputInfoDescriptionAttributesRiskInformation(*args)
+    _json_fields = (
+        Field('risk_factor', str), AllowToExist('cvss_base_score', float), AllowToExist('cvss_score', float),
+        AllowToExist('cvss_vector', str), AllowToExist('cvss_temporal_score', float),
+        AllowToExist('cvss_temporal_vector', str),
+    )
 
 
 class NessusScanPluginOutputInfoDescriptionAttributesPluginInformation(Object):
+    __slots__ = ('plugin_id', 'plugin_type', 'plugin_family', 'plugin_modification_date')
+
     def __init__(self, plugin_id: int, plugin_type: str, plugin_family: str, plugin_modification_date: str) -> None:
         self.plugin_id = plugin_id
         self.plugin_type = plugin_type
         self.plugin_family = plugin_family
         self.plugin_modification_date = plugin_modification_date
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) \
-            -> 'NessusScanPluginOutputInfoDescriptionAttributesPluginInformation':
-        plugin_id = int(json_dict['plugin_id'])
-        plugin_type = str(json_dict['plugin_type'])
-        plugin_family = str(json_dict['plugin_family'])
-        plugin_modification_date = str(json_dict['plugin_modification_date'])
-
-        return NessusScanPluginOutputInfoDescriptionAttributesPluginInformation(plugin_id, plugin_type, plugin_family,
-                                                                                plugin_modification_date)
+    _json_fields = (
+        Field('plugin_id', int), Field('plugin_type', str), Field('plugin_family', str),
+        Field('plugin_modification_date', str),
+    )
 
 
 class NessusScanPluginOutputInfoDescriptionAttributesRefInformationRefValues(Object):
+    __slots__ = ('value',)
+
     def __init__(self, value: Iterable[str]) -> None:
         self.value = value  # TODO can be tight by type
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) \
-            -> 'NessusScanPluginOutputInfoDescriptionAttributesRefInformationRefValues':
-        value = {str(value) for value in json_dict['value']}
-
-        return NessusScanPluginOutputInfoDescriptionAttributesRefInformationRefValues(value)
+    _json_fields = (
+        SetOf(str, Field('value')),
+    )
 
 
 class NessusScanPluginOutputInfoDescriptionAttributesRefInformationRef(Object):
+    __slots__ = ('name', 'values', 'url')
+
     def __init__(self, name: str, values: NessusScanPluginOutputInfoDescriptionAttributesRefInformationRefValues,
                  url: Optional[str]) -> None:
         self.name = name
         self.values = values
         self.url = url
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) \
-            -> 'NessusScanPluginOutputInfoDescriptionAttributesRefInformationRef':
-        name = str(json_dict['name'])  # TODO can be tight by enum?
-        values = NessusScanPluginOutputInfoDescriptionAttributesRefInformationRefValues.from_json(json_dict['values'])
-        url = allow_to_exist(json_dict, 'url', str)
-
-        return NessusScanPluginOutputInfoDescriptionAttributesRefInformationRef(name, values, url)
+    _json_fields = (
+        Field('name', str),  # TODO can be tight by enum?
+        Field('values', NessusScanPluginOutputInfoDescriptionAttributesRefInformationRefValues.from_json),
+        AllowToExist('url', str),
+    )
 
 
 class NessusScanPluginOutputInfoDescriptionAttributesRefInformation(Object):
+    __slots__ = ('ref',)
+
     def __init__(self, ref: Iterable[NessusScanPluginOutputInfoDescriptionAttributesRefInformationRef]) -> None:
         self.ref = ref
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) \
-            -> 'NessusScanPluginOutputInfoDescriptionAttributesRefInformation':
-        ref = {NessusScanPluginOutputInfoDescriptionAttributesRefInformationRef.from_json(ref)
-               for ref in json_dict['ref']}
-
-        return NessusScanPluginOutputInfoDescriptionAttributesRefInformation(ref)
+    _json_fields = (
+        SetOf(NessusScanPluginOutputInfoDescriptionAttributesRefInformationRef.from_json, Field('ref')),
+    )
 
 
 class NessusScanPluginOutputInfoDescriptionAttributes(Object):
@@ -709,6 +731,11 @@ class NessusScanPluginOutputInfoDescriptionAttributes(Object):
      - `ref_information` is not documented but is present
     """
 
+    __slots__ = (
+        'risk_information', 'plugin_name', 'plugin_information', 'solution', 'fname', 'synopsis', 'description',
+        'ref_information',
+    )
+
     def __init__(self, risk_information: NessusScanPluginOutputInfoDescriptionAttributesRiskInformation,
                  plugin_name: str, plugin_information: NessusScanPluginOutputInfoDescriptionAttributesPluginInformation,
                  solution: Optional[str], fname: str, synopsis: str, description: str,
@@ -722,28 +749,19 @@ class NessusScanPluginOutputInfoDescriptionAttributes(Object):
         self.description = description
         self.ref_information = ref_information
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanPluginOutputInfoDescriptionAttributes':
-        risk_information = \
-            NessusScanPluginOutputInfoDescriptionAttributesRiskInformation.from_json(json_dict['risk_information'])
-        plugin_name = str(json_dict['plugin_name'])
-        plugin_information = \
-            NessusScanPluginOutputInfoDescriptionAttributesPluginInformation.from_json(json_dict['plugin_information'])
-        if json_dict['solution'] is None:
-            solution = None
-        else:
-            solution = json_dict['solution']
-        fname = str(json_dict['fname'])
-        synopsis = str(json_dict['synopsis'])
-        description = str(json_dict['description'])
-        ref_information = allow_to_exist(json_dict, 'ref_information',
-                                         NessusScanPluginOutputInfoDescriptionAttributesRefInformation.from_json)
-
-        return NessusScanPluginOutputInfoDescriptionAttributes(risk_information, plugin_name, plugin_information,
-                                                               solution, fname, synopsis, description, ref_information)
+    _json_fields = (
+        Field('risk_information', NessusScanPluginOutputInfoDescriptionAttributesRiskInformation.from_json),
+        Field('plugin_name', str),
+        Field('plugin_information', NessusScanPluginOutputInfoDescriptionAttributesPluginInformation.from_json),
+        Field('solution'),  # can be None
+        Field('fname', str), Field('synopsis', str), Field('description', str),
+        AllowToExist('ref_information', NessusScanPluginOutputInfoDescriptionAttributesRefInformation.from_json),
+    )
 
 
 class NessusScanPluginOutputInfoDescription(Object):
+    __slots__ = ('severity', 'pluginname', 'pluginattributes', 'pluginfamily', 'pluginid')
+
     def __init__(self, severity: int, pluginname: str,
                  pluginattributes: NessusScanPluginOutputInfoDescriptionAttributes, pluginfamily: str,
                  pluginid: int) -> None:
@@ -753,15 +771,11 @@ class NessusScanPluginOutputInfoDescription(Object):
         self.pluginfamily = pluginfamily
         self.pluginid = pluginid
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanPluginOutputInfoDescription':
-        severity = int(json_dict['severity'])
-        pluginname = str(json_dict['pluginname'])
-        pluginattributes = NessusScanPluginOutputInfoDescriptionAttributes.from_json(json_dict['pluginattributes'])
-        pluginfamily = str(json_dict['pluginfamily'])
-        pluginid = int(json_dict['pluginid'])
-
-        return NessusScanPluginOutputInfoDescription(severity, pluginname, pluginattributes, pluginfamily, pluginid)
+    _json_fields = (
+        Field('severity', int), Field('pluginname', str),
+        Field('pluginattributes', NessusScanPluginOutputInfoDescriptionAttributes.from_json),
+        Field('pluginfamily', str), Field('pluginid', int),
+    )
 
 
 class Transport(Enum):
@@ -799,6 +813,8 @@ class Protocol(Enum):
 
 
 class NessusScanPluginOutputPort(Object):
+    __slots__ = ('number', 'transport', 'protocol', 'hosts')
+
     def __init__(self, number: int, transport: Transport, protocol: Optional[Protocol], hosts: Iterable[str]) -> None:
         self.number = number
         self.transport = transport
@@ -818,6 +834,8 @@ class NessusScanPluginOutputPort(Object):
 
 
 class NessusScanPluginOutput(Object):
+    __slots__ = ('plugin_output', 'hosts', 'severity', 'ports')
+
     def __init__(self, plugin_output: str, hosts: str, severity: int, ports) -> None:
         self.plugin_output = plugin_output
         self.hosts = hosts
@@ -835,14 +853,14 @@ class NessusScanPluginOutput(Object):
 
 
 class NessusScanPluginOutputInfo(Object):
+    __slots__ = ('plugindescription',)
+
     def __init__(self, plugindescription: NessusScanPluginOutputInfoDescription) -> None:
         self.plugindescription = plugindescription
 
-    @staticmethod
-    def from_json(json_dict: Mapping[str, Union[int, str, bool]]) -> 'NessusScanPluginOutputInfo':
-        plugindescription = NessusScanPluginOutputInfoDescription.from_json(json_dict['plugindescription'])
-
-        return NessusScanPluginOutputInfo(plugindescription)
+    _json_fields = (
+        Field('plugindescription', NessusScanPluginOutputInfoDescription.from_json),
+    )
 
 
 class NessusScanPluginOutputDetails(Object):
@@ -851,6 +869,8 @@ class NessusScanPluginOutputDetails(Object):
      - `outputs` is typo'ed as `output`
     """
 
+    __slots__ = ('info', 'output')
+
     def __init__(self, info: NessusScanPluginOutputInfo, output: Iterable[NessusScanPluginOutput]) -> None:
         self.info = info
         self.output = output
@@ -863,22 +883,239 @@ class NessusScanPluginOutputDetails(Object):
         return NessusScanPluginOutputDetails(info, output)
 
 
-class LibNessusScans(LibNessusBase):
+class NessusScanExportFormat(Enum):
+    nessus = 'nessus'
+    csv = 'csv'
+    html = 'html'
+    pdf = 'pdf'
+    db = 'db'
+
+
+class NessusScanIndex:
     """
-    module handling /scans
+    scans known from the previous lists, to only ask nessus for the ones modified since
+    as nessus does not tell about deleted scans, only the ones given to `forget` are removed
     """
 
-    # pylint: disable=bad-whitespace
-    def create(self, policy: NessusPolicy, name: Optional[str] = None, template: Optional[NessusTemplate] = None,
-               default_targets: Iterable[str] = ('localhost',)) -> NessusScanCreated:
+    def __init__(self) -> None:
+        self.__scans = dict()  # type: MutableMapping[int, NessusScan]
+        self.__timestamp = None  # type: Optional[int]
+
+    @property
+    def timestamp(self) -> Optional[int]:
         """
-        Creates a scan.
-        :param policy: policy to use
-        :param name: name you want for the scan
-        :param template: template will be taken from policy if not given
-        :param default_targets: need to have at least an element
-        :return: created scan
+        :return: time on nessus of the previous list, None if there was none
+        """
+        return self.__timestamp
+
+    def update(self, json: Mapping[str, Any], incremental: bool) -> Set[NessusScan]:
+        """
+        :param json: answer of nessus to the list
+        :param incremental: whether only the scans modified since `timestamp` were asked
+        :return: the listed scans, or every known scan if incremental
+        """
+        scans = {NessusScan.from_json(elem) for elem in json['scans'] or ()}
+
+        if not incremental:
+            self.__scans.clear()
+        self.__scans.update((scan.id, scan) for scan in scans)
+
+        # the server time is preferred, to not miss anything because of a clock skew
+        timestamps = [scan.last_modification_date for scan in scans] + [self.__timestamp or 0]
+        self.__timestamp = lying_exist(json, 'timestamp', int, max(timestamps))
+
+        if not incremental:
+            return scans
+        return set(self.__scans.values())
+
+    def forget(self, scan: NessusScan) -> None:
         """
+        :param scan: deleted scan
+        """
+        self.__scans.pop(scan.id, None)
+
+
+class NessusScanWaitPace:
+    """
+    when to poll again the details of a launched scan: the interval grows while the scan does not progress and follows
+    the estimated time left (from the hosts `scanprogresscurrent`/`scanprogresstotal`) when it does
+    """
+
+    def __init__(self, scan_uuid: str, timeout: Optional[float] = None, min_interval: float = 1,
+                 max_interval: float = 60,
+                 on_progress: Optional[Callable[[float, Optional[float]], None]] = None) -> None:
+        """
+        :param scan_uuid: uuid of the scan, for the errors
+        :param timeout: seconds after which NessusTimeoutError is raised, forever if not given
+        :param min_interval: minimal seconds between two polls
+        :param max_interval: maximal seconds between two polls
+        :param on_progress: called after each poll with the progress (between 0 and 1) and the estimated seconds left
+        """
+        self.scan_uuid = scan_uuid
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.on_progress = on_progress
+
+        self.__deadline = None if timeout is None else monotonic() + timeout
+        self.__interval = min_interval
+        self.__last_progress = None  # type: Optional[float]
+        self.__last_time = None  # type: Optional[float]
+
+    def next_interval(self, details: NessusScanDetails) -> Optional[float]:
+        """
+        :param details: details of the scan just polled, only `info` and `hosts` are read so they can be lazy
+        :return: seconds to wait before the next poll, None if the scan is finished
+        """
+        if NessusScanStatus(details.info.status) in TERMINAL_SCAN_STATUSES:
+            return None
+
+        now = monotonic()
+        total = sum(host.scanprogresstotal for host in details.hosts)
+        progress = sum(host.scanprogresscurrent for host in details.hosts) / total if total else 0.0
+
+        eta = None
+        if self.__last_progress is not None and progress > self.__last_progress:
+            eta = (1 - progress) * (now - self.__last_time) / (progress - self.__last_progress)
+            interval = eta / 2
+        else:
+            interval = self.__interval * 2
+        interval = self.__interval = min(max(interval, self.min_interval), self.max_interval)
+
+        if progress != self.__last_progress:
+            self.__last_progress, self.__last_time = progress, now
+        if self.on_progress is not None:
+            self.on_progress(progress, eta)
+
+        if self.__deadline is not None:
+            if now >= self.__deadline:
+                raise NessusTimeoutError('scan {} not finished after {}s'.format(self.scan_uuid, self.timeout))
+            interval = min(interval, self.__deadline - now)
+        return interval
+
+
+class NessusScanExportPace:
+    """
+    when to ask again whether an export is ready, the interval doubles from half a second up to 10 seconds
+    """
+
+    def __init__(self, scan: NessusScan, timeout: Optional[float] = None) -> None:
+        """
+        :param scan: exported scan, for the errors
+        :param timeout: seconds after which NessusTimeoutError is raised, forever if not given
+        """
+        self.scan = scan
+        self.timeout = timeout
+
+        self.__deadline = None if timeout is None else monotonic() + timeout
+        self.__interval = 0.5
+
+    def next_interval(self, file_id: int, json: Mapping[str, Any]) -> Optional[float]:
+        """
+        :param file_id: export asked
+        :param json: status of the export given by nessus
+        :return: seconds to wait before asking again, None if the export is ready
+        """
+        status = json['status']
+        if status == 'ready':
+            return None
+        if status == 'error':
+            raise NessusError('export {} of scan {} failed on nessus'.format(file_id, self.scan.id))
+
+        interval = self.__interval
+        if self.__deadline is not None and monotonic() + interval > self.__deadline:
+            raise NessusTimeoutError('export {} of scan {} not ready after {}s'.format(file_id, self.scan.id,
+                                                                                     self.timeout))
+        self.__interval = min(interval * 2, 10)
+        return interval
+
+
+class NessusPluginsOutputHarvest:
+    """
+    which plugin outputs of a scan are still to be asked, for `plugins_output`: only the hosts which reported a plugin
+    (in their `host_details`) are asked for it, and each output is also given to the other hosts listed in its ports,
+    so a host is not asked once all its instances of the plugin (the `count` of its vulnerability) are known
+    """
+
+    def __init__(self, plugin_ids: Iterable[int], hosts: Iterable[NessusScanHost]) -> None:
+        """
+        :param plugin_ids: plugins to fetch
+        :param hosts: hosts to fetch
+        """
+        self.plugin_ids = set(plugin_ids)
+        self.__by_hostname = {host.hostname: host for host in hosts}
+
+        # (host, plugin id) -> instances reported by the host, only for the plugins it has
+        self.__expected = dict()  # type: Dict[Tuple[NessusScanHost, int], int]
+        self.__errors = dict()  # type: Dict[Tuple[NessusScanHost, int], Exception]
+        # (host, plugin id) -> (output, port) -> output, an output is seen again when asking the other hosts of it
+        self.__known = defaultdict(dict)  # type: Dict[Tuple[NessusScanHost, int], Dict[Tuple, NessusScanPluginOutput]]
+        self.__pending = None  # type: Optional[Iterator[Tuple[Tuple[NessusScanHost, int], int]]]
+
+    def add_host(self, host: NessusScanHost, host_details: Union[NessusScanHostDetails, Exception]) -> None:
+        """
+        :param host: host of the scan
+        :param host_details: its details, or the error of asking them, given to each of the plugins
+        """
+        if isinstance(host_details, Exception):
+            self.__errors.update(((host, plugin_id), host_details) for plugin_id in self.plugin_ids)
+            return
+        for vulnerability in host_details.vulnerabilities:
+            if vulnerability.plugin_id in self.plugin_ids:
+                self.__expected[(host, vulnerability.plugin_id)] = vulnerability.count
+
+    def next_pair(self) -> Optional[Tuple[NessusScanHost, int]]:
+        """
+        to be called once every host is added
+        :return: next (host, plugin id) to ask, None once every output is asked or known
+        """
+        if self.__pending is None:
+            self.__pending = iter(self.__expected.items())
+        return next((pair for pair, count in self.__pending if len(self.__known[pair]) < count), None)
+
+    def add_output(self, pair: Tuple[NessusScanHost, int],
+                   output: Union[NessusScanPluginOutputDetails, Exception]) -> None:
+        """
+        :param pair: (host, plugin id) asked
+        :param output: what nessus answered, or the error of asking it
+        """
+        if isinstance(output, Exception):
+            self.__errors[pair] = output
+            return
+
+        plugin_id = pair[1]
+        for plugin_output in output.output:
+            for port in plugin_output.ports:
+                for hostname in port.hosts:
+                    known = (self.__by_hostname.get(hostname), plugin_id)
+                    if known in self.__expected:
+                        self.__known[known][(plugin_output.plugin_output, port.number, port.transport)] = \
+                            plugin_output
+
+    def outputs(self) -> Mapping[NessusScanHost, Mapping[int, Union[Set[NessusScanPluginOutput], Exception]]]:
+        """
+        :return: host -> plugin id -> outputs or error, hosts without any output for a plugin do not have it as key
+        """
+        outputs = defaultdict(dict)
+        for (host, plugin_id), by_port in self.__known.items():
+            if by_port:
+                outputs[host][plugin_id] = set(by_port.values())
+        for (host, plugin_id), error in self.__errors.items():
+            outputs[host][plugin_id] = error
+        return dict(outputs)
+
+
+class LibNessusScansRequests:
+    """
+    what is sent to nessus about the scans, shared by LibNessusScans and its asyncio flavour (see `nessus.aio`), so
+    that they only differ by how it is sent
+    """
+
+    @staticmethod
+    def _create_json(policy: NessusPolicy, name: Optional[str] = None, template: Optional[NessusTemplate] = None,
+                     default_targets: Iterable[str] = ('localhost',), normalize: bool = False) -> Mapping[str, Any]:
+        if normalize:
+            default_targets = normalize_targets(default_targets)
         if name is None:
             name = str(uuid4())
 
@@ -887,7 +1124,7 @@ class LibNessusScans(LibNessusBase):
         else:
             template_uuid = template.uuid
 
-        json = {
+        return {
             'uuid': template_uuid,
             'settings': {
                 'name': name,
@@ -897,17 +1134,138 @@ class LibNessusScans(LibNessusBase):
             },
         }
 
-        ans = self._post('scans', json=json)
+    @staticmethod
+    def _list_path(since: Optional[int] = None) -> str:
+        """
+        :param since: only list the scans modified after this time on nessus
+        """
+        if since is None:
+            return 'scans'
+        return 'scans?last_modification_date={}'.format(since)
+
+    @staticmethod
+    def _scan_path(scan: NessusScan, history_id: Optional[int] = None) -> str:
+        return LibNessusScansRequests._with_history('scans/{scan_id}'.format(scan_id=scan.id), history_id)
+
+    @staticmethod
+    def _launch_path(scan: NessusScan) -> str:
+        return 'scans/{scan_id}/launch'.format(scan_id=scan.id)
+
+    @staticmethod
+    def _launch_json(alt_targets: Optional[Iterable[str]] = None,
+                     normalize: bool = False) -> Optional[Mapping[str, Any]]:
+        if not alt_targets:
+            return None
+        return {'alt_targets': normalize_targets(alt_targets) if normalize else list(alt_targets)}
 
-        return NessusScanCreated.from_json(ans.json()['scan'])
+    @staticmethod
+    def _host_details_path(scan: NessusScan, host: NessusScanHost, history_id: Optional[int] = None) -> str:
+        url = 'scans/{scan_id}/hosts/{host_id}'.format(scan_id=scan.id, host_id=host.host_id)
+        return LibNessusScansRequests._with_history(url, history_id)
 
-    def list(self) -> Iterable[NessusScan]:
-        ans = self._get('scans')
+    @staticmethod
+    def _plugin_output_path(scan: NessusScan, host: NessusScanHost, plugin_id: int,
+                            history_id: Optional[int] = None) -> str:
+        url = 'scans/{scan_id}/hosts/{host_id}/plugins/{plugin_id}'.format(scan_id=scan.id, host_id=host.host_id,
+                                                                           plugin_id=plugin_id)
+        return LibNessusScansRequests._with_history(url, history_id)
 
-        if ans.json()['scans'] is None:
-            return set()
+    @staticmethod
+    def _with_history(url: str, history_id: Optional[int]) -> str:
+        if history_id is None:
+            return url
+        return '{}?history_id={}'.format(url, history_id)
 
-        return {NessusScan.from_json(elem) for elem in ans.json()['scans']}
+    @staticmethod
+    def _details_type(lazy: bool) -> type:
+        return NessusScanLazyDetails if lazy else NessusScanDetails
+
+    @staticmethod
+    def _scan_by_uuid(scans: Iterable[NessusScan], scan_uuid: str) -> NessusScan:
+        scan = next((s for s in scans if s.uuid == scan_uuid), None)
+        if scan is None:
+            raise NessusError('no scan with the uuid {}'.format(scan_uuid))
+        return scan
+
+    @staticmethod
+    def _export_path(scan: NessusScan) -> str:
+        return 'scans/{scan_id}/export'.format(scan_id=scan.id)
+
+    @staticmethod
+    def _export_status_path(scan: NessusScan, file_id: int) -> str:
+        return 'scans/{scan_id}/export/{file_id}/status'.format(scan_id=scan.id, file_id=file_id)
+
+    @staticmethod
+    def _export_download_path(scan: NessusScan, file_id: int) -> str:
+        return 'scans/{scan_id}/export/{file_id}/download'.format(scan_id=scan.id, file_id=file_id)
+
+    @staticmethod
+    @contextmanager
+    def _partial_file(destination: str) -> Iterator[IO[bytes]]:
+        """
+        :return: opened file where to download a report, moved to `destination` once complete and removed on failure,
+                 so that a failed download does not leave a partial report there
+        """
+        temporary = '{}.{}.part'.format(destination, os.getpid())
+        try:
+            with open(temporary, 'wb') as io:
+                yield io
+            os.replace(temporary, destination)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+
+class LibNessusScans(LibNessusBase, LibNessusScansRequests):
+    """
+    module handling /scans
+    """
+
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str,
+                 transport: Optional[NessusTransport] = None,
+                 result_cache: Optional[NessusResultCache] = None) -> None:
+        """
+        :param result_cache: where to keep the results of finished scans, nothing is kept if not given
+        """
+        super().__init__(host, port, api_access_key, api_secret_key, transport)
+
+        self.__result_cache = result_cache
+
+        # scans known from previous `list`, to only ask for the modified ones
+        self.__index = NessusScanIndex()
+        self.__index_lock = Lock()
+
+    # pylint: disable=bad-whitespace
+    def create(self, policy: NessusPolicy, name: Optional[str] = None, template: Optional[NessusTemplate] = None,
+               default_targets: Iterable[str] = ('localhost',), normalize: bool = False) -> NessusScanCreated:
+        """
+        Creates a scan.
+        :param policy: policy to use
+        :param name: name you want for the scan
+        :param template: template will be taken from policy if not given
+        :param default_targets: need to have at least an element
+        :param normalize: merge the targets in the fewest networks first (see `normalize_targets`), which reorders
+                          them: the addresses sorted, the hostnames last
+        :return: created scan
+        """
+        created = self._post('scans', json=self._create_json(policy, name, template, default_targets,
+                                                              normalize))
+
+        return NessusScanCreated.from_json(created['scan'])
+
+    def list(self, incremental: bool = False) -> Iterable[NessusScan]:
+        """
+        Returns the scan list.
+        in incremental mode, only the scans modified since the previous call are asked to nessus and merged in the
+        scans already known, as nessus does not tell about deleted scans, only the ones deleted through `delete` are
+        removed, use a non incremental call from time to time to drop the others
+        :param incremental: only fetch what was modified since the previous call
+        :return: iterable of the scans
+        """
+        with self.__index_lock:
+            since = self.__index.timestamp if incremental else None
+            return self.__index.update(self._get(self._list_path(since)), since is not None)
 
     def delete(self, scan: NessusScan) -> None:
         """
@@ -915,33 +1273,271 @@ class LibNessusScans(LibNessusBase):
         Scans in running, paused or stopping states can not be deleted.
         :param scan: the soon-to-be-deleted
         """
-        url = 'scans/{}'.format(scan.id)
-        self._delete(url)
+        self._delete(self._scan_path(scan))
 
-    def launch(self, scan: NessusScan, alt_targets: Optional[Iterable[str]] = None) -> str:
+        with self.__index_lock:
+            self.__index.forget(scan)
+
+    def launch(self, scan: NessusScan, alt_targets: Optional[Iterable[str]] = None, normalize: bool = False) -> str:
         """
         Launches a scan.
         :param scan: the soon-to-be-launch
         :param alt_targets: target to scan, if not given, default to the one set during scan creation
+        :param normalize: merge the targets in the fewest networks first (see `create`)
         :return: uuid of the launched scan
         """
-        url = 'scans/{scan_id}/launch'.format(scan_id=scan.id)
-        json = alt_targets and {'alt_targets': alt_targets}
-        ans = self._post(url, json=json)
-        return ans.json()['scan_uuid']
+        launched = self._post(self._launch_path(scan), json=self._launch_json(alt_targets, normalize))
+        return launched['scan_uuid']
 
-    def details(self, scan: NessusScan) -> NessusScanDetails:
-        url = 'scans/{scan_id}'.format(scan_id=scan.id)
-        ans = self._get(url)
-        return NessusScanDetails.from_json(ans.json())
+    def details(self, scan: NessusScan, history_id: Optional[int] = None, lazy: bool = False) -> NessusScanDetails:
+        """
+        Returns details for the given scan.
+        :param scan: scan to look at, served from the result cache if it is finished
+        :param history_id: run of the scan to look at, default to the latest one
+        :param lazy: only parse each section on first access (see NessusScanLazyDetails)
+        :return: details of the scan
+        """
+        def fetch() -> NessusScanDetails:
+            return self.__fetch_details(scan, history_id, lazy)
 
-    def host_details(self, scan: NessusScan, host: NessusScanHost) -> NessusScanHostDetails:
-        url = 'scans/{scan_id}/hosts/{host_id}'.format(scan_id=scan.id, host_id=host.host_id)
-        ans = self._get(url)
-        return NessusScanHostDetails.from_json(ans.json())
+        return self.__cached(scan, history_id, 'lazy_details' if lazy else 'details', '', fetch)
 
-    def plugin_output(self, scan: NessusScan, host: NessusScanHost, plugin_id: int) -> NessusScanPluginOutputDetails:
-        url = 'scans/{scan_id}/hosts/{host_id}/plugins/{plugin_id}'.format(scan_id=scan.id, host_id=host.host_id,
-                                                                           plugin_id=plugin_id)
-        ans = self._get(url)
-        return NessusScanPluginOutputDetails.from_json(ans.json())
+    def __fetch_details(self, scan: NessusScan, history_id: Optional[int] = None,
+                        lazy: bool = False) -> NessusScanDetails:
+        return self._details_type(lazy).from_json(self._get(self._scan_path(scan, history_id)))
+
+    def host_details(self, scan: NessusScan, host: NessusScanHost,
+                     history_id: Optional[int] = None) -> NessusScanHostDetails:
+        """
+        Returns details for the given host.
+        :param scan: scan to look at, served from the result cache if it is finished
+        :param host: host of the scan to look at
+        :param history_id: run of the scan to look at, default to the latest one
+        :return: details of the host
+        """
+        def fetch() -> NessusScanHostDetails:
+            return NessusScanHostDetails.from_json(self._get(self._host_details_path(scan, host, history_id)))
+
+        return self.__cached(scan, history_id, 'host_details', str(host.host_id), fetch)
+
+    def plugin_output(self, scan: NessusScan, host: NessusScanHost, plugin_id: int,
+                      history_id: Optional[int] = None) -> NessusScanPluginOutputDetails:
+        """
+        Returns the output for a given plugin.
+        :param scan: scan to look at, served from the result cache if it is finished
+        :param host: host of the scan to look at
+        :param plugin_id: plugin which generated the output
+        :param history_id: run of the scan to look at, default to the latest one
+        :return: output of the plugin
+        """
+        def fetch() -> NessusScanPluginOutputDetails:
+            url = self._plugin_output_path(scan, host, plugin_id, history_id)
+            return NessusScanPluginOutputDetails.from_json(self._get(url))
+
+        return self.__cached(scan, history_id, 'plugin_output', '{}/{}'.format(host.host_id, plugin_id), fetch)
+
+    def __cached(self, scan: NessusScan, history_id: Optional[int], kind: str, item: str, fetch: Callable[[], T]) -> T:
+        """
+        only the results of scans known to be finished are cached, as the others can still change
+        """
+        if self.__result_cache is None or getattr(scan, 'status', None) not in TERMINAL_SCAN_STATUSES:
+            return fetch()
+
+        return self.__result_cache.get_or_fetch(scan.id, history_id, scan.last_modification_date, kind, item, fetch)
+
+    def all_host_details(self, scan: NessusScan, max_workers: int = 10,
+                         hosts: Optional[Iterable[NessusScanHost]] = None) \
+            -> Iterator[Tuple[NessusScanHost, Union[NessusScanHostDetails, Exception]]]:
+        """
+        Fetch the details of every host of a scan, with at most `max_workers` requests in flight.
+        a failing host does not abort the batch, its error is given in place of the details
+        :param scan: scan to harvest
+        :param max_workers: number of concurrent requests, should not be greater than the pool size of the transport
+        :param hosts: hosts to fetch, default to every host of the scan
+        :return: (host, details or error) as soon as they are completed
+        """
+        if hosts is None:
+            hosts = self.details(scan).hosts
+
+        pending_hosts = iter(hosts)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = dict()
+
+            def submit_next() -> None:
+                host = next(pending_hosts, None)
+                if host is not None:
+                    running[executor.submit(self.host_details, scan, host)] = host
+
+            for _ in range(max_workers):
+                submit_next()
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host = running.pop(future)
+                    submit_next()
+
+                    try:
+                        yield host, future.result()
+                    except (NessusError, requests.RequestException) as error:
+                        yield host, error
+
+    def plugins_output(self, scan: NessusScan, plugin_ids: Iterable[int],
+                       hosts: Optional[Iterable[NessusScanHost]] = None, max_workers: int = 10) \
+            -> Mapping[NessusScanHost, Mapping[int, Union[Set[NessusScanPluginOutput], Exception]]]:
+        """
+        Fetch the outputs of the given plugins for every host of a scan, with at most `max_workers` requests in flight.
+        only the hosts which reported a plugin are asked for it (see NessusPluginsOutputHarvest)
+        a failing request does not abort the harvest, its error is given in place of the outputs of its host and plugin
+        :param scan: scan to harvest
+        :param plugin_ids: plugins to fetch
+        :param hosts: hosts to fetch, default to every host of the scan
+        :param max_workers: number of concurrent requests, should not be greater than the pool size of the transport
+        :return: host -> plugin id -> outputs or error, hosts without any output for a plugin do not have it as key
+        """
+        if hosts is None:
+            hosts = self.details(scan).hosts
+        hosts = list(hosts)
+        harvest = NessusPluginsOutputHarvest(plugin_ids, hosts)
+        for host, host_details in self.all_host_details(scan, max_workers, hosts):
+            harvest.add_host(host, host_details)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = dict()
+
+            def submit_next() -> None:
+                pair = harvest.next_pair()
+                if pair is not None:
+                    running[executor.submit(self.plugin_output, scan, *pair)] = pair
+
+            for _ in range(max_workers):
+                submit_next()
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pair = running.pop(future)
+                    try:
+                        harvest.add_output(pair, future.result())
+                    except (NessusError, requests.RequestException) as error:
+                        harvest.add_output(pair, error)
+                    submit_next()
+
+        return harvest.outputs()
+
+    def wait(self, scan_uuid: str, timeout: Optional[float] = None, min_interval: float = 1,
+             max_interval: float = 60, on_progress: Optional[Callable[[float, Optional[float]], None]] = None) \
+            -> NessusScan:
+        """
+        Wait for a launched scan to be in one of TERMINAL_SCAN_STATUSES.
+        only the details of the scan are polled, as often as NessusScanWaitPace tells, and only their `info` and `hosts`
+        are parsed
+        :param scan_uuid: uuid given by `launch`
+        :param timeout: seconds after which NessusTimeoutError is raised, wait forever if not given
+        :param min_interval: minimal seconds between two polls
+        :param max_interval: maximal seconds between two polls
+        :param on_progress: called after each poll with the progress (between 0 and 1) and the estimated seconds left
+        :return: the scan in its final state
+        """
+        pace = NessusScanWaitPace(scan_uuid, timeout, min_interval, max_interval, on_progress)
+        scan = self.__scan_by_uuid(scan_uuid)
+
+        while True:
+            # never from the result cache, the scan listed before the launch can look finished, and lazy as the pace
+            # only looks at `info` and `hosts`
+            interval = pace.next_interval(self.__fetch_details(scan, lazy=True))
+            if interval is None:
+                return self.__scan_by_uuid(scan_uuid)
+            sleep(interval)
+
+    def __scan_by_uuid(self, scan_uuid: str) -> NessusScan:
+        return self._scan_by_uuid(self.list(), scan_uuid)
+
+    def create_sharded(self, policy: NessusPolicy, targets: Iterable[str], shards: int, name: Optional[str] = None,
+                       template: Optional[NessusTemplate] = None) -> Sequence[NessusScanCreated]:
+        """
+        Creates a scan per chunk of the targets, each with the same number of hosts (see `shard_targets`), so that a
+        large network is scanned in parallel instead of by a single long scan.
+        :param policy: policy to use
+        :param targets: every target to scan
+        :param shards: number of scans wanted, less are created if there is not enough hosts
+        :param name: name of the scans, suffixed by their position
+        :param template: template will be taken from policy if not given
+        :return: created scans, in the order of the normalized targets
+        """
+        if name is None:
+            name = str(uuid4())
+
+        chunks = shard_targets(normalize_targets(targets), shards)
+        return [self.create(policy, name='{} [{}/{}]'.format(name, index, len(chunks)), template=template,
+                            default_targets=chunk)
+                for index, chunk in enumerate(chunks, start=1)]
+
+    def merged_details(self, scans: Iterable[NessusScan], max_workers: int = 10) -> NessusScanDetails:
+        """
+        Returns the details of the shards of a scan, as a single one (see `NessusScanDetails.merge`, the hosts keep the
+        `host_id` of their shard).
+        :param scans: shards, as given by `create_sharded`, or by `wait` to use the result cache
+        :param max_workers: number of concurrent requests, should not be greater than the pool size of the transport
+        :return: details of the whole
+        """
+        scans = list(scans)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(scans)))) as executor:
+            return NessusScanDetails.merge(list(executor.map(self.details, scans)))
+
+    def run_sharded(self, policy: NessusPolicy, targets: Iterable[str], shards: int, name: Optional[str] = None,
+                    template: Optional[NessusTemplate] = None, timeout: Optional[float] = None,
+                    **kwargs) -> NessusScanDetails:
+        """
+        Creates the shards of a scan (see `create_sharded`), launches them all, waits for them to finish and returns
+        their merged details.
+        :param timeout: seconds after which NessusTimeoutError is raised, for the whole, wait forever if not given
+        :param kwargs: as `wait`
+        :return: details of the whole
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+
+        uuids = [self.launch(scan) for scan in self.create_sharded(policy, targets, shards, name, template)]
+        finished = [self.wait(scan_uuid, timeout=None if deadline is None else max(0, deadline - monotonic()),
+                              **kwargs)
+                    for scan_uuid in uuids]
+        return self.merged_details(finished)
+
+    def export(self, scan: NessusScan, destination: Union[str, IO[bytes]],
+               format: NessusScanExportFormat = NessusScanExportFormat.nessus, timeout: Optional[float] = None,
+               chunk_size: int = 1 << 20) -> int:
+        """
+        Export the given scan and download the report.
+        the report is streamed in chunks to the destination, never being fully held in memory
+        :param scan: scan to export
+        :param destination: path or opened binary file where to write the report, a path is only written once the
+                            whole report is downloaded
+        :param format: format of the report
+        :param timeout: seconds after which NessusTimeoutError is raised if the report is still not ready
+        :param chunk_size: bytes read from the network at once
+        :return: number of bytes written
+        """
+        # pylint: disable=redefined-builtin
+        pace = NessusScanExportPace(scan, timeout)
+        file_id = self._post(self._export_path(scan), json={'format': format.value})['file']
+
+        while True:
+            interval = pace.next_interval(file_id, self._get(self._export_status_path(scan, file_id)))
+            if interval is None:
+                break
+            sleep(interval)
+
+        url = self._export_download_path(scan, file_id)
+        if not isinstance(destination, str):
+            return self.__download(url, destination, chunk_size)
+
+        with self._partial_file(destination) as io:
+            return self.__download(url, io, chunk_size)
+
+    def __download(self, url: str, io: IO[bytes], chunk_size: int) -> int:
+        written = 0
+        with self._stream(url) as ans:
+            for chunk in ans.iter_content(chunk_size=chunk_size):
+                io.write(chunk)
+                written += len(chunk)
+        return written
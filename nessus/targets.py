@@ -0,0 +1,231 @@
+"""
+handling of the scan targets, as given in `text_targets`: addresses, networks ('10.0.0.0/16'), ranges
+('10.0.0.1-10.0.0.9' or '10.0.0.1-9') and hostnames
+"""
+import sys
+from array import array
+from functools import partial
+from ipaddress import ip_address, ip_network, IPv4Address, IPv6Address
+from itertools import compress, islice, repeat
+from operator import gt, sub
+from socket import inet_pton, inet_ntop, AF_INET
+
+from typing import Iterable, Iterator, List, Tuple, Union, MutableMapping
+
+# the addresses from `first` to `last` included, as integers, of the given IP version
+_Range = Tuple[int, int, int]
+
+_pack_ipv4 = partial(inet_pton, AF_INET)
+
+
+def _parse(target: str) -> Union[_Range, str]:
+    """
+    :return: range of the addresses, or the target itself when it is a hostname
+    """
+    try:
+        if '-' in target:
+            first, last = target.split('-', 1)
+            first = ip_address(first.strip())
+            last = last.strip()
+            if isinstance(first, IPv4Address) and last.isdigit() and int(last) <= 0xff:
+                # '10.0.0.1-9' only changes the last byte
+                last = (int(first) & ~0xff) | int(last)
+            else:
+                last = int(ip_address(last))
+            if last < int(first):
+                # let nessus tell what it thinks of it
+                return target
+            return int(first), last, first.version
+
+        network = ip_network(target, strict=False)
+        return int(network.network_address), int(network.broadcast_address), network.version
+    except ValueError:
+        return target
+
+
+def _format(first: int, last: int, version: int) -> str:
+    address = IPv4Address if version == 4 else IPv6Address
+    if first == last:
+        return str(address(first))
+
+    size = last - first + 1
+    if size & (size - 1) == 0 and first % size == 0:
+        # a whole network
+        return '{}/{}'.format(address(first), address(first).max_prefixlen - size.bit_length() + 1)
+    return '{}-{}'.format(address(first), address(last))
+
+
+def count_hosts(targets: Iterable[str]) -> int:
+    """
+    :param targets: targets of a scan
+    :return: number of hosts to scan, a hostname counting for one
+    """
+    count = 0
+    for target in targets:
+        parsed = _parse(target)
+        count += 1 if isinstance(parsed, str) else parsed[1] - parsed[0] + 1
+    return count
+
+
+def iter_hosts(targets: Iterable[str]) -> Iterator[str]:
+    """
+    :param targets: targets of a scan
+    :return: every host to scan, in order: each address of the networks and ranges, the hostnames as given
+    """
+    for target in targets:
+        parsed = _parse(target)
+        if isinstance(parsed, str):
+            yield parsed
+            continue
+
+        first, last, version = parsed
+        address = IPv4Address if version == 4 else IPv6Address
+        for value in range(first, last + 1):
+            yield str(address(value))
+
+
+def shard_targets(targets: Iterable[str], shards: int) -> List[List[str]]:
+    """
+    Split targets in chunks of the same number of hosts (give or take one), to scan them in parallel.
+    the targets are kept in order, the networks and ranges larger than what is left in a chunk are cut, only the
+    hostnames are never cut
+    :param targets: targets of a scan
+    :param shards: number of chunks wanted, less are given if there is not enough hosts
+    :return: targets of each chunk
+    """
+    assert shards > 0
+
+    parsed = [(target, _parse(target)) for target in targets]
+    total = sum(1 if isinstance(p, str) else p[1] - p[0] + 1 for _, p in parsed)
+    if total == 0:
+        return []
+    shards = min(shards, total)
+    base, extra = divmod(total, shards)
+
+    chunks = [[]]  # type: List[List[str]]
+    left = base + (extra > 0)
+
+    def next_chunk() -> None:
+        nonlocal left
+        if left == 0 and len(chunks) < shards:
+            chunks.append([])
+            left = base + (len(chunks) <= extra)
+
+    for target, item in parsed:
+        if isinstance(item, str):
+            next_chunk()
+            chunks[-1].append(target)
+            left -= 1
+            continue
+
+        first, last, version = item
+        while first <= last:
+            next_chunk()
+            # the last chunk takes everything left, as the hostnames can make it overflow
+            end = last if len(chunks) == shards else min(last, first + left - 1)
+            if (first, end) == item[:2]:
+                chunks[-1].append(target)
+            else:
+                chunks[-1].append(_format(first, end, version))
+            left -= end - first + 1
+            first = end + 1
+
+    return chunks
+
+
+def _networks(first: int, last: int, version: int) -> Iterable[str]:
+    """
+    :return: the fewest networks covering exactly the addresses from `first` to `last`
+    """
+    bits = 32 if version == 4 else 128
+    while first <= last:
+        # largest block aligned on `first` which does not go past `last`
+        size = first & -first or 1 << bits
+        while size > last - first + 1:
+            size >>= 1
+        address = _ipv4(first) if version == 4 else str(IPv6Address(first))
+        yield address if size == 1 else '{}/{}'.format(address, bits - size.bit_length() + 1)
+        first += size
+
+
+def _ipv4(address: int) -> str:
+    return inet_ntop(AF_INET, address.to_bytes(4, 'big'))
+
+
+def normalize_targets(targets: Iterable[str]) -> List[str]:
+    """
+    Dedupe the targets and merge the overlapping and adjacent addresses, networks and ranges in the fewest networks,
+    so that nessus gets a short `text_targets` instead of, say, every address of an inventory one by one.
+    the addresses come first, IPv4 then IPv6, sorted, the hostnames follow in their given order
+    it is not free on large lists, a million IPv4 addresses taking about 1.5s when they form a shuffled /12 and
+    about 3s when scattered over the whole space (single, slow core), mostly sorting and formatting them
+    :param targets: targets of a scan
+    :return: equivalent targets
+    """
+    targets = list(targets)
+    ranges = list()  # type: List[_Range]
+    hostnames = dict()  # type: MutableMapping[str, None]
+
+    # most targets of large lists are single IPv4 addresses, they are packed without going through `ipaddress`
+    try:
+        packed = b''.join(map(_pack_ipv4, targets))
+    except OSError:
+        packed_list = list()  # type: List[bytes]
+        for target in targets:
+            try:
+                packed_list.append(_pack_ipv4(target))
+                continue
+            except OSError:
+                pass
+            target = target.strip()
+            if not target:
+                continue
+            parsed = _parse(target)
+            if isinstance(parsed, str):
+                hostnames[parsed] = None
+            else:
+                ranges.append(parsed)
+        packed = b''.join(packed_list)
+
+    addresses = array('L' if array('I').itemsize < 4 else 'I')
+    addresses.frombytes(packed)
+    if sys.byteorder == 'little':
+        addresses.byteswap()
+    addresses = sorted(addresses)
+
+    normalized = list()  # type: List[str]
+    if addresses:
+        # where the runs of consecutive addresses start and end, the duplicates being in the same run
+        starts = [0]
+        starts.extend(compress(range(1, len(addresses)),
+                               map(gt, map(sub, islice(addresses, 1, None), addresses), repeat(1))))
+        ends = [start - 1 for start in islice(starts, 1, None)]
+        ends.append(len(addresses) - 1)
+        firsts = map(addresses.__getitem__, starts)
+        lasts = map(addresses.__getitem__, ends)
+
+        if not ranges:
+            # the runs are already disjoint and not adjacent
+            for first, last in zip(firsts, lasts):
+                if first == last:
+                    normalized.append(_ipv4(first))
+                else:
+                    normalized.extend(_networks(first, last, 4))
+            normalized.extend(hostnames)
+            return normalized
+
+        ranges.extend(zip(firsts, lasts, repeat(4)))
+
+    if ranges:
+        ranges.sort(key=lambda item: (item[2], item[0]))
+        first, last, version = ranges[0]
+        for item in islice(ranges, 1, None):
+            if item[2] == version and item[0] <= last + 1:
+                last = max(last, item[1])
+                continue
+            normalized.extend(_networks(first, last, version))
+            first, last, version = item
+        normalized.extend(_networks(first, last, version))
+
+    normalized.extend(hostnames)
+    return normalized
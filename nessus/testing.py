@@ -0,0 +1,899 @@
+"""
+a local stand-in for nessus, answering the requests of this library with the json it parses, to benchmark and load
+test the clients offline, for example: `with NessusMockServer(latency=0.01) as server: nessus = server.client()`
+or from a shell: `python -m nessus.testing --port 8834`
+the scans are run by the clock, for `scan_duration` seconds after their launch, with a host per address of their
+targets (up to `max_hosts`, so '10.0.0.0/16' gives 65536 hosts), their results are made up but always the same for the
+same seed
+"""
+import csv
+import io
+import json
+import logging
+import re
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from ipaddress import ip_address, IPv4Address
+from itertools import islice
+from random import Random
+from socketserver import ThreadingMixIn
+from threading import Lock, Thread
+from time import sleep, time
+from urllib.parse import urlsplit, parse_qsl
+from uuid import uuid4, uuid5, NAMESPACE_URL
+from xml.sax.saxutils import escape, quoteattr
+
+from typing import Optional, Mapping, MutableMapping, List, Tuple, Iterator, Iterable, Union, Callable, Any, Match, \
+    Sequence, Set
+
+from nessus import LibNessus
+from nessus.codec import decode
+from nessus.targets import iter_hosts
+
+# what a handler answers: a json body, a raw body, or chunks of a body sent as they come
+_Body = Union[Mapping[str, Any], bytes, Iterator[bytes]]
+
+# (name, title) of the templates, for scans and policies alike
+_TEMPLATES = (
+    ('basic', 'Basic Network Scan'),
+    ('discovery', 'Host Discovery'),
+    ('advanced', 'Advanced Scan'),
+    ('webapp', 'Web Application Tests'),
+)
+
+FIRST_PLUGIN_ID = 10000
+
+_FAMILIES = ('General', 'Web Servers', 'Windows', 'Service detection', 'Databases', 'Misc.')
+# (port, transport, service) a plugin is reporting on
+_SERVICES = ((0, 'tcp', ''), (22, 'tcp', 'ssh'), (80, 'tcp', 'www'), (443, 'tcp', 'www'), (445, 'tcp', 'smb'),
+             (25, 'tcp', 'smtp'), (53, 'udp', 'dns'))
+# severity by plugin id, most findings being informational as on a real network
+_SEVERITIES = (0, 0, 0, 1, 2, 2, 3, 4)
+_RISKS = ('None', 'Low', 'Medium', 'High', 'Critical')
+_OPERATING_SYSTEMS = ('Linux Kernel 5.15', 'Microsoft Windows Server 2019', 'FreeBSD 13.2', 'Cisco IOS 15.2')
+
+# where the addresses of the hosts given by name are made up
+_NAMED_HOSTS_NETWORK = int(IPv4Address('198.18.0.0'))
+
+
+class NessusMockError(Exception):
+    """
+    answered as nessus does, with the message in the 'error' field of the json
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _MockPlugin:
+    """
+    made up plugin, everything derived from its id
+    """
+
+    def __init__(self, plugin_id: int) -> None:
+        self.id = plugin_id
+        self.name = 'Synthetic check {}'.format(plugin_id)
+        self.family = _FAMILIES[plugin_id % len(_FAMILIES)]
+        self.severity = _SEVERITIES[plugin_id % len(_SEVERITIES)]
+        self.port, self.transport, self.service = _SERVICES[plugin_id % len(_SERVICES)]
+
+    @property
+    def port_key(self) -> str:
+        return '{} / {} / {}'.format(self.port, self.transport, self.service)
+
+    @property
+    def output(self) -> str:
+        return 'Synthetic finding of plugin {}, the same on every host.'.format(self.id)
+
+    def has_own_output(self, host_id: int) -> bool:
+        """
+        :return: whether the host also has an output of its own, besides the one shared by every host
+        """
+        return (host_id + self.id) % 3 == 0
+
+    def own_output(self, hostname: str) -> str:
+        return 'Synthetic finding of plugin {}, only on {}.'.format(self.id, hostname)
+
+
+class _MockRun:
+    """
+    a launch of a scan, its results are made up once it is completed
+    """
+
+    def __init__(self, history_id: int, uuid: str, targets: Sequence[str], started: float, duration: float) -> None:
+        self.history_id = history_id
+        self.uuid = uuid
+        self.targets = targets
+        self.started = started
+        self.duration = duration
+
+        self.lock = Lock()
+        self.hostnames = None  # type: Optional[List[str]]
+        # plugin ids found on each host, by host_id - 1
+        self.plugins_by_host = None  # type: Optional[List[Tuple[int, ...]]]
+        # host ids on which each plugin was found
+        self.hosts_by_plugin = None  # type: Optional[Mapping[int, List[int]]]
+        # encoded details once completed, without the history which can still grow
+        self.details = None  # type: Optional[bytes]
+
+    def progress(self, now: float) -> float:
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (now - self.started) / self.duration))
+
+    def status(self, now: float) -> str:
+        return 'completed' if self.progress(now) >= 1 else 'running'
+
+    @property
+    def ended(self) -> float:
+        return self.started + max(self.duration, 0)
+
+    def last_modification_date(self, now: float) -> int:
+        return int(self.ended if self.status(now) == 'completed' else self.started)
+
+    def to_json(self, now: float) -> Mapping[str, Any]:
+        return {
+            'history_id': self.history_id,
+            'uuid': self.uuid,
+            'owner_id': 1,
+            'status': self.status(now),
+            'creation_date': int(self.started),
+            'last_modification_date': self.last_modification_date(now),
+        }
+
+
+class _MockScan:
+    """
+    a scan of the mock, with its runs
+    """
+
+    def __init__(self, scan_id: int, uuid: str, name: str, policy_id: int, targets: Sequence[str],
+                 created: float) -> None:
+        self.id = scan_id
+        self.uuid = uuid
+        self.name = name
+        self.policy_id = policy_id
+        self.targets = targets
+        self.created = created
+        self.runs = list()  # type: List[_MockRun]
+
+    def status(self, now: float) -> str:
+        return self.runs[-1].status(now) if self.runs else 'empty'
+
+    def last_modification_date(self, now: float) -> int:
+        return self.runs[-1].last_modification_date(now) if self.runs else int(self.created)
+
+    def to_json(self, now: float) -> Mapping[str, Any]:
+        return {
+            'id': self.id,
+            'uuid': self.runs[-1].uuid if self.runs else self.uuid,
+            'name': self.name,
+            'type': None,
+            'owner': 'nessus',
+            'enabled': False,
+            'folder_id': 3,
+            'read': False,
+            'status': self.status(now),
+            'shared': False,
+            'user_permissions': 128,
+            'creation_date': int(self.created),
+            'last_modification_date': self.last_modification_date(now),
+            'control': True,
+            'starttime': '',
+            'timezone': '',
+            'rrules': '',
+            'use_dashboard': False,
+        }
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class NessusMockServer:
+    """
+    answers over http the endpoints used by the clients: editor templates, policies, file upload, scans and their
+    launch, details, hosts, plugins outputs and exports (as .nessus or csv)
+    everything is kept in memory, the details of a completed run are encoded once, so that what is measured is the
+    client and not the mock
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, api_access_key: str = 'access',
+                 api_secret_key: str = 'secret', latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 scan_duration: float = 1.0, max_hosts: int = 65536, vulnerabilities_per_host: int = 10,
+                 plugins: int = 500, seed: int = 0) -> None:
+        """
+        :param host: address to listen on, only local by default
+        :param port: port to listen on, 0 for any free one (see `port` once started)
+        :param api_access_key: access key expected from the clients
+        :param api_secret_key: secret key expected from the clients
+        :param latency: seconds waited before answering any request
+        :param jitter: up to this many seconds are randomly added to the latency
+        :param error_rate: part of the requests answered by an internal server error, between 0 and 1
+        :param scan_duration: seconds a scan is running after its launch
+        :param max_hosts: hosts of a scan at most, the addresses of its targets past it are not scanned
+        :param vulnerabilities_per_host: plugins found on each host
+        :param plugins: number of distinct plugins which can be found
+        :param seed: what the results and the failures are made up from
+        """
+        assert 0 <= error_rate <= 1
+        assert 0 < vulnerabilities_per_host <= plugins
+
+        self.host = host
+        self.api_access_key = api_access_key
+        self.api_secret_key = api_secret_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.scan_duration = scan_duration
+        self.max_hosts = max_hosts
+        self.vulnerabilities_per_host = vulnerabilities_per_host
+        self.seed = seed
+
+        self.__plugins = {plugin.id: plugin for plugin in map(_MockPlugin, range(FIRST_PLUGIN_ID,
+                                                                                 FIRST_PLUGIN_ID + plugins))}
+        self.__plugin_ids = sorted(self.__plugins)
+
+        self.__lock = Lock()
+        self.__random = Random(seed)
+        self.__next_id = 1
+        self.__policies = dict()  # type: MutableMapping[int, MutableMapping[str, Any]]
+        self.__scans = dict()  # type: MutableMapping[int, _MockScan]
+        self.__files = set()  # type: Set[str]
+        # file id -> (run, format)
+        self.__exports = dict()  # type: MutableMapping[int, Tuple[_MockRun, str]]
+
+        self.__routes = [(method, re.compile(pattern), handler) for method, pattern, handler in (
+            ('GET', r'editor/(scan|policy)/templates', self.__templates),
+            ('GET', r'policies', self.__list_policies),
+            ('POST', r'policies', self.__create_policy),
+            ('POST', r'policies/import', self.__import_policy),
+            ('DELETE', r'policies/(\d+)', self.__delete_policy),
+            ('POST', r'file/upload', self.__upload),
+            ('GET', r'scans', self.__list_scans),
+            ('POST', r'scans', self.__create_scan),
+            ('DELETE', r'scans/(\d+)', self.__delete_scan),
+            ('POST', r'scans/(\d+)/launch', self.__launch),
+            ('GET', r'scans/(\d+)', self.__details),
+            ('GET', r'scans/(\d+)/hosts/(\d+)', self.__host_details),
+            ('GET', r'scans/(\d+)/hosts/(\d+)/plugins/(\d+)', self.__plugin_output),
+            ('POST', r'scans/(\d+)/export', self.__export),
+            ('GET', r'scans/(\d+)/export/(\d+)/status', self.__export_status),
+            ('GET', r'scans/(\d+)/export/(\d+)/download', self.__download),
+        )]  # type: List[Tuple[str, Any, Callable[..., _Body]]]
+
+        self.__server = _ThreadingHTTPServer((host, port), self.__handler())
+        self.__thread = None  # type: Optional[Thread]
+
+    @property
+    def port(self) -> int:
+        """
+        :return: port listened on, the one chosen if 0 was given
+        """
+        return self.__server.server_address[1]
+
+    def start(self) -> 'NessusMockServer':
+        """
+        serve from a daemon thread
+        """
+        if self.__thread is None:
+            self.__thread = Thread(target=self.__server.serve_forever, name='nessus-mock', daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        stop serving and close the socket, the server can not be started again
+        """
+        if self.__thread is not None:
+            self.__server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__server.server_close()
+
+    def serve_forever(self) -> None:
+        """
+        serve from the calling thread, until interrupted
+        """
+        try:
+            self.__server.serve_forever()
+        finally:
+            self.__server.server_close()
+
+    def __enter__(self) -> 'NessusMockServer':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def client(self, **kwargs) -> LibNessus:
+        """
+        :param kwargs: as `LibNessus`, as `retry_policy` or `hooks`
+        :return: client talking to this server
+        """
+        return LibNessus(self.host, self.port, self.api_access_key, self.api_secret_key, scheme='http', **kwargs)
+
+    def __handler(self) -> type:
+        handle = self.__handle
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, as the pooled connections of the clients
+            protocol_version = 'HTTP/1.1'
+
+            def __answer(self) -> None:
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, answer = handle(self.command, self.path, self.headers.get('X-ApiKeys', ''), body)
+
+                self.send_response(status)
+                if isinstance(answer, bytes):
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(answer)))
+                    self.end_headers()
+                    self.wfile.write(answer)
+                    return
+
+                self.send_header('Content-Type', 'application/octet-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for chunk in answer:
+                    if chunk:
+                        self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                self.wfile.write(b'0\r\n\r\n')
+
+            do_GET = do_POST = do_PUT = do_DELETE = __answer  # pylint: disable=invalid-name
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def __handle(self, method: str, target: str, api_keys: str, body: bytes) -> Tuple[int, Union[bytes,
+                                                                                                Iterator[bytes]]]:
+        """
+        :return: status and body of the response, the chunks of the body if it is streamed
+        """
+        delay = self.latency
+        with self.__lock:
+            if self.jitter:
+                delay += self.__random.uniform(0, self.jitter)
+            failing = self.error_rate and self.__random.random() < self.error_rate
+        if delay > 0:
+            sleep(delay)
+
+        try:
+            if api_keys.replace(' ', '') != 'accessKey={};secretKey={};'.format(self.api_access_key,
+                                                                               self.api_secret_key):
+                raise NessusMockError(401, 'Invalid Credentials')
+            if failing:
+                raise NessusMockError(500, 'An internal server error occurred')
+
+            url = urlsplit(target)
+            path = url.path.strip('/')
+            query = dict(parse_qsl(url.query))
+            for route_method, pattern, handler in self.__routes:
+                match = pattern.fullmatch(path)
+                if match and route_method == method:
+                    answer = handler(match, query, body)
+                    break
+            else:
+                raise NessusMockError(404, 'The requested file was not found.')
+        except NessusMockError as e:
+            return e.status, self.__encode({'error': e.message})
+
+        if answer is None or isinstance(answer, dict):
+            return 200, self.__encode(answer)
+        return 200, answer
+
+    @staticmethod
+    def __encode(json_dict: Optional[Mapping[str, Any]]) -> bytes:
+        return b'' if json_dict is None else json.dumps(json_dict, separators=(',', ':')).encode()
+
+    @staticmethod
+    def __json(body: bytes) -> Mapping[str, Any]:
+        try:
+            return decode(body) or dict()
+        except ValueError:
+            raise NessusMockError(400, 'Invalid JSON')
+
+    def __new_id(self) -> int:
+        """
+        must be called with the lock held
+        """
+        new_id = self.__next_id
+        self.__next_id += 1
+        return new_id
+
+    @staticmethod
+    def __template_uuid(name: str) -> str:
+        # as nessus, the uuid of a template is longer than a real one
+        return str(uuid5(NAMESPACE_URL, 'nessus-mock/' + name)) + uuid5(NAMESPACE_URL, name).hex[:12]
+
+    def __scan(self, scan_id: str) -> _MockScan:
+        """
+        must be called with the lock held
+        """
+        scan = self.__scans.get(int(scan_id))
+        if scan is None:
+            raise NessusMockError(404, 'The requested file was not found.')
+        return scan
+
+    def __run(self, scan_id: str, query: Mapping[str, str]) -> Tuple[_MockScan, Optional[_MockRun]]:
+        """
+        :return: the scan and its run of the 'history_id' in the query, its last one if not given
+        """
+        with self.__lock:
+            scan = self.__scan(scan_id)
+            if 'history_id' not in query:
+                return scan, scan.runs[-1] if scan.runs else None
+            run = next((r for r in scan.runs if str(r.history_id) == query['history_id']), None)
+            if run is None:
+                raise NessusMockError(404, 'The requested file was not found.')
+            return scan, run
+
+    # editor, policies and files
+
+    def __templates(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        return {'templates': [{
+            'uuid': self.__template_uuid(name),
+            'name': name,
+            'title': title,
+            'description': 'A {} of the mock.'.format(title.lower()),
+            'cloud_only': False,
+            'subscription_only': False,
+            'is_agent': False,
+            'more_info': '',
+        } for name, title in _TEMPLATES]}
+
+    def __list_policies(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        with self.__lock:
+            return {'policies': list(self.__policies.values())}
+
+    def __add_policy(self, template_uuid: str, name: str) -> Mapping[str, Any]:
+        now = int(time())
+        with self.__lock:
+            policy_id = self.__new_id()
+            policy = self.__policies[policy_id] = {
+                'id': policy_id,
+                'template_uuid': template_uuid,
+                'name': name,
+                'description': '',
+                'owner_id': '1',
+                'owner': 'nessus',
+                'shared': 0,
+                'user_permissions': 128,
+                'creation_date': now,
+                'last_modification_date': now,
+                'visibility': 'private',
+                'no_target': False,
+            }
+            return policy
+
+    def __create_policy(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        json_dict = self.__json(body)
+        if json_dict.get('uuid') not in {self.__template_uuid(name) for name, _ in _TEMPLATES}:
+            raise NessusMockError(400, 'Invalid template')
+
+        policy = self.__add_policy(json_dict['uuid'], json_dict.get('settings', {}).get('name') or str(uuid4()))
+        return {'policy_id': policy['id'], 'policy_name': policy['name']}
+
+    def __import_policy(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        name = self.__json(body).get('file')
+        with self.__lock:
+            if name not in self.__files:
+                raise NessusMockError(404, 'The requested file was not found.')
+        return self.__add_policy(self.__template_uuid('advanced'), name)
+
+    def __delete_policy(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        with self.__lock:
+            policy = self.__policies.get(int(match.group(1)))
+            if policy is None:
+                raise NessusMockError(404, 'The requested file was not found.')
+            if any(scan.policy_id == policy['id'] for scan in self.__scans.values()):
+                raise NessusMockError(409, 'Policy "{}" (ID {}) cannot be deleted since it is currently used by one '
+                                           'or more scans.'.format(policy['name'], policy['id']))
+            del self.__policies[policy['id']]
+        return None
+
+    def __upload(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        filename = re.search(rb'filename="([^"]*)"', body)
+        if filename is None:
+            raise NessusMockError(400, 'No file uploaded')
+
+        name = filename.group(1).decode()
+        with self.__lock:
+            self.__files.add(name)
+        return {'fileuploaded': name}
+
+    # scans
+
+    def __list_scans(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        now = time()
+        since = int(query.get('last_modification_date', 0))
+        with self.__lock:
+            scans = [scan.to_json(now) for scan in self.__scans.values()
+                     if scan.last_modification_date(now) >= since]
+        return {
+            'scans': scans or None,
+            'folders': [{'id': 3, 'name': 'My Scans', 'type': 'main', 'default_tag': 1, 'custom': 0,
+                         'unread_count': 0}],
+            'timestamp': int(now),
+        }
+
+    def __create_scan(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        json_dict = self.__json(body)
+        settings = json_dict.get('settings', {})
+        targets = [t.strip() for t in re.split(r'[,\n]', settings.get('text_targets', '')) if t.strip()]
+        if not targets:
+            raise NessusMockError(400, 'Invalid targets')
+        if not settings.get('name'):
+            raise NessusMockError(400, 'Invalid scan name')
+
+        now = time()
+        with self.__lock:
+            if settings.get('policy_id') not in self.__policies:
+                raise NessusMockError(400, 'Invalid policy')
+            scan = _MockScan(self.__new_id(), json_dict.get('uuid', ''), settings['name'], settings['policy_id'],
+                             targets, now)
+            self.__scans[scan.id] = scan
+
+        return {'scan': {
+            'creation_date': int(now),
+            'custom_targets': ','.join(targets),
+            'default_permisssions': 0,
+            'description': '',
+            'emails': '',
+            'id': scan.id,
+            'last_modification_date': int(now),
+            'name': scan.name,
+            'notification_filter_type': 'and',
+            'notification_filters': '',
+            'owner': 'nessus',
+            'owner_id': 1,
+            'policy_id': scan.policy_id,
+            'enabled': False,
+            'rrules': '',
+            'scanner_id': 1,
+            'shared': 0,
+            'starttime': '',
+            'timezone': '',
+            'type': 'public',
+            'user_permissions': 128,
+            'uuid': scan.uuid,
+            'use_dashboard': False,
+        }}
+
+    def __delete_scan(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        with self.__lock:
+            scan = self.__scan(match.group(1))
+            if scan.status(time()) == 'running':
+                raise NessusMockError(409, 'Can not delete an active scan')
+            del self.__scans[scan.id]
+        return None
+
+    def __launch(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        alt_targets = self.__json(body).get('alt_targets')
+        with self.__lock:
+            scan = self.__scan(match.group(1))
+            if scan.status(time()) == 'running':
+                raise NessusMockError(409, 'Invalid scan status')
+            run = _MockRun(self.__new_id(), str(uuid4()), alt_targets or scan.targets, time(), self.scan_duration)
+            scan.runs.append(run)
+        return {'scan_uuid': run.uuid}
+
+    def __results(self, scan: _MockScan, run: _MockRun) -> None:
+        """
+        make up the hosts of the run, and what was found on them once it is completed
+        """
+        with run.lock:
+            if run.hostnames is None:
+                run.hostnames = list(islice(iter_hosts(run.targets), self.max_hosts))
+            if run.plugins_by_host is not None or run.status(time()) != 'completed':
+                return
+
+            random = Random('{}/{}/{}'.format(self.seed, scan.id, run.history_id))
+            plugins_by_host = [tuple(sorted(random.sample(self.__plugin_ids, self.vulnerabilities_per_host)))
+                               for _ in run.hostnames]
+            hosts_by_plugin = dict()  # type: MutableMapping[int, List[int]]
+            for host_id, plugin_ids in enumerate(plugins_by_host, start=1):
+                for plugin_id in plugin_ids:
+                    hosts_by_plugin.setdefault(plugin_id, []).append(host_id)
+            run.hosts_by_plugin, run.plugins_by_host = hosts_by_plugin, plugins_by_host
+
+    def __host(self, run: _MockRun, host_id: int, progress: float) -> Mapping[str, Any]:
+        counts = [0] * len(_RISKS)
+        if run.plugins_by_host is not None:
+            for plugin_id in run.plugins_by_host[host_id - 1]:
+                counts[self.__plugins[plugin_id].severity] += 1
+        current = int(progress * 100)
+        return {
+            'host_id': host_id,
+            'host_index': str(host_id - 1),
+            'hostname': run.hostnames[host_id - 1],
+            'progress': '{}-{}/200-200'.format(current * 2, current * 2),
+            'critical': counts[4],
+            'high': counts[3],
+            'medium': counts[2],
+            'low': counts[1],
+            'info': counts[0],
+            'totalchecksconsidered': 200,
+            'numchecksconsidered': current * 2,
+            'scanprogresstotal': 100,
+            'scanprogresscurrent': current,
+            'score': counts[4] * 10000 + counts[3] * 1000 + counts[2] * 100 + counts[1] * 10 + counts[0],
+        }
+
+    def __details(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        scan, run = self.__run(match.group(1), query)
+        now = time()
+        with self.__lock:
+            policy = self.__policies.get(scan.policy_id, {})
+            history = [r.to_json(now) for r in scan.runs]
+
+        info = {
+            'acls': [{'owner': None, 'type': 'default', 'permissions': 16, 'id': None, 'name': 'nobody'}],
+            'edit_allowed': True,
+            'status': 'empty' if run is None else run.status(now),
+            'policy': policy.get('name', ''),
+            'pci-can-upload': False,
+            'hasaudittrail': False,
+            'scan_start': '' if run is None else str(int(run.started)),
+            'folder_id': None,
+            'targets': ','.join(scan.targets if run is None else run.targets),
+            'timestamp': int(now),
+            'object_id': scan.id,
+            'scanner_name': 'Local Scanner',
+            'haskb': True,
+            'name': scan.name,
+            'user_permissions': 128,
+            'control': True,
+        }
+        if run is None:
+            return {'info': info, 'history': None}
+
+        if run.details is not None:
+            return self.__with_history(run.details, history)
+
+        self.__results(scan, run)
+        completed = run.plugins_by_host is not None and run.status(now) == 'completed'
+        progress = 1.0 if completed else min(run.progress(now), 0.99)
+        info.update({'uuid': run.uuid, 'hostcount': len(run.hostnames)})
+        if completed:
+            info['scan_end'] = str(int(run.ended))
+
+        vulnerabilities = list()
+        if completed:
+            for plugin_id, host_ids in sorted(run.hosts_by_plugin.items()):
+                plugin = self.__plugins[plugin_id]
+                vulnerabilities.append({
+                    'plugin_id': plugin_id, 'plugin_name': plugin.name, 'plugin_family': plugin.family,
+                    'count': len(host_ids), 'vuln_index': plugin_id, 'severity_index': plugin.severity,
+                })
+
+        details = {
+            'info': info,
+            'hosts': [self.__host(run, host_id, progress) for host_id in range(1, len(run.hostnames) + 1)],
+            'comphosts': [],
+            'notes': [],
+            'remediations': {'remediations': None, 'num_hosts': len(run.hostnames), 'num_cves': 0,
+                             'num_impacted_hosts': 0, 'num_remediated_cves': 0},
+            'vulnerabilities': vulnerabilities,
+            'compliance': [],
+            'filters': [],
+        }
+        if not completed:
+            details['history'] = history
+            return details
+
+        run.details = self.__encode(details)
+        return self.__with_history(run.details, history)
+
+    def __with_history(self, details: bytes, history: List[Mapping[str, Any]]) -> bytes:
+        return details[:-1] + b',"history":' + self.__encode(history) + b'}'
+
+    def __host_run(self, match: Match, query: Mapping[str, str]) -> Tuple[_MockRun, int]:
+        scan, run = self.__run(match.group(1), query)
+        if run is None:
+            raise NessusMockError(404, 'The requested file was not found.')
+        self.__results(scan, run)
+
+        host_id = int(match.group(2))
+        if not 0 < host_id <= len(run.hostnames):
+            raise NessusMockError(404, 'The requested file was not found.')
+        return run, host_id
+
+    def __host_info(self, run: _MockRun, host_id: int) -> Mapping[str, Any]:
+        hostname = run.hostnames[host_id - 1]
+        try:
+            address = str(ip_address(hostname))
+            fqdn = 'host-{}.mock.test'.format(host_id)
+        except ValueError:
+            address, fqdn = str(IPv4Address(_NAMED_HOSTS_NETWORK + host_id)), hostname
+        return {
+            'host_start': str(int(run.started)),
+            'host_end': str(int(run.ended)) if run.plugins_by_host is not None else '',
+            'host-ip': address,
+            'mac-address': '02:00:{:02x}:{:02x}:{:02x}:{:02x}'.format(*host_id.to_bytes(4, 'big')),
+            'host-fqdn': fqdn,
+            'operating-system': _OPERATING_SYSTEMS[host_id % len(_OPERATING_SYSTEMS)],
+        }
+
+    def __host_details(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        run, host_id = self.__host_run(match, query)
+        hostname = run.hostnames[host_id - 1]
+        plugin_ids = () if run.plugins_by_host is None else run.plugins_by_host[host_id - 1]
+
+        vulnerabilities = list()
+        for plugin_id in plugin_ids:
+            plugin = self.__plugins[plugin_id]
+            # as nessus, the instances of the plugin on the host: one per output and port
+            count = 2 if plugin.has_own_output(host_id) else 1
+            vulnerabilities.append({
+                'host_id': host_id, 'hostname': hostname, 'plugin_id': plugin_id, 'plugin_name': plugin.name,
+                'plugin_family': plugin.family, 'count': count, 'vuln_index': plugin_id,
+                'severity_index': plugin.severity, 'severity': plugin.severity,
+            })
+        return {'info': self.__host_info(run, host_id), 'compliance': [], 'vulnerabilities': vulnerabilities}
+
+    def __plugin_output(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        run, host_id = self.__host_run(match, query)
+        plugin = self.__plugins.get(int(match.group(3)))
+        if plugin is None:
+            raise NessusMockError(404, 'The requested file was not found.')
+
+        hostname = run.hostnames[host_id - 1]
+        risk = {'risk_factor': _RISKS[plugin.severity]}
+        attributes = {
+            'risk_information': risk,
+            'plugin_name': plugin.name,
+            'plugin_information': {'plugin_id': plugin.id, 'plugin_type': 'remote', 'plugin_family': plugin.family,
+                                   'plugin_modification_date': '2024/01/01'},
+            'solution': 'Upgrade to the latest version.' if plugin.severity else None,
+            'fname': 'synthetic_{}.nasl'.format(plugin.id),
+            'synopsis': 'Synthetic finding {}.'.format(plugin.id),
+            'description': 'A made up finding, reported by the mock of nessus.',
+        }
+        if plugin.severity:
+            score = '{:.1f}'.format(plugin.severity * 2.4)
+            risk.update({'cvss_base_score': score, 'cvss_score': score,
+                         'cvss_vector': 'CVSS2#AV:N/AC:L/Au:N/C:P/I:P/A:P', 'cvss_temporal_score': score,
+                         'cvss_temporal_vector': 'CVSS2#E:U/RL:OF/RC:C'})
+            attributes['ref_information'] = {'ref': [{
+                'name': 'cve', 'values': {'value': ['CVE-2024-{}'.format(plugin.id)]},
+                'url': 'http://web.nvd.nist.gov/view/vuln/detail?vulnId=',
+            }]}
+
+        outputs = list()
+        if run.plugins_by_host is not None and plugin.id in run.plugins_by_host[host_id - 1]:
+            # as nessus, every host having the same output is listed with it, and some hosts have one of their own
+            hostnames = [{'hostname': run.hostnames[other - 1]} for other in run.hosts_by_plugin[plugin.id]]
+            outputs.append({'plugin_output': plugin.output, 'hosts': hostname,
+                            'severity': plugin.severity, 'ports': {plugin.port_key: hostnames}})
+            if plugin.has_own_output(host_id):
+                outputs.append({'plugin_output': plugin.own_output(hostname), 'hosts': hostname,
+                                'severity': plugin.severity, 'ports': {plugin.port_key: [{'hostname': hostname}]}})
+
+        return {
+            'info': {'plugindescription': {'severity': plugin.severity, 'pluginname': plugin.name,
+                                           'pluginattributes': attributes, 'pluginfamily': plugin.family,
+                                           'pluginid': plugin.id}},
+            'outputs': outputs,
+        }
+
+    # exports
+
+    def __export(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        export_format = self.__json(body).get('format')
+        if export_format not in ('nessus', 'csv'):
+            raise NessusMockError(400, 'Invalid format')
+
+        scan, run = self.__run(match.group(1), query)
+        if run is None or run.status(time()) != 'completed':
+            raise NessusMockError(409, 'Invalid scan status')
+        self.__results(scan, run)
+
+        with self.__lock:
+            file_id = self.__new_id()
+            self.__exports[file_id] = run, export_format
+        return {'file': file_id}
+
+    def __exported(self, match: Match) -> Tuple[_MockRun, str]:
+        with self.__lock:
+            self.__scan(match.group(1))
+            export = self.__exports.get(int(match.group(2)))
+        if export is None:
+            raise NessusMockError(404, 'The requested file was not found.')
+        return export
+
+    def __export_status(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        self.__exported(match)
+        return {'status': 'ready'}
+
+    def __download(self, match: Match, query: Mapping[str, str], body: bytes) -> _Body:
+        run, export_format = self.__exported(match)
+        report = self.__nessus_report if export_format == 'nessus' else self.__csv_report
+        return self.__chunked(report(run))
+
+    @staticmethod
+    def __chunked(parts: Iterable[str], size: int = 1 << 16) -> Iterator[bytes]:
+        buffer, buffered = list(), 0
+        for part in parts:
+            buffer.append(part)
+            buffered += len(part)
+            if buffered >= size:
+                yield ''.join(buffer).encode()
+                buffer, buffered = list(), 0
+        yield ''.join(buffer).encode()
+
+    def __nessus_report(self, run: _MockRun) -> Iterator[str]:
+        yield '<?xml version="1.0" ?>\n<NessusClientData_v2>\n<Report name={}>\n'.format(quoteattr(run.uuid))
+        for host_id, plugin_ids in enumerate(run.plugins_by_host, start=1):
+            hostname = run.hostnames[host_id - 1]
+            info = self.__host_info(run, host_id)
+            yield '<ReportHost name={}><HostProperties>\n'.format(quoteattr(hostname))
+            for name, key in (('HOST_START', 'host_start'), ('HOST_END', 'host_end'), ('host-ip', 'host-ip'),
+                              ('mac-address', 'mac-address'), ('host-fqdn', 'host-fqdn'),
+                              ('operating-system', 'operating-system')):
+                yield '<tag name="{}">{}</tag>\n'.format(name, escape(info[key]))
+            yield '</HostProperties>\n'
+            for plugin_id in plugin_ids:
+                plugin = self.__plugins[plugin_id]
+                yield ('<ReportItem port="{}" svc_name="{}" protocol="{}" severity="{}" pluginID="{}" '
+                       'pluginName={} pluginFamily={}>\n<plugin_output>{}</plugin_output>\n</ReportItem>\n').format(
+                    plugin.port, plugin.service or 'general', plugin.transport, plugin.severity, plugin.id,
+                    quoteattr(plugin.name), quoteattr(plugin.family), escape(plugin.output))
+            yield '</ReportHost>\n'
+        yield '</Report>\n</NessusClientData_v2>\n'
+
+    def __csv_report(self, run: _MockRun) -> Iterator[str]:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(('Plugin ID', 'CVE', 'CVSS', 'Risk', 'Host', 'Protocol', 'Port', 'Name', 'Plugin Output'))
+        for host_id, plugin_ids in enumerate(run.plugins_by_host, start=1):
+            hostname = run.hostnames[host_id - 1]
+            for plugin_id in plugin_ids:
+                plugin = self.__plugins[plugin_id]
+                writer.writerow((plugin.id, 'CVE-2024-{}'.format(plugin.id) if plugin.severity else '',
+                                 '{:.1f}'.format(plugin.severity * 2.4) if plugin.severity else '',
+                                 _RISKS[plugin.severity], hostname, plugin.transport, plugin.port, plugin.name,
+                                 plugin.output))
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = ArgumentParser(prog='python -m nessus.testing', description='local stand-in for nessus, over http')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8834, help='port to listen on')
+    parser.add_argument('--access-key', default='access', help='access key expected from the clients')
+    parser.add_argument('--secret-key', default='secret', help='secret key expected from the clients')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds waited before answering')
+    parser.add_argument('--jitter', type=float, default=0.0, help='seconds randomly added to the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='part of the requests failing, 0 to 1')
+    parser.add_argument('--scan-duration', type=float, default=1.0, help='seconds a launched scan is running')
+    parser.add_argument('--max-hosts', type=int, default=65536, help='hosts of a scan at most')
+    parser.add_argument('--vulnerabilities-per-host', type=int, default=10, help='plugins found on each host')
+    parser.add_argument('--plugins', type=int, default=500, help='distinct plugins which can be found')
+    parser.add_argument('--seed', type=int, default=0, help='what the results are made up from')
+    args = parser.parse_args(argv)
+
+    server = NessusMockServer(host=args.host, port=args.port, api_access_key=args.access_key,
+                              api_secret_key=args.secret_key, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, scan_duration=args.scan_duration, max_hosts=args.max_hosts,
+                              vulnerabilities_per_host=args.vulnerabilities_per_host, plugins=args.plugins,
+                              seed=args.seed)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logging.info("serving on http://%s:%s, use LibNessus(%r, %s, %r, %r, scheme='http')",
+                 args.host, server.port, args.host, server.port, args.access_key, args.secret_key)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
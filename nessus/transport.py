@@ -0,0 +1,94 @@
+"""
+shared connection to a single nessus scanner, every submodule of LibNessus draw from the same one
+"""
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional, Iterable
+
+from nessus.metrics import NessusRequestHook
+from nessus.ratelimit import NessusRateLimiter
+from nessus.retry import NessusRetryPolicy, NessusCircuitBreaker
+
+
+class NessusTransport:
+    """
+    hold the pooled http session to a nessus scanner
+    connections are kept alive in the pool, so the TCP and TLS handshakes are done once per pooled connection and not
+    once per request or per submodule
+    """
+
+    def __init__(self, host: str, port: int, api_access_key: str, api_secret_key: str, pool_size: int = 10,
+                 retry_policy: Optional[NessusRetryPolicy] = None,
+                 circuit_breaker: Optional[NessusCircuitBreaker] = None,
+                 rate_limiter: Optional[NessusRateLimiter] = None, hooks: Iterable[NessusRequestHook] = (),
+                 scheme: str = 'https', session: Optional[requests.Session] = None) -> None:
+        """
+        :param host: host to connect to which has nessus
+        :param port: port on the host to connect
+        :param api_access_key: access key to the API
+        :param api_secret_key: secret key to the API
+        :param pool_size: maximum number of connections kept alive to the scanner
+        :param retry_policy: how to retry the requests failing because of the scanner, never retried if not given
+        :param circuit_breaker: refuse the requests while the scanner is failing, always sent if not given
+        :param rate_limiter: budget of requests to the scanner (see `scanner_rate_limiter`), not limited if not given
+        :param hooks: told about every request sent (see `NessusMetricsCollector`)
+        :param scheme: 'https' as nessus, 'http' for a local stand-in (see `nessus.testing`)
+        :param session: used as is instead of creating one, as a proxying session or a fake one for tests, it is
+                        not given the pool size nor the api keys
+        """
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.hooks = list(hooks)
+        self.scheme = scheme
+
+        self.__api_access_key = api_access_key
+        self.__api_secret_key = api_secret_key
+
+        self.__session_cache = session  # type: requests.Session
+        self.__session_lock = Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        return a session with some useful fields already set, created on first use
+        :return: session object suitable to connect to nessus
+        """
+
+        with self.__session_lock:
+            if self.__session_cache is None:
+                self.__session_cache = self.__create_session()
+            return self.__session_cache
+
+    def __create_session(self) -> requests.Session:
+        session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('{}://'.format(self.scheme), adapter)
+
+        session.headers['X-ApiKeys'] = 'accessKey={}; secretKey={};'.format(self.__api_access_key,
+                                                                            self.__api_secret_key)
+        session.headers['Connection'] = 'keep-alive'
+
+        return session
+
+    def url(self, path: str) -> str:
+        """
+        :param path: path in nessus ('https://localhost:8834/file/upload' -> 'file/upload')
+        :return: full url to the given path
+        """
+        return '{}://{}:{}/{}'.format(self.scheme, self.host, self.port, path)
+
+    def close(self) -> None:
+        """
+        close every pooled connection, the session will be recreated if used again
+        """
+        with self.__session_lock:
+            if self.__session_cache is not None:
+                self.__session_cache.close()
+                self.__session_cache = None
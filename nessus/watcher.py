@@ -0,0 +1,154 @@
+"""
+follow many launched scans on a scanner with a single poll loop
+"""
+import logging
+from concurrent.futures import Future
+from threading import Thread, Event, Lock
+
+from typing import Callable, Optional, MutableMapping
+
+from nessus.scans import LibNessusScans, NessusScan, NessusScanStatus, TERMINAL_SCAN_STATUSES
+
+
+class ScanWatcher:
+    """
+    poll `scans.list(incremental=True)` once per tick, whatever the number of watched scans, and resolve the future of
+    each watched scan when it reaches one of TERMINAL_SCAN_STATUSES
+    use one per scanner, the poll loop runs in a background thread started by the first `watch`
+    """
+
+    def __init__(self, scans: LibNessusScans, interval: float = 5,
+                 on_status_change: Optional[Callable[[NessusScan, Optional[NessusScanStatus]], None]] = None) -> None:
+        """
+        :param scans: scans module of the scanner to poll
+        :param interval: seconds between two ticks
+        :param on_status_change: called with the scan and its previous status (None the first time it is seen) each
+                                 time a watched scan changes status
+        """
+        self.__scans = scans
+        self.__interval = interval
+        self.__on_status_change = on_status_change
+
+        self.__lock = Lock()
+        self.__watched = dict()  # type: MutableMapping[str, Future]
+        self.__callbacks = dict()  # type: MutableMapping[str, Callable[[NessusScan], None]]
+        self.__last_status = dict()  # type: MutableMapping[str, NessusScanStatus]
+
+        self.__stopped = Event()
+        self.__thread = None  # type: Thread
+
+    def watch(self, scan_uuid: str, callback: Optional[Callable[[NessusScan], None]] = None) -> 'Future[NessusScan]':
+        """
+        start to follow a scan
+        :param scan_uuid: uuid given by `scans.launch`
+        :param callback: called from the poll thread with the scan in its final state
+        :return: future resolved with the scan in its final state
+        """
+        with self.__lock:
+            future = self.__watched.get(scan_uuid)
+            if future is None:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self.__watched[scan_uuid] = future
+            if callback is not None:
+                self.__callbacks[scan_uuid] = callback
+
+        self.start()
+        return future
+
+    def unwatch(self, scan_uuid: str) -> None:
+        """
+        stop to follow a scan, its future is cancelled
+        :param scan_uuid: uuid given by `scans.launch`
+        """
+        with self.__lock:
+            future = self.__watched.pop(scan_uuid, None)
+            self.__callbacks.pop(scan_uuid, None)
+            self.__last_status.pop(scan_uuid, None)
+
+        if future is not None:
+            future.cancel()
+
+    def tick(self) -> None:
+        """
+        poll the scanner once and resolve the finished scans, done periodically by the background thread
+        """
+        with self.__lock:
+            if not self.__watched:
+                return
+
+        scans = {scan.uuid: scan for scan in self.__scans.list(incremental=True)}
+
+        with self.__lock:
+            finished = list()
+            changed = list()
+            for scan_uuid in list(self.__watched):
+                scan = scans.get(scan_uuid)
+                if scan is None:
+                    continue
+
+                previous = self.__last_status.get(scan_uuid)
+                if previous is not scan.status:
+                    self.__last_status[scan_uuid] = scan.status
+                    changed.append((scan, previous))
+
+                if scan.status in TERMINAL_SCAN_STATUSES:
+                    self.__last_status.pop(scan_uuid)
+                    finished.append((scan, self.__watched.pop(scan_uuid), self.__callbacks.pop(scan_uuid, None)))
+
+        # resolved before any callback, which could raise, is called
+        for scan, future, _ in finished:
+            future.set_result(scan)
+
+        if self.__on_status_change is not None:
+            for scan, previous in changed:
+                self.__call(self.__on_status_change, scan, previous)
+
+        for scan, _, callback in finished:
+            if callback is not None:
+                self.__call(callback, scan)
+
+    @staticmethod
+    def __call(callback: Callable[..., None], scan: NessusScan, *args) -> None:
+        """
+        call a callback of the user, the other scans still have to be handled if it fails
+        """
+        try:
+            callback(scan, *args)
+        except Exception:  # pylint: disable=broad-except
+            logging.exception('callback failed for scan %s', scan.uuid)
+
+    def start(self) -> None:
+        """
+        start the background poll loop if not already running
+        """
+        with self.__lock:
+            if self.__thread is not None and self.__thread.is_alive():
+                return
+
+            self.__stopped.clear()
+            self.__thread = Thread(target=self.__run, name='ScanWatcher', daemon=True)
+            self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        stop the background poll loop, the watched scans are kept and followed again on the next `start`
+        """
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __run(self) -> None:
+        while not self.__stopped.wait(self.__interval):
+            try:
+                self.tick()
+            except Exception:  # pylint: disable=broad-except
+                # nessus failed, the scans still have to be followed
+                logging.exception('unable to poll the scans, will retry on next tick')
+
+    def __enter__(self) -> 'ScanWatcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
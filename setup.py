@@ -5,4 +5,8 @@ setup(
     version='0.1',
     packages=find_packages(exclude=['test']),
     install_requires=['requests', 'mypy_lang'],
+    extras_require={
+        'async': ['aiohttp'],
+        'fast': ['orjson'],
+    },
 )
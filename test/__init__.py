@@ -1,7 +1,52 @@
+from json import dumps
 from os import environ
 from unittest import TestCase
 
+import requests
+
 from nessus import LibNessus
+from nessus.transport import NessusTransport
+
+
+def response(status_code, body):
+    """
+    :param body: json of the response, or its text
+    """
+    ans = requests.Response()
+    ans.status_code = status_code
+    ans._content = body.encode() if isinstance(body, str) else dumps(body).encode()
+    return ans
+
+
+class Session:
+    """
+    stand-in for requests.Session, answering the queued responses in order, raising the exceptions
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = list()
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        ans = self.answer(method, url)
+        if isinstance(ans, BaseException):
+            raise ans
+        return ans
+
+    def answer(self, method, url):
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+def fake_transport(session, **kwargs):
+    """
+    :param kwargs: as NessusTransport
+    :return: transport to 'scanner.test:8834' sending everything to the given session
+    """
+    return NessusTransport('scanner.test', 8834, 'access', 'secret', session=session, **kwargs)
 
 
 class TestBase(TestCase):
@@ -16,7 +61,10 @@ class TestBase(TestCase):
         port = environ['NESSUS_PORT']
         api_access_key = environ['NESSUS_ACCESS_KEY']
         api_secret_key = environ['NESSUS_SECRET_KEY']
-        self.nessus = LibNessus(host=ip, port=port, api_access_key=api_access_key, api_secret_key=api_secret_key)
+        # 'http' to run against `python -m nessus.testing`
+        scheme = environ.get('NESSUS_SCHEME', 'https')
+        self.nessus = LibNessus(host=ip, port=port, api_access_key=api_access_key, api_secret_key=api_secret_key,
+                                scheme=scheme)
 
         # we have it as list to always take the same single target
         self.targets = environ['NESSUS_TARGETS'].split('|')
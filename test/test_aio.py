@@ -0,0 +1,185 @@
+import asyncio
+import os
+import socket
+from io import BytesIO
+from tempfile import TemporaryDirectory, NamedTemporaryFile
+from unittest import IsolatedAsyncioTestCase
+
+import requests
+
+from nessus.aio import AsyncLibNessus
+from nessus.cache import NessusResultCache
+from nessus.editor import NessusTemplateType
+from nessus.error import NessusNetworkError, NessusInternalServerError, NessusCircuitOpenError, NessusScanIsActiveError
+from nessus.metrics import NessusRequestHook
+from nessus.report import parse_report, NessusReportHost, NessusReportItem
+from nessus.retry import NessusRetryPolicy, NessusCircuitBreaker
+from nessus.scans import NessusScanStatus
+from nessus.testing import NessusMockServer
+
+
+class _Events(NessusRequestHook):
+    def __init__(self):
+        self.events = []
+
+    def on_request(self, event):
+        self.events.append(event)
+
+
+class TestAsyncLibNessus(IsolatedAsyncioTestCase):
+    def server(self, **kwargs):
+        server = NessusMockServer(**kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def client(self, server, **kwargs):
+        nessus = AsyncLibNessus(server.host, server.port, server.api_access_key, server.api_secret_key,
+                                scheme='http', **kwargs)
+        self.addAsyncCleanup(nessus.close)
+        return nessus
+
+    @staticmethod
+    async def create(nessus, targets=('10.0.0.0/24',)):
+        template = await nessus.editor.template_by_name(NessusTemplateType.policy, 'basic')
+        policy_id, _ = await nessus.policies.create(template)
+        policy = await nessus.policies.policy_by_id(policy_id)
+        return policy, await nessus.scans.create(policy, default_targets=targets)
+
+    async def test_lifecycle(self):
+        nessus = self.client(self.server(scan_duration=0.5))
+        policy, scan = await self.create(nessus)
+        self.assertEqual(len(await nessus.scans.list(incremental=True)), 1)
+
+        scan_uuid = await nessus.scans.launch(scan)
+        with self.assertRaises(NessusScanIsActiveError):
+            await nessus.scans.delete(scan)
+
+        progress = []
+        finished = await nessus.scans.wait(scan_uuid, timeout=10, min_interval=0.1,
+                                           on_progress=lambda done, left: progress.append(done))
+        self.assertEqual(finished.status, NessusScanStatus.completed)
+        self.assertTrue(progress)
+
+        details = await nessus.scans.details(finished)
+        self.assertEqual(details.info.status, 'completed')
+        # `history` of the details is always empty (see NessusScanDetails), so read the run from the json
+        history_id = (await nessus.scans._get(nessus.scans._scan_path(finished)))['history'][-1]['history_id']
+        self.assertEqual((await nessus.scans.details(finished, history_id=history_id)).info.status, 'completed')
+        host = next(iter(details.hosts))
+        self.assertEqual((await nessus.scans.host_details(finished, host, history_id)).info.host_ip, host.hostname)
+        with self.assertRaises(NessusNetworkError):
+            await nessus.scans.details(finished, history_id=history_id + 1)
+
+        await nessus.scans.delete(finished)
+        await nessus.policies.delete(policy)
+        self.assertSetEqual(set(await nessus.scans.list(incremental=True)), set())
+        self.assertSetEqual(set(await nessus.policies.list()), set())
+
+    async def test_export(self):
+        # the download holds its slot until read, the next requests would wait forever if it was never given back
+        nessus = self.client(self.server(scan_duration=0, vulnerabilities_per_host=3), max_concurrent=1)
+        _, scan = await self.create(nessus, targets=['10.0.0.0/28', 'host.test'])
+        await nessus.scans.launch(scan)
+
+        report = BytesIO()
+        written = await nessus.scans.export(scan, report, chunk_size=256)
+        self.assertEqual(written, len(report.getvalue()))
+        report.seek(0)
+        elements = list(parse_report(report))
+        self.assertEqual(sum(isinstance(e, NessusReportHost) for e in elements), 17)
+        self.assertEqual(sum(isinstance(e, NessusReportItem) for e in elements), 17 * 3)
+
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.nessus')
+            self.assertEqual(await asyncio.wait_for(nessus.scans.export(scan, path), 10), written)
+            self.assertListEqual(os.listdir(directory), ['report.nessus'])
+            with open(path, 'rb') as io:
+                self.assertEqual(io.read(), report.getvalue())
+
+    async def test_caches(self):
+        hook = _Events()
+        db = NamedTemporaryFile(suffix='.db')
+        self.addCleanup(db.close)
+        nessus = self.client(self.server(scan_duration=0), result_cache=NessusResultCache(db.name), cache_ttl=60,
+                             hooks=[hook])
+        policy, scan = await self.create(nessus)
+        finished = await nessus.scans.wait(await nessus.scans.launch(scan), timeout=10, min_interval=0.1)
+
+        def asked(endpoint, method='GET'):
+            return sum(event.endpoint == endpoint and event.method == method for event in hook.events)
+
+        polled = asked('scans/{scan_id}')
+        host = next(iter((await nessus.scans.details(finished)).hosts))
+        for _ in range(2):
+            await nessus.scans.details(finished)
+            await nessus.scans.host_details(finished, host)
+            await nessus.editor.template_by_name(NessusTemplateType.policy, 'basic')
+        self.assertEqual(asked('scans/{scan_id}'), polled + 1)
+        self.assertEqual(asked('scans/{scan_id}/hosts/{host_id}'), 1)
+        self.assertEqual(asked('editor/policy/templates'), 1)
+
+        # asked once by `create`, then kept until the policies change
+        await nessus.policies.policy_by_id(policy.id)
+        self.assertEqual(asked('policies'), 1)
+        await nessus.scans.delete(finished)
+        await nessus.policies.delete(policy)
+        self.assertIsNone(await nessus.policies.policy_by_id(policy.id))
+        self.assertEqual(asked('policies'), 2)
+
+    async def test_plugins_output(self):
+        server = self.server(scan_duration=0, vulnerabilities_per_host=2, plugins=3)
+        nessus = self.client(server)
+        _, scan = await self.create(nessus, targets=['10.0.0.0/29'])
+        await nessus.scans.launch(scan)
+        plugin_ids = {vuln.plugin_id for vuln in (await nessus.scans.details(scan)).vulnerabilites}
+
+        def by_hostname(outputs):
+            return {(host.hostname, plugin_id): {output.plugin_output for output in by_plugin[plugin_id]}
+                    for host, by_plugin in outputs.items() for plugin_id in by_plugin}
+
+        outputs = await nessus.scans.plugins_output(scan, plugin_ids, max_workers=3)
+        self.assertTrue(outputs)
+        self.assertDictEqual(by_hostname(outputs), by_hostname(server.client().scans.plugins_output(scan, plugin_ids)))
+
+    async def test_run_sharded(self):
+        nessus = self.client(self.server(scan_duration=0.2))
+        template = await nessus.editor.template_by_name(NessusTemplateType.policy, 'basic')
+        policy = await nessus.policies.policy_by_id((await nessus.policies.create(template))[0])
+
+        merged = await nessus.scans.run_sharded(policy, ['10.0.0.0/28', '10.0.0.3'], 3, timeout=10, min_interval=0.1)
+
+        self.assertEqual(len(await nessus.scans.list()), 3)
+        self.assertEqual(merged.info.status, 'completed')
+        self.assertSetEqual({host.hostname for host in merged.hosts}, {'10.0.0.{}'.format(i) for i in range(16)})
+
+    async def test_retry(self):
+        server = self.server(error_rate=1)
+        with self.assertRaises(NessusInternalServerError):
+            await self.client(server).scans.list()
+
+        server.error_rate = 0.5
+        nessus = self.client(server, retry_policy=NessusRetryPolicy(attempts=20, base_delay=0))
+        for _ in range(10):
+            await nessus.scans.list()
+
+    async def test_circuit_open(self):
+        server = self.server(error_rate=1)
+        hook = _Events()
+        nessus = self.client(server, circuit_breaker=NessusCircuitBreaker(failure_threshold=1, reset_timeout=60),
+                             hooks=[hook])
+
+        with self.assertRaises(NessusInternalServerError):
+            await nessus.scans.list()
+        with self.assertRaises(NessusCircuitOpenError):
+            await nessus.scans.list()
+        self.assertListEqual([e.error for e in hook.events], ['NessusInternalServerError', 'NessusCircuitOpenError'])
+
+    async def test_connection_error(self):
+        with socket.socket() as unused:
+            unused.bind(('127.0.0.1', 0))
+            port = unused.getsockname()[1]
+        nessus = AsyncLibNessus('127.0.0.1', port, 'access', 'secret', scheme='http')
+        self.addAsyncCleanup(nessus.close)
+
+        with self.assertRaises(requests.ConnectionError):
+            await nessus.scans.list()
@@ -0,0 +1,60 @@
+from tempfile import NamedTemporaryFile
+from unittest import TestCase
+
+from nessus.cache import NessusResultCache
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        self.db = NamedTemporaryFile(suffix='.db')
+        self.fetched = list()
+
+    def tearDown(self):
+        self.db.close()
+
+    def fetch(self, value):
+        def fetcher():
+            self.fetched.append(value)
+            return value
+        return fetcher
+
+    def test_serve_stored(self):
+        cache = NessusResultCache(self.db.name)
+
+        cache.get_or_fetch(1, None, 10, 'details', '', self.fetch({'a': 1}))
+        got = cache.get_or_fetch(1, None, 10, 'details', '', self.fetch({'a': 2}))
+
+        self.assertDictEqual(got, {'a': 1})
+        self.assertEqual(len(self.fetched), 1)
+
+    def test_shared_between_instances(self):
+        NessusResultCache(self.db.name).get_or_fetch(1, 2, 10, 'details', '', self.fetch('first'))
+        got = NessusResultCache(self.db.name).get_or_fetch(1, 2, 10, 'details', '', self.fetch('second'))
+
+        self.assertEqual(got, 'first')
+
+    def test_invalidate_on_modification(self):
+        cache = NessusResultCache(self.db.name)
+
+        cache.get_or_fetch(1, None, 10, 'details', '', self.fetch('old'))
+        got = cache.get_or_fetch(1, None, 11, 'details', '', self.fetch('new'))
+
+        self.assertEqual(got, 'new')
+        self.assertEqual(cache.get_or_fetch(1, None, 11, 'details', '', self.fetch('newer')), 'new')
+
+    def test_evict_by_age(self):
+        cache = NessusResultCache(self.db.name, max_age=-1)
+
+        cache.get_or_fetch(1, None, 10, 'details', '', self.fetch('old'))
+        got = cache.get_or_fetch(1, None, 10, 'details', '', self.fetch('new'))
+
+        self.assertEqual(got, 'new')
+
+    def test_evict_by_size(self):
+        cache = NessusResultCache(self.db.name, max_size=1500)
+
+        for host_id in range(3):
+            cache.get_or_fetch(1, None, 10, 'host_details', str(host_id), self.fetch('x' * 1000))
+        got = cache.get_or_fetch(1, None, 10, 'host_details', '0', self.fetch('y'))
+
+        self.assertEqual(got, 'y')
@@ -0,0 +1,93 @@
+import pickle
+from unittest import TestCase
+
+from nessus.cluster import LibNessusCluster, NessusClusterScan
+from nessus.error import NessusError
+from nessus.scans import NessusScanStatus
+
+
+class Scan:
+    def __init__(self, scan_id, status=NessusScanStatus.empty):
+        self.id = scan_id
+        self.uuid = 'uuid-{}'.format(scan_id)
+        self.status = status
+
+
+class Policy:
+    name = 'policy'
+
+
+class Scans:
+    """
+    the part of LibNessusScans used by the cluster, on a fake scanner
+    """
+
+    def __init__(self, running):
+        self.scans = {i: Scan(i, NessusScanStatus.running) for i in range(running)}
+        self.calls = list()
+
+    def list(self, incremental=False):
+        return list(self.scans.values())
+
+    def create(self, policy, name=None, template=None, default_targets=()):
+        scan = Scan(100 + len(self.scans))
+        self.scans[scan.id] = scan
+        return scan
+
+    def launch(self, scan, alt_targets=None):
+        return scan.uuid
+
+    def details(self, scan, history_id=None, lazy=False):
+        self.calls.append(('details', scan.id))
+
+
+class Policies:
+    def policy_by_name(self, name):
+        return Policy() if name == Policy.name else None
+
+
+class Node:
+    def __init__(self, running):
+        self.scans = Scans(running)
+        self.policies = Policies()
+
+
+class TestCluster(TestCase):
+    def setUp(self):
+        self.nodes = {'a': Node(2), 'b': Node(0), 'c': Node(1)}
+        self.cluster = LibNessusCluster(self.nodes)
+
+    def test_list_every_node(self):
+        scans = self.cluster.scans.list()
+
+        self.assertEqual(len(scans), 3)
+        self.assertSetEqual({scan.node for scan in scans}, {'a', 'c'})
+
+    def test_place_on_least_loaded(self):
+        placed = [self.cluster.scans.create('policy').node for _ in range(4)]
+
+        # created but not yet launched scans are counted too
+        self.assertListEqual(placed, ['b', 'b', 'c', 'a'])
+
+    def test_route_to_owner(self):
+        scan = self.cluster.scans.create('policy', node='c')
+
+        self.cluster.scans.details(scan)
+
+        self.assertListEqual(self.nodes['c'].scans.calls, [('details', scan.id)])
+        self.assertListEqual(self.nodes['a'].scans.calls, [])
+
+    def test_same_id_on_two_nodes(self):
+        scans = self.cluster.scans.list()
+
+        self.assertEqual(len({scan.id for scan in scans}), 2)
+        self.assertEqual(len(scans), 3)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(NessusError):
+            self.cluster.scans.create('unknown')
+
+    def test_pickle_scan(self):
+        scan = NessusClusterScan('a', 1)
+
+        self.assertEqual(pickle.loads(pickle.dumps(scan)).scan, 1)
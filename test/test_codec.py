@@ -0,0 +1,14 @@
+from unittest import TestCase
+
+from nessus import codec
+
+
+class TestCodec(TestCase):
+    def test_backend(self):
+        self.assertIn(codec.BACKEND, ('orjson', 'ujson', 'json'))
+
+    def test_decode(self):
+        self.assertDictEqual(codec.decode(b'{"scans": null, "timestamp": 1}'), {'scans': None, 'timestamp': 1})
+
+    def test_decode_empty(self):
+        self.assertIsNone(codec.decode(b''))
@@ -16,3 +16,11 @@ class TestEditor(TestBase):
         templates = self.nessus.editor.list(template_type)
 
         self.assertGreater(len(templates), 0)
+
+    def test_template_by_name(self):
+        template_type = NessusTemplateType.scan
+
+        template = self.nessus.editor.template_by_name(template_type, 'discovery')
+
+        self.assertIn(template, self.nessus.editor.list(template_type))
+        self.assertIsNone(self.nessus.editor.template_by_name(template_type, 'not a template'))
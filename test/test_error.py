@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+from nessus.base import LibNessusBase
+from nessus.error import NessusNetworkError, NessusWeirdNetworkError, NessusInternalServerError, \
+    NessusPolicyInUseError, NessusDuplicateFilenameLimitError, register_network_error, \
+    unregister_network_error
+from test import response
+
+
+class NessusTestQuotaError(NessusNetworkError):
+    def __init__(self, response, quota, error=None):
+        super().__init__(response, error)
+        self.quota = quota
+
+
+class TestCheckError(TestCase):
+    def assertRaisesFor(self, excepted, body, status_code=500):
+        with self.assertRaises(excepted) as context:
+            LibNessusBase._check_error(response(status_code, body))
+        return context.exception
+
+    def test_ok(self):
+        LibNessusBase._check_error(response(200, 'anything'))
+
+    def test_weird(self):
+        self.assertRaisesFor(NessusWeirdNetworkError, '<html>')
+        self.assertRaisesFor(NessusWeirdNetworkError, {'not_error': 1})
+        self.assertRaisesFor(NessusWeirdNetworkError, '{broken')
+
+    def test_message(self):
+        error = self.assertRaisesFor(NessusInternalServerError, {'error': 'An internal server error occurred'})
+
+        self.assertEqual(str(error), 'An internal server error occurred')
+
+    def test_patterns(self):
+        error = self.assertRaisesFor(NessusPolicyInUseError, {
+            'error': 'Policy "some name" (ID 42) cannot be deleted since it is currently used by one or more scans.'
+        })
+        self.assertEqual(error.policy_name, 'some name')
+        self.assertEqual(error.policy_id, '42')
+
+        error = self.assertRaisesFor(NessusDuplicateFilenameLimitError, {
+            'error': "could not upload file 'a.nessus': duplicate filename limit exceeded"
+        })
+        self.assertEqual(error.filename, 'a.nessus')
+
+    def test_registered(self):
+        register_network_error(NessusTestQuotaError, pattern=r'quota of (\d+) exceeded')
+        self.addCleanup(unregister_network_error, NessusTestQuotaError)
+        error = self.assertRaisesFor(NessusTestQuotaError, {'error': 'quota of 12 exceeded'}, 403)
+
+        self.assertEqual(error.quota, '12')
+        self.assertEqual(str(error), 'quota of 12 exceeded')
+
+    def test_unregistered(self):
+        register_network_error(NessusTestQuotaError, pattern=r'quota of (\d+) exceeded')
+        unregister_network_error(NessusTestQuotaError)
+
+        self.assertIs(type(self.assertRaisesFor(NessusNetworkError, {'error': 'quota of 12 exceeded'}, 403)),
+                      NessusNetworkError)
+        # the patterns registered before are still used
+        self.assertRaisesFor(NessusPolicyInUseError, {
+            'error': 'Policy "p" (ID 1) cannot be deleted since it is currently used by one or more scans.'
+        })
+
+    def test_unknown(self):
+        error = self.assertRaisesFor(NessusNetworkError, {'error': 'something else'})
+
+        self.assertIs(type(error), NessusNetworkError)
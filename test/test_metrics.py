@@ -0,0 +1,103 @@
+from json import dumps
+from unittest import TestCase
+
+import requests
+
+from nessus.base import LibNessusBase
+from nessus.error import NessusInternalServerError, NessusCircuitOpenError
+from nessus.metrics import NessusMetricsCollector, NessusLatencyHistogram, NessusRequestHook, endpoint
+from nessus.retry import NessusRetryPolicy, NessusCircuitBreaker
+from test import Session, response, fake_transport
+
+
+class Events(NessusRequestHook):
+    def __init__(self):
+        self.events = list()
+
+    def on_request(self, event):
+        self.events.append(event)
+
+
+class TestEndpoint(TestCase):
+    def test_ids_named(self):
+        self.assertEqual(endpoint('scans/12/hosts/3/plugins/19506?history_id=4'),
+                         'scans/{scan_id}/hosts/{host_id}/plugins/{plugin_id}')
+        self.assertEqual(endpoint('scans/12/export/34/status'), 'scans/{scan_id}/export/{file_id}/status')
+        self.assertEqual(endpoint('tokens/a1b2/download'), 'tokens/{token}/download')
+        self.assertEqual(endpoint('editor/scan/templates'), 'editor/scan/templates')
+
+
+class TestHistogram(TestCase):
+    def test_quantiles(self):
+        histogram = NessusLatencyHistogram(bounds=(0.1, 0.2, 0.5, 1))
+        for value in [0.05] * 50 + [0.15] * 45 + [0.8] * 5:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertListEqual(histogram.counts, [50, 45, 0, 5, 0])
+        self.assertLessEqual(histogram.quantile(0.5), 0.1)
+        self.assertTrue(0.1 <= histogram.quantile(0.9) <= 0.2)
+        self.assertTrue(0.5 <= histogram.quantile(0.99) <= 0.8)
+        self.assertEqual(histogram.quantile(1), 0.8)
+
+    def test_empty(self):
+        self.assertIsNone(NessusLatencyHistogram().quantile(0.5))
+
+
+class TestHooks(TestCase):
+    def client(self, session, hooks, retry_policy=None, circuit_breaker=None):
+        transport = fake_transport(session, retry_policy=retry_policy, hooks=hooks, circuit_breaker=circuit_breaker)
+        return LibNessusBase('scanner.test', 8834, 'access', 'secret', transport=transport)
+
+    def test_event(self):
+        hook = Events()
+        body = {'info': {'host-ip': '10.0.0.1'}}
+        self.client(Session(response(200, body)), [hook])._get('scans/12/hosts/3')
+
+        event, = hook.events
+        self.assertEqual(event.scanner, 'scanner.test:8834')
+        self.assertEqual((event.method, event.endpoint, event.status), ('GET', 'scans/{scan_id}/hosts/{host_id}', 200))
+        self.assertEqual(event.size, len(dumps(body)))
+        self.assertGreaterEqual(event.network_time, 0)
+        self.assertGreaterEqual(event.decode_time, 0)
+
+    def test_every_attempt(self):
+        hook = Events()
+        session = Session(requests.ConnectionError(), response(500, {'error': 'An internal server error occurred'}),
+                          response(200, {}))
+        self.client(session, [hook], NessusRetryPolicy(attempts=2, base_delay=0))._get('scans')
+
+        self.assertListEqual([event.status for event in hook.events], [None, 500, 200])
+
+    def test_circuit_open(self):
+        hook, collector = Events(), NessusMetricsCollector()
+        internal_error = response(500, {'error': 'An internal server error occurred'})
+        client = self.client(Session(internal_error), [hook, collector],
+                             circuit_breaker=NessusCircuitBreaker(failure_threshold=1, reset_timeout=60))
+
+        with self.assertRaises(NessusInternalServerError):
+            client._get('scans/1')
+        with self.assertRaises(NessusCircuitOpenError):
+            client._get('scans/2')
+
+        self.assertListEqual([(event.status, event.error) for event in hook.events],
+                             [(500, 'NessusInternalServerError'), (None, 'NessusCircuitOpenError')])
+        summary, = collector.summary()
+        self.assertEqual((summary.count, summary.errors), (2, 2))
+
+    def test_collector(self):
+        collector = NessusMetricsCollector()
+        internal_error = response(500, {'error': 'An internal server error occurred'})
+        client = self.client(Session(response(200, {}), response(200, {}), internal_error), [collector])
+
+        client._get('scans/1')
+        client._get('scans/2')
+        with self.assertRaises(NessusInternalServerError):
+            client._get('scans/3')
+
+        summary, = collector.summary()
+        self.assertEqual((summary.endpoint, summary.count, summary.errors), ('scans/{scan_id}', 3, 1))
+        self.assertIn('scans/{scan_id}', collector.report())
+
+        collector.reset()
+        self.assertListEqual(collector.summary(), [])
@@ -0,0 +1,136 @@
+import pickle
+from unittest import TestCase
+
+from nessus.model import Object, Field, LyingExist, LyingType, LyingExistAndType, AllowToExist, SetOf, lying_exist, \
+    lying_type, lying_exist_and_type, allow_to_exist
+from nessus.permissions import NessusPermission
+from nessus.scans import NessusScanDetails, NessusScanLazyDetails
+
+
+class Model(Object):
+    __slots__ = ('field', 'typed', 'existing', 'defaulted', 'allowed', 'both', 'elements')
+
+    def __init__(self, field, typed, existing, defaulted, allowed, both, elements):
+        self.field = field
+        self.typed = typed
+        self.existing = existing
+        self.defaulted = defaulted
+        self.allowed = allowed
+        self.both = both
+        self.elements = elements
+
+    _json_fields = (
+        Field('field', int), LyingType('typed', int, str), LyingExist('existing', str),
+        LyingExist('defaulted', int, None),
+        AllowToExist('allowed', float), LyingExistAndType('both', list, lambda x: list(), list()),
+        SetOf(str, LyingExist('elements', list)),
+    )
+
+    @staticmethod
+    def from_json_by_hand(json_dict):
+        return Model(int(json_dict['field']), lying_type(json_dict['typed'], int, str),
+                     lying_exist(json_dict, 'existing', str), lying_exist(json_dict, 'defaulted', int, None),
+                     allow_to_exist(json_dict, 'allowed', float),
+                     lying_exist_and_type(json_dict, 'both', list, lambda x: list(), list()),
+                     {str(element) for element in lying_exist(json_dict, 'elements', list)})
+
+
+class TestGeneratedFromJson(TestCase):
+    def assertSameModel(self, json_dict):
+        self.assertEqual(repr(Model.from_json(json_dict)), repr(Model.from_json_by_hand(json_dict)))
+
+    def test_all_present(self):
+        self.assertSameModel({'field': '1', 'typed': 2, 'existing': 3, 'defaulted': '4', 'allowed': '5.5',
+                              'both': [6], 'elements': [7, 8]})
+
+    def test_all_missing(self):
+        self.assertSameModel({'field': 1, 'typed': None})
+
+    def test_typed_or_subclassed(self):
+        json_dict = {'field': True, 'typed': 2, 'existing': 's', 'defaulted': 4, 'allowed': 5.5, 'elements': ['7']}
+        self.assertSameModel(json_dict)
+        self.assertIs(type(Model.from_json(json_dict).field), int)
+
+    def test_required_missing(self):
+        with self.assertRaises(KeyError):
+            Model.from_json({'typed': None})
+
+    def test_source_in_doc(self):
+        self.assertIn("json_dict['field']", Model.from_json.__doc__)
+
+    def test_init_skipped_only_if_storing(self):
+        class Renamed(Object):
+            __slots__ = ('id', 'name')
+
+            def __init__(self, renamed_id, name):
+                self.id = renamed_id
+                self.name = name
+
+            _json_fields = (Field('id', int), Field('name', str))
+
+        class Computing(Object):
+            __slots__ = ('name',)
+
+            def __init__(self, name):
+                self.name = name.upper()
+
+            _json_fields = (Field('name', str),)
+
+        self.assertNotIn('cls(', Renamed.from_json.__doc__)
+        self.assertEqual(repr(Renamed.from_json({'id': '3', 'name': 'a'})), "Renamed(3, 'a')")
+        self.assertIn('cls(', Computing.from_json.__doc__)
+        self.assertEqual(Computing.from_json({'name': 'a'}).name, 'A')
+
+
+class TestLayout(TestCase):
+    def test_repr_prefixed_args(self):
+        permission = NessusPermission(None, 'default', 16, 3, 'name')
+
+        self.assertEqual(repr(permission), "NessusPermission(None, 'default', 16, 3, 'name')")
+
+    def test_to_dict(self):
+        permission = NessusPermission(None, 'default', 16, 3, 'name')
+
+        self.assertDictEqual(permission.to_dict(),
+                             {'owner': None, 'type': 'default', 'permissions': 16, 'id': 3, 'name': 'name'})
+
+
+class TestLazyDetails(TestCase):
+    json = {
+        'info': {'acls': [], 'status': 'completed', 'scan_start': '', 'folder_id': None, 'object_id': 1,
+                 'scanner_name': 'local', 'name': 'scan', 'user_permissions': 128, 'control': True},
+        'hosts': [{'host_id': 1, 'host_index': '0', 'hostname': '127.0.0.1', 'progress': '100-100', 'critical': 0,
+                   'high': 0, 'medium': 1, 'low': 2, 'info': 3, 'totalchecksconsidered': 10, 'numchecksconsidered': 10,
+                   'scanprogresstotal': 10, 'scanprogresscurrent': 10, 'score': 120}],
+        'history': None,
+        'dashboard': {},
+    }
+
+    def test_parsed_on_access(self):
+        details = NessusScanLazyDetails.from_json(self.json)
+
+        self.assertEqual(details.info.status, 'completed')
+        self.assertIs(details.hosts, details.hosts)
+        self.assertEqual(details.json['dashboard'], {})
+
+    def test_same_as_eager(self):
+        lazy = NessusScanLazyDetails.from_json(self.json)
+        eager = NessusScanDetails.from_json(self.json)
+
+        self.assertEqual(repr(lazy.to_dict()), repr(eager.to_dict()))
+
+    def test_missing_section_raises_on_access(self):
+        details = NessusScanLazyDetails.from_json({'hosts': []})
+
+        self.assertSetEqual(details.hosts, set())
+        with self.assertRaises(KeyError):
+            details.history
+
+    def test_pickle_keeps_only_json(self):
+        details = NessusScanLazyDetails.from_json(self.json)
+        details.hosts
+
+        loaded = pickle.loads(pickle.dumps(details))
+
+        self.assertEqual(loaded.json, self.json)
+        self.assertEqual(repr(loaded), repr(details))
@@ -1,5 +1,7 @@
 import os
+from os import environ
 
+from nessus import LibNessus
 from nessus.editor import NessusTemplateType
 from nessus.file import NessusFile
 from test import TestBase
@@ -39,6 +41,18 @@ class TestPolicies(TestBase):
         old_policies.add(policy_id)
         self.assertSetEqual(old_policies, new_policies)
 
+    def test_policy_by_id_after_create(self):
+        nessus = LibNessus(host=self.nessus.transport.host, port=self.nessus.transport.port,
+                           api_access_key=environ['NESSUS_ACCESS_KEY'], api_secret_key=environ['NESSUS_SECRET_KEY'],
+                           cache_ttl=3600, scheme=self.nessus.transport.scheme)
+        nessus.policies.list()
+        template = nessus.editor.template_by_name(NessusTemplateType.policy, 'discovery')
+
+        policy_id, _ = nessus.policies.create(template)
+        self.__add_policy_id_to_remove(policy_id)
+
+        self.assertEqual(nessus.policies.policy_by_id(policy_id).id, policy_id)
+
     def __add_policy_id_to_remove(self, policy_id: int) -> None:
         class P:
             pass
@@ -0,0 +1,51 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from urllib.request import urlopen
+
+from nessus.base import LibNessusBase
+from nessus.metrics import NessusMetricsCollector
+from nessus.prometheus import NessusPrometheusExporter
+from nessus.retry import NessusRetryPolicy
+from test import Session, response, fake_transport
+
+
+class TestPrometheusExporter(TestCase):
+    def setUp(self):
+        self.collector = NessusMetricsCollector(bounds=(0.5, 1))
+        session = Session(response(500, {'error': 'An internal server error occurred'}), response(200, {'scans': None}))
+        transport = fake_transport(session, hooks=[self.collector],
+                                   retry_policy=NessusRetryPolicy(attempts=1, base_delay=0))
+        LibNessusBase('scanner.test', 8834, 'access', 'secret', transport=transport)._get('scans')
+
+        self.exporter = NessusPrometheusExporter(self.collector)
+
+    def test_render(self):
+        lines = self.exporter.render().splitlines()
+        labels = 'scanner="scanner.test:8834",method="GET",endpoint="scans"'
+
+        self.assertIn('nessus_client_requests_total{%s} 2' % labels, lines)
+        self.assertIn('nessus_client_errors_total{%s,error="NessusInternalServerError"} 1' % labels, lines)
+        self.assertIn('nessus_client_retries_total{%s} 1' % labels, lines)
+        self.assertIn('nessus_client_in_flight_requests{%s} 0' % labels, lines)
+        self.assertIn('nessus_client_request_duration_seconds_bucket{%s,le="+Inf"} 2' % labels, lines)
+        self.assertIn('# TYPE nessus_client_request_duration_seconds histogram', lines)
+
+    def test_write(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'nessus.prom')
+            self.exporter.write(path)
+
+            with open(path) as io:
+                self.assertEqual(io.read(), self.exporter.render())
+            self.assertListEqual(os.listdir(directory), ['nessus.prom'])
+
+    def test_serve(self):
+        server = self.exporter.serve(port=0)
+        try:
+            url = 'http://127.0.0.1:{}/metrics'.format(server.server_address[1])
+            with urlopen(url) as ans:
+                self.assertEqual(ans.read().decode(), self.exporter.render())
+        finally:
+            server.shutdown()
+            server.server_close()
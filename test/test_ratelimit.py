@@ -0,0 +1,88 @@
+import asyncio
+from threading import Thread, Lock
+from time import monotonic, sleep
+from unittest import TestCase
+
+from nessus.error import NessusError
+from nessus.ratelimit import NessusRateLimiter, scanner_rate_limiter
+
+
+class TestRateLimiter(TestCase):
+    def test_rate(self):
+        limiter = NessusRateLimiter(rate=50, burst=1)
+
+        start = monotonic()
+        for _ in range(11):
+            with limiter:
+                pass
+
+        self.assertGreaterEqual(monotonic() - start, 10 / 50 * 0.9)
+
+    def test_max_concurrent_across_threads_and_tasks(self):
+        limiter = NessusRateLimiter(max_concurrent=2)
+        lock = Lock()
+        in_flight = [0, 0]  # current, maximum
+
+        def enter():
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+
+        def leave():
+            with lock:
+                in_flight[0] -= 1
+
+        def in_thread():
+            for _ in range(5):
+                with limiter:
+                    enter()
+                    sleep(0.005)
+                    leave()
+
+        async def in_task():
+            for _ in range(5):
+                async with limiter:
+                    enter()
+                    await asyncio.sleep(0.005)
+                    leave()
+
+        async def run_tasks():
+            await asyncio.gather(*(in_task() for _ in range(3)))
+
+        threads = [Thread(target=in_thread) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        asyncio.run(run_tasks())
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(in_flight, [0, 2])
+
+    def test_cancelled_waiter_gives_slot_back(self):
+        limiter = NessusRateLimiter(max_concurrent=1)
+
+        async def run():
+            await limiter.acquire_async()
+            waiter = asyncio.ensure_future(limiter.acquire_async())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            limiter.release()
+            await asyncio.wait_for(limiter.acquire_async(), 1)
+            limiter.release()
+
+        asyncio.run(run())
+
+    def test_shared_per_scanner(self):
+        limiter = scanner_rate_limiter('scanner.test', 8834, rate=10)
+
+        self.assertIs(scanner_rate_limiter('scanner.test', 8834, rate=10, burst=10), limiter)
+        self.assertIs(scanner_rate_limiter('scanner.test', '8834', rate=10), limiter)
+        self.assertIsNot(scanner_rate_limiter('scanner.test', 8835, rate=10), limiter)
+
+    def test_other_limits_refused(self):
+        scanner_rate_limiter('limited.test', 8834, rate=10)
+
+        with self.assertRaisesRegex(NessusError, 'rate=10, burst=10, max_concurrent=None'):
+            scanner_rate_limiter('limited.test', 8834, rate=20)
+        with self.assertRaises(NessusError):
+            scanner_rate_limiter('limited.test', '8834', rate=10, max_concurrent=4)
@@ -0,0 +1,72 @@
+from io import BytesIO
+from unittest import TestCase
+
+from nessus.report import parse_report, NessusReportHost, NessusReportItem
+from nessus.scans import Transport, Protocol
+
+REPORT = b'''<?xml version="1.0" ?>
+<NessusClientData_v2>
+<Policy><policyName>discovery</policyName></Policy>
+<Report name="scan" xmlns:cm="http://www.nessus.org/cm">
+<ReportHost name="192.168.0.1">
+<HostProperties>
+<tag name="HOST_END">Tue Jan 10 10:01:00 2017</tag>
+<tag name="operating-system">Linux Kernel 3.10</tag>
+<tag name="host-ip">192.168.0.1</tag>
+<tag name="HOST_START">Tue Jan 10 10:00:00 2017</tag>
+</HostProperties>
+<ReportItem port="22" svc_name="ssh" protocol="tcp" severity="0" pluginID="10267"
+ pluginName="SSH Server Type and Version Information" pluginFamily="Service detection">
+<description>It is possible to obtain information about the remote SSH server.</description>
+<plugin_output>SSH version : SSH-2.0-OpenSSH_7.4</plugin_output>
+</ReportItem>
+<ReportItem port="0" svc_name="general" protocol="tcp" severity="2" pluginID="19506"
+ pluginName="Nessus Scan Information" pluginFamily="Settings">
+</ReportItem>
+</ReportHost>
+<ReportHost name="192.168.0.2">
+<HostProperties>
+<tag name="HOST_END">Tue Jan 10 10:02:00 2017</tag>
+<tag name="HOST_START">Tue Jan 10 10:00:00 2017</tag>
+</HostProperties>
+</ReportHost>
+</Report>
+</NessusClientData_v2>
+'''
+
+
+class TestReport(TestCase):
+    def test_parse_order(self):
+        records = list(parse_report(BytesIO(REPORT)))
+
+        self.assertListEqual([type(r) for r in records],
+                             [NessusReportHost, NessusReportItem, NessusReportItem, NessusReportHost])
+        self.assertListEqual([r.host_id for r in records], [1, 1, 1, 2])
+
+    def test_parse_host(self):
+        host = next(parse_report(BytesIO(REPORT)))
+
+        self.assertEqual(host.name, '192.168.0.1')
+        self.assertEqual(host.info.host_ip, '192.168.0.1')
+        self.assertEqual(host.info.operating_system, 'Linux Kernel 3.10')
+        self.assertEqual(host.info.host_start, 'Tue Jan 10 10:00:00 2017')
+
+    def test_parse_host_without_ip(self):
+        host = list(parse_report(BytesIO(REPORT)))[-1]
+
+        self.assertEqual(host.info.host_ip, '192.168.0.2')
+
+    def test_parse_item(self):
+        _, ssh, general, _ = parse_report(BytesIO(REPORT))
+
+        self.assertEqual(ssh.vulnerability.plugin_id, 10267)
+        self.assertEqual(ssh.vulnerability.hostname, '192.168.0.1')
+        self.assertEqual(ssh.output.plugin_output, 'SSH version : SSH-2.0-OpenSSH_7.4')
+        port = next(iter(ssh.output.ports))
+        self.assertEqual(port.number, 22)
+        self.assertIs(port.transport, Transport.tcp)
+        self.assertIs(port.protocol, Protocol.ssh)
+
+        self.assertEqual(general.vulnerability.severity, 2)
+        self.assertEqual(general.output.plugin_output, '')
+        self.assertIsNone(next(iter(general.output.ports)).protocol)
@@ -0,0 +1,168 @@
+from io import BytesIO
+from threading import Thread
+from unittest import TestCase
+
+import requests
+
+from nessus.base import LibNessusBase, NessusRequestAttempts
+from nessus.error import NessusInternalServerError, NessusNetworkError, NessusCircuitOpenError
+from nessus.ratelimit import NessusRateLimiter
+from nessus.retry import NessusRetryPolicy, NessusCircuitBreaker, is_transient
+from nessus.transport import NessusTransport
+from test import Session, response, fake_transport
+
+
+INTERNAL_ERROR = response(500, {'error': 'An internal server error occurred'})
+OK = response(200, {'scans': None})
+
+
+def methods(session):
+    return [method for method, _ in session.requests]
+
+
+class TestRetry(TestCase):
+    def client(self, session, retry_policy=None, circuit_breaker=None):
+        transport = fake_transport(session, retry_policy=retry_policy, circuit_breaker=circuit_breaker)
+        return LibNessusBase('scanner.test', 8834, 'access', 'secret', transport=transport)
+
+    def test_transient(self):
+        self.assertTrue(is_transient(requests.ConnectionError()))
+        self.assertTrue(is_transient(NessusInternalServerError(INTERNAL_ERROR)))
+        self.assertFalse(is_transient(NessusNetworkError(response(404, {'error': 'not found'}))))
+
+    def test_get_retried(self):
+        session = Session(requests.ConnectionError(), INTERNAL_ERROR, OK)
+        client = self.client(session, NessusRetryPolicy(attempts=2, base_delay=0))
+
+        self.assertDictEqual(client._get('scans'), {'scans': None})
+        self.assertEqual(len(session.requests), 3)
+
+    def test_give_up(self):
+        session = Session(INTERNAL_ERROR, INTERNAL_ERROR)
+        client = self.client(session, NessusRetryPolicy(attempts=1, base_delay=0))
+
+        with self.assertRaises(NessusInternalServerError):
+            client._get('scans')
+
+    def test_post_not_retried(self):
+        session = Session(INTERNAL_ERROR, OK)
+        client = self.client(session, NessusRetryPolicy(attempts=2, base_delay=0))
+
+        with self.assertRaises(NessusInternalServerError):
+            client._post('scans/1/launch')
+        self.assertEqual(methods(session), ['POST'])
+
+    def test_delay_bounded(self):
+        policy = NessusRetryPolicy(base_delay=1, max_delay=5)
+
+        for attempt in range(10):
+            self.assertTrue(0 <= policy.delay(attempt) <= min(5, 2 ** attempt))
+
+    def test_circuit_opens_and_probes(self):
+        breaker = NessusCircuitBreaker(failure_threshold=2, reset_timeout=0)
+        session = Session(INTERNAL_ERROR, INTERNAL_ERROR, OK)
+        client = self.client(session, circuit_breaker=breaker)
+
+        for _ in range(2):
+            with self.assertRaises(NessusInternalServerError):
+                client._get('scans')
+        self.assertTrue(breaker.is_open)
+
+        client._get('scans')
+        self.assertFalse(breaker.is_open)
+
+    def test_circuit_fails_fast(self):
+        breaker = NessusCircuitBreaker(failure_threshold=1, reset_timeout=60)
+        session = Session(INTERNAL_ERROR)
+        client = self.client(session, circuit_breaker=breaker)
+
+        with self.assertRaises(NessusInternalServerError):
+            client._get('scans')
+        with self.assertRaises(NessusCircuitOpenError):
+            client._get('scans')
+        self.assertEqual(len(session.requests), 1)
+
+    def test_refused_request_keeps_circuit_closed(self):
+        breaker = NessusCircuitBreaker(failure_threshold=1)
+        client = self.client(Session(response(404, {'error': 'not found'})), circuit_breaker=breaker)
+
+        with self.assertRaises(NessusNetworkError):
+            client._get('scans/404')
+        self.assertFalse(breaker.is_open)
+
+    def test_interrupted_probe(self):
+        breaker = NessusCircuitBreaker(failure_threshold=1, reset_timeout=0)
+        session = Session(INTERNAL_ERROR, KeyboardInterrupt(), OK)
+        client = self.client(session, circuit_breaker=breaker)
+
+        with self.assertRaises(NessusInternalServerError):
+            client._get('scans')
+        with self.assertRaises(KeyboardInterrupt):
+            client._get('scans')
+
+        self.assertDictEqual(client._get('scans'), {'scans': None})
+        self.assertFalse(breaker.is_open)
+
+    def test_failed_response_closed_before_retry(self):
+        closed = list()
+
+        class Response(requests.Response):
+            def close(self):
+                closed.append(self.status_code)
+
+        failed = Response()
+        failed.status_code, failed._content = 500, INTERNAL_ERROR.content
+        client = self.client(Session(failed, OK), NessusRetryPolicy(attempts=1, base_delay=0))
+
+        client._get('scans')
+        self.assertListEqual(closed, [500])
+
+
+class TestRequestAttempts(TestCase):
+    def test_shared_decisions(self):
+        breaker = NessusCircuitBreaker(failure_threshold=2, reset_timeout=60)
+        transport = NessusTransport('localhost', 8834, 'access', 'secret',
+                                    retry_policy=NessusRetryPolicy(attempts=1, base_delay=0),
+                                    circuit_breaker=breaker)
+        attempts = NessusRequestAttempts(transport, 'GET', 'scans')
+        error = NessusInternalServerError(INTERNAL_ERROR)
+
+        delays = list()
+        for _ in range(2):
+            attempts.start()
+            attempts.sending()
+            attempts.sent(None)
+            delays.append(attempts.failed(error))
+            attempts.finish()
+
+        # retried once, then given up, and the breaker saw both failures
+        self.assertListEqual(delays, [0, None])
+        self.assertTrue(breaker.is_open)
+        with self.assertRaises(NessusCircuitOpenError):
+            attempts.start()
+
+    def test_streamed_slot_kept_until_closed(self):
+        limiter = NessusRateLimiter(max_concurrent=1)
+        download = response(200, '')
+        download.raw = BytesIO(b'report')
+        client = LibNessusBase('scanner.test', 8834, 'access', 'secret',
+                               transport=fake_transport(Session(download, OK), rate_limiter=limiter))
+
+        def started(target, *args):
+            thread = Thread(target=target, args=args)
+            thread.start()
+            thread.join(0.1)
+            return thread
+
+        report = client._stream('scans/4/export/7/download')
+        waiting = started(client._get, 'scans')
+        self.assertTrue(waiting.is_alive())
+
+        # closed twice, as with `with` after an explicit close, the slot is only given back once
+        report.close()
+        report.close()
+        waiting.join(1)
+        self.assertFalse(waiting.is_alive())
+        limiter.acquire()
+        self.addCleanup(limiter.release)
+        self.assertTrue(started(limiter.acquire).is_alive())
@@ -1,20 +1,274 @@
-from time import sleep
+import os
+import re
+from collections import namedtuple
+from tempfile import TemporaryDirectory
+from unittest import TestCase
 
+import requests
 from typing import Optional
 
 from nessus.editor import NessusTemplateType, NessusTemplate
-from nessus.error import NessusNetworkError
-from nessus.scans import NessusScanStatus, NessusScan
-from test import TestBase
+from nessus.error import NessusError, NessusNetworkError, NessusTimeoutError
+from nessus.scans import NessusScanStatus, NessusScan, NessusScanExportFormat, NessusScanHost, LibNessusScans, \
+    NessusScanDetails, NessusScanRemediation, LibNessusScansRequests
+from nessus.testing import NessusMockServer
+from test import TestBase, Session, response, fake_transport
+
+
+def plugin_output(*outputs):
+    attributes = {
+        'risk_information': {'risk_factor': 'None'}, 'plugin_name': 'web server', 'solution': None,
+        'plugin_information': {'plugin_id': 1, 'plugin_type': 'remote', 'plugin_family': 'Web Servers',
+                               'plugin_modification_date': '2024/01/01'},
+        'fname': 'web.nasl', 'synopsis': 's', 'description': 'd',
+    }
+    return {
+        'info': {'plugindescription': {'severity': 0, 'pluginname': 'web server', 'pluginattributes': attributes,
+                                       'pluginfamily': 'Web Servers', 'pluginid': 1}},
+        'outputs': [{'plugin_output': text, 'hosts': hosts[0], 'severity': 0,
+                     'ports': {port: [{'hostname': host} for host in hosts]}} for text, port, hosts in outputs],
+    }
+
+
+class HostsSession(Session):
+    """
+    answer the host details and the plugin outputs of the hosts
+    """
+
+    def __init__(self, vulnerabilities, outputs):
+        """
+        :param vulnerabilities: host id -> plugin id -> count
+        :param outputs: host id -> json of its plugin output, or failing status
+        """
+        super().__init__()
+        self.vulnerabilities = vulnerabilities
+        self.outputs = outputs
+
+    def answer(self, method, url):
+        host_id = int(re.search(r'hosts/(\d+)', url).group(1))
+        if '/plugins/' not in url:
+            return response(200, {
+                'info': {'host_start': '', 'host_end': '', 'host-ip': '10.0.0.{}'.format(host_id)},
+                'compliance': [], 'vulnerabilities': [{
+                    'host_id': host_id, 'hostname': 'h', 'plugin_id': plugin_id, 'plugin_name': 'p',
+                    'plugin_family': 'f', 'count': count, 'vuln_index': 0, 'severity_index': 0, 'severity': 0,
+                } for plugin_id, count in self.vulnerabilities.get(host_id, {}).items()]})
+        if isinstance(self.outputs[host_id], int):
+            return response(self.outputs[host_id], {'error': 'failed'})
+        return response(200, self.outputs[host_id])
+
+
+class TestPluginsOutput(TestCase):
+    apache = ('apache', '80 / tcp / www', ['a.test', 'b.test'])
+    nginx = ('nginx', '8080 / tcp / www', ['b.test'])
+
+    @staticmethod
+    def plugins_output(session):
+        scans = LibNessusScans('scanner.test', 8834, 'access', 'secret', transport=fake_transport(session))
+        hosts = [NessusScanHost.from_json({
+            'host_id': host_id, 'host_index': str(host_id), 'hostname': hostname, 'progress': '100-100/200-200',
+            'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'info': 1, 'totalchecksconsidered': 1,
+            'numchecksconsidered': 1, 'scanprogresstotal': 1, 'scanprogresscurrent': 1, 'score': 1,
+        }) for host_id, hostname in enumerate(['a.test', 'b.test', 'c.test'], start=1)]
+
+        return hosts, scans.plugins_output(namedtuple('Scan', 'id')(4), [1], hosts=hosts, max_workers=1)
+
+    @staticmethod
+    def asked(session):
+        return [url for _, url in session.requests if '/plugins/' in url]
+
+    def test_outputs_of_each_host(self):
+        session = HostsSession({1: {1: 1}, 2: {1: 2}},
+                          {1: plugin_output(self.apache), 2: plugin_output(self.apache, self.nginx)})
+        hosts, outputs = self.plugins_output(session)
+
+        self.assertListEqual(sorted(o.plugin_output for o in outputs[hosts[0]][1]), ['apache'])
+        self.assertListEqual(sorted(o.plugin_output for o in outputs[hosts[1]][1]), ['apache', 'nginx'])
+        self.assertNotIn(hosts[2], outputs)
+        # c.test did not report the plugin, and no host is asked once all its outputs are known
+        self.assertListEqual([url for url in self.asked(session) if 'hosts/3/' in url], [])
+        self.assertLessEqual(len(self.asked(session)), 2)
+
+    def test_shared_output(self):
+        session = HostsSession({1: {1: 1}, 2: {1: 1}}, {1: plugin_output(self.apache), 2: plugin_output(self.apache)})
+        hosts, outputs = self.plugins_output(session)
+
+        self.assertEqual(len(self.asked(session)), 1)
+        for host in hosts[:2]:
+            self.assertListEqual([o.plugin_output for o in outputs[host][1]], ['apache'])
+
+    def test_failed_host(self):
+        apache = ('apache', '80 / tcp / www', ['a.test'])
+        session = HostsSession({1: {1: 1}, 2: {1: 1}}, {1: plugin_output(apache), 2: 500})
+        hosts, outputs = self.plugins_output(session)
+
+        self.assertListEqual([o.plugin_output for o in outputs[hosts[0]][1]], ['apache'])
+        self.assertIsInstance(outputs[hosts[1]][1], NessusNetworkError)
+
+
+class BrokenDownload(requests.Response):
+    def __init__(self):
+        super().__init__()
+        self.status_code = 200
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        yield b'<NessusClientData_v2>'
+        raise requests.ConnectionError('connection reset')
+
+    def close(self):
+        pass
+
+
+class TestExport(TestCase):
+    def scans(self, *responses):
+        return LibNessusScans('scanner.test', 8834, 'access', 'secret', transport=fake_transport(Session(*responses)))
+
+    def test_failed_on_nessus(self):
+        scans = self.scans(response(200, {'file': 7}), response(200, {'status': 'loading'}),
+                           response(200, {'status': 'error'}))
+
+        with TemporaryDirectory() as directory, self.assertRaisesRegex(NessusError, 'export 7'):
+            scans.export(namedtuple('Scan', 'id')(4), os.path.join(directory, 'report.nessus'))
+
+    def test_no_partial_report(self):
+        scans = self.scans(response(200, {'file': 7}), response(200, {'status': 'ready'}), BrokenDownload())
+
+        with TemporaryDirectory() as directory:
+            with self.assertRaises(requests.ConnectionError):
+                scans.export(namedtuple('Scan', 'id')(4), os.path.join(directory, 'report.nessus'))
+            self.assertListEqual(os.listdir(directory), [])
+
+
+class TestWait(TestCase):
+    scan = {
+        'id': 4, 'uuid': 'launched', 'name': 'scan', 'type': None, 'owner': 'nessus', 'enabled': False, 'folder_id': 3,
+        'read': False, 'status': 'running', 'shared': False, 'user_permissions': 128, 'creation_date': 1,
+        'last_modification_date': 1, 'control': True, 'starttime': '', 'timezone': '', 'rrules': '',
+        'use_dashboard': False,
+    }
+
+    def test_unknown_uuid(self):
+        with NessusMockServer() as server:
+            with self.assertRaisesRegex(NessusError, 'not-launched'):
+                server.client().scans.wait('not-launched')
+
+    def test_only_status_parsed(self):
+        def polled(status):
+            # a section the pace does not read, which could not even be parsed
+            info = {'acls': [], 'status': status, 'scan_start': '1', 'folder_id': None, 'object_id': 4,
+                    'scanner_name': 'Local', 'name': 'scan', 'user_permissions': 128, 'control': True}
+            return response(200, {'info': info, 'hosts': [], 'vulnerabilities': [{'broken': True}]})
+
+        scans = LibNessusScans('scanner.test', 8834, 'access', 'secret', transport=fake_transport(Session(
+            response(200, {'scans': [self.scan]}), polled('running'), polled('completed'),
+            response(200, {'scans': [dict(self.scan, status='completed')]}),
+        )))
+
+        self.assertEqual(scans.wait('launched', min_interval=0).status, NessusScanStatus.completed)
+
+
+def details(targets, hosts, vulnerabilities, status='completed', remediations=()):
+    parsed = NessusScanDetails.from_json({
+        'info': {
+            'acls': [], 'status': status, 'scan_start': '1', 'folder_id': None, 'object_id': 1,
+            'scanner_name': 'Local', 'name': 'scan', 'user_permissions': 128, 'control': True, 'targets': targets,
+            'hostcount': len(hosts),
+        },
+        'history': None,
+        'hosts': [{
+            'host_id': host_id, 'host_index': str(host_id), 'hostname': hostname, 'progress': '100-100/200-200',
+            'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'info': 1, 'totalchecksconsidered': 1,
+            'numchecksconsidered': 1, 'scanprogresstotal': 1, 'scanprogresscurrent': 1, 'score': 1,
+        } for host_id, hostname in enumerate(hosts, start=1)],
+        'vulnerabilities': [{
+            'plugin_id': plugin_id, 'plugin_name': 'plugin', 'plugin_family': 'General', 'count': count,
+            'vuln_index': plugin_id, 'severity_index': 0,
+        } for plugin_id, count in vulnerabilities],
+        'remediations': {
+            'remediations': None, 'num_hosts': len(hosts), 'num_cves': 2, 'num_impacted_hosts': 1,
+            'num_remediated_cves': 1,
+        },
+    })
+    # the remediations are never parsed
+    parsed.remediations.remediations = [NessusScanRemediation(value, 'patch', 1, vulns)
+                                        for value, vulns in remediations]
+    return parsed
+
+
+class TestTargetsJson(TestCase):
+    targets = ['b.test', '10.0.0.3', '10.0.0.2']
+
+    def test_kept_as_given(self):
+        policy = namedtuple('Policy', 'id template_uuid')(1, 'uuid')
+
+        self.assertEqual(LibNessusScansRequests._create_json(policy, default_targets=self.targets)['settings']
+                         ['text_targets'], 'b.test,10.0.0.3,10.0.0.2')
+        self.assertDictEqual(LibNessusScansRequests._launch_json(iter(self.targets)), {'alt_targets': self.targets})
+        self.assertIsNone(LibNessusScansRequests._launch_json([]))
+
+    def test_normalized(self):
+        policy = namedtuple('Policy', 'id template_uuid')(1, 'uuid')
+
+        self.assertEqual(LibNessusScansRequests._create_json(policy, default_targets=self.targets, normalize=True)
+                         ['settings']['text_targets'], '10.0.0.2/31,b.test')
+        self.assertDictEqual(LibNessusScansRequests._launch_json(self.targets, normalize=True),
+                             {'alt_targets': ['10.0.0.2/31', 'b.test']})
+
+
+class TestMergeDetails(TestCase):
+    def test_merge(self):
+        shards = [
+            details('10.0.0.0/25', ['10.0.0.1', '10.0.0.2'], [(1, 2), (2, 1)], remediations=[('a', 1)]),
+            details('10.0.0.128/25', ['10.0.0.129'], [(1, 3)], status='running', remediations=[('a', 2), ('b', 1)]),
+        ]
+        merged = NessusScanDetails.merge(shards)
+
+        self.assertEqual(merged.info.targets, '10.0.0.0/25,10.0.0.128/25')
+        self.assertEqual(merged.info.hostcount, 3)
+        self.assertEqual(merged.info.status, 'running')
+        self.assertSetEqual({host.hostname for host in merged.hosts}, {'10.0.0.1', '10.0.0.2', '10.0.0.129'})
+        self.assertDictEqual({vuln.plugin_id: vuln.count for vuln in merged.vulnerabilites}, {1: 5, 2: 1})
+        self.assertDictEqual({remediation.value: remediation.vulns
+                              for remediation in merged.remediations.remediations}, {'a': 3, 'b': 1})
+        self.assertEqual(merged.remediations.num_hosts, 3)
+        # both shards have a host 1, told apart by the shard holding them
+        self.assertListEqual(sorted((host.host_id, next(index for index, shard in enumerate(shards)
+                                                        if host in shard.hosts)) for host in merged.hosts),
+                             [(1, 0), (1, 1), (2, 0)])
+
+    def test_same_types(self):
+        shard = details('10.0.0.0/25', ['10.0.0.1'], [(1, 2)])
+        merged = NessusScanDetails.merge([shard, details('10.0.0.128/25', ['10.0.0.129'], [(1, 3)])])
+
+        for name in ('hosts', 'comphosts', 'notes', 'vulnerabilites', 'compliance', 'history', 'filters'):
+            self.assertIs(type(getattr(merged, name)), type(getattr(shard, name)), name)
+        self.assertIsInstance(merged.remediations.remediations, set)
+
+    def test_single(self):
+        shard = details('10.0.0.0/25', ['10.0.0.1'], [(1, 2)])
+
+        self.assertEqual(NessusScanDetails.merge([shard]).to_dict().keys(), shard.to_dict().keys())
+        self.assertEqual(NessusScanDetails.merge([shard]).info.status, 'completed')
 
 
 class TestScans(TestBase):
     def test_list(self):
         self.nessus.scans.list()
 
+    def test_list_incremental(self):
+        old_scans = {s.id for s in self.nessus.scans.list(incremental=True)}
+        policy = self.__get_policy()
+
+        created = self.nessus.scans.create(policy, default_targets=self.targets)
+        self.added_scans.add(created)
+
+        new_scans = {s.id for s in self.nessus.scans.list(incremental=True)}
+        old_scans.add(created.id)
+        self.assertSetEqual(new_scans, old_scans)
+        self.assertSetEqual(new_scans, self.__get_scans_id())
+
     def __get_template(self, name: str = 'discovery'):
-        templates = self.nessus.editor.list(NessusTemplateType.scan)
-        return next(t for t in templates if t.name == name)
+        return self.nessus.editor.template_by_name(NessusTemplateType.scan, name)
 
     def __get_scans_id(self):
         return {s.id for s in self.nessus.scans.list()}
@@ -23,8 +277,7 @@ class TestScans(TestBase):
         if template is None:
             template = self.__get_template()
         policy_id, policy_ = self.nessus.policies.create(template)
-        policies = self.nessus.policies.list()
-        policy = next(p for p in policies if p.id == policy_id)
+        policy = self.nessus.policies.policy_by_id(policy_id)
         self.added_policies.add(policy)
         return policy
 
@@ -70,14 +323,9 @@ class TestScans(TestBase):
         old_scans.add(created.id)
         self.assertSetEqual(new_scans, old_scans)
 
-    def __get_scan_status(self, scan_uuid: str) -> NessusScanStatus:
-        scans = self.nessus.scans.list()
-        scan = next(s for s in scans if s.uuid == scan_uuid)
-        return scan.status
-
     def __wait_scan_completion(self, launched_scan_uuid):
-        while self.__get_scan_status(launched_scan_uuid) is not NessusScanStatus.completed:
-            sleep(1)
+        scan = self.nessus.scans.wait(launched_scan_uuid)
+        self.assertIs(scan.status, NessusScanStatus.completed)
 
     def __get_scan_by_uuid(self, scan_uuid: str) -> NessusScan:
         return next(s for s in self.nessus.scans.list() if s.uuid == scan_uuid)
@@ -102,6 +350,33 @@ class TestScans(TestBase):
 
         self.nessus.scans.details(scan)
 
+    def test_wait_timeout(self):
+        template = self.__get_template('basic')
+        policy = self.__get_policy(template)
+        scan = self.nessus.scans.create(policy, default_targets=self.targets)
+        self.added_scans.add(scan)
+        launched_scan_uuid = self.nessus.scans.launch(scan)
+
+        self.assertRaises(NessusTimeoutError, self.nessus.scans.wait, launched_scan_uuid, timeout=0)
+        self.__wait_scan_completion(launched_scan_uuid)
+
+    def test_export_after_completion(self):
+        policy = self.__get_policy()
+        scan = self.nessus.scans.create(policy, default_targets=self.targets)
+        self.added_scans.add(scan)
+        launched_scan_uuid = self.nessus.scans.launch(scan)
+        self.__wait_scan_completion(launched_scan_uuid)
+
+        for export_format in (NessusScanExportFormat.nessus, NessusScanExportFormat.csv):
+            with TemporaryDirectory() as directory:
+                # the report replaces the destination once downloaded, so only its path is to be trusted
+                path = os.path.join(directory, 'report.{}'.format(export_format.value))
+                written = self.nessus.scans.export(scan, path, format=export_format)
+
+                self.assertGreater(written, 0)
+                self.assertEqual(written, os.path.getsize(path))
+                self.assertListEqual(os.listdir(directory), [os.path.basename(path)])
+
     def test_host_details_after_completion(self):
         template = self.__get_template('basic')
         policy = self.__get_policy(template)
@@ -114,6 +389,21 @@ class TestScans(TestBase):
 
         self.nessus.scans.host_details(scan=scan, host=host)
 
+    def test_all_host_details_after_completion(self):
+        template = self.__get_template('basic')
+        policy = self.__get_policy(template)
+        scan = self.nessus.scans.create(policy, default_targets=self.targets)
+        self.added_scans.add(scan)
+        launched_scan_uuid = self.nessus.scans.launch(scan)
+        self.__wait_scan_completion(launched_scan_uuid)
+        details = self.nessus.scans.details(scan)
+
+        harvested = list(self.nessus.scans.all_host_details(scan, max_workers=4))
+
+        self.assertSetEqual({h.host_id for h, _ in harvested}, {h.host_id for h in details.hosts})
+        for _, host_details in harvested:
+            self.assertNotIsInstance(host_details, Exception)
+
     def test_host_plugin_output_after_completion(self):
         template = self.__get_template('basic')
         policy = self.__get_policy(template)
@@ -127,3 +417,19 @@ class TestScans(TestBase):
         vulnerability = next(x for x in host_details.vulnerabilities)
 
         self.nessus.scans.plugin_output(scan=scan, host=host, plugin_id=vulnerability.plugin_id)
+
+    def test_plugins_output_after_completion(self):
+        template = self.__get_template('basic')
+        policy = self.__get_policy(template)
+        scan = self.nessus.scans.create(policy, default_targets=self.targets)
+        self.added_scans.add(scan)
+        launched_scan_uuid = self.nessus.scans.launch(scan)
+        self.__wait_scan_completion(launched_scan_uuid)
+        details = self.nessus.scans.details(scan)
+        host = next(x for x in details.hosts)
+        host_details = self.nessus.scans.host_details(scan=scan, host=host)
+        vulnerability = next(x for x in host_details.vulnerabilities)
+
+        outputs = self.nessus.scans.plugins_output(scan, [vulnerability.plugin_id], hosts=details.hosts)
+
+        self.assertIn(vulnerability.plugin_id, outputs[host])
@@ -0,0 +1,64 @@
+from ipaddress import IPv4Address, collapse_addresses
+from random import Random
+from unittest import TestCase
+
+from nessus.targets import count_hosts, shard_targets, normalize_targets
+
+
+class TestShardTargets(TestCase):
+    def test_count(self):
+        self.assertEqual(count_hosts(['10.0.0.0/24', '10.0.1.1-10.0.1.10', '10.0.2.1-5', 'host.test', '::1']), 273)
+
+    def test_network_cut_in_networks(self):
+        self.assertListEqual(shard_targets(['10.0.0.0/16'], 4),
+                             [['10.0.0.0/18'], ['10.0.64.0/18'], ['10.0.128.0/18'], ['10.0.192.0/18']])
+
+    def test_balanced(self):
+        targets = ['10.0.0.0/24', 'host.test', '10.0.1.1-10.0.1.10', '10.0.2.1-5', '192.168.0.1']
+        chunks = shard_targets(targets, 3)
+
+        self.assertListEqual([count_hosts(chunk) for chunk in chunks], [91, 91, 91])
+        self.assertListEqual(chunks[0], ['10.0.0.0-10.0.0.90'])
+        # the targets which are not cut are kept as given
+        self.assertListEqual(chunks[-1][-4:], targets[1:])
+
+    def test_not_enough_hosts(self):
+        self.assertListEqual(shard_targets(['a.test', 'b.test'], 5), [['a.test'], ['b.test']])
+        self.assertListEqual(shard_targets([], 5), [])
+
+    def test_not_parsed(self):
+        self.assertListEqual(shard_targets(['my-host.test', '10.0.0.9-1'], 1), [['my-host.test', '10.0.0.9-1']])
+
+
+class TestNormalizeTargets(TestCase):
+    def test_merge_adjacent_and_overlapping(self):
+        targets = ['10.0.0.3', '10.0.0.1', '10.0.0.2', '10.0.0.1', '10.0.0.4-10.0.0.9', '10.0.0.8/29', ' 10.0.0.0 ']
+
+        self.assertListEqual(normalize_targets(targets), ['10.0.0.0/28'])
+
+    def test_fewest_networks(self):
+        self.assertListEqual(normalize_targets(['10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.4', '10.0.0.6']),
+                             ['10.0.0.1', '10.0.0.2/31', '10.0.0.4', '10.0.0.6'])
+
+    def test_hostnames_and_ipv6(self):
+        targets = ['b.test', '::1', '10.0.0.1', 'a.test', '::', 'b.test', '']
+
+        self.assertListEqual(normalize_targets(targets), ['10.0.0.1', '::/127', 'b.test', 'a.test'])
+
+    def test_many_addresses(self):
+        targets = ['10.{}.{}.{}'.format(i >> 16, i >> 8 & 0xff, i & 0xff) for i in reversed(range(1 << 16))]
+
+        normalized = normalize_targets(targets)
+
+        self.assertListEqual(normalized, ['10.0.0.0/16'])
+        self.assertEqual(count_hosts(normalized), 1 << 16)
+
+    def test_scattered_addresses(self):
+        rnd = Random(4)
+        addresses = rnd.sample(range(1 << 32), 2000) + list(range(0xc0a80000, 0xc0a80007)) + [0xffffffff, 0]
+        targets = [str(IPv4Address(address)) for address in addresses * 2]
+        rnd.shuffle(targets)
+
+        expected = [str(network) if network.prefixlen < 32 else str(network.network_address)
+                    for network in collapse_addresses(map(IPv4Address, addresses))]
+        self.assertListEqual(normalize_targets(targets), expected)
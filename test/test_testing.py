@@ -0,0 +1,138 @@
+from io import BytesIO
+from unittest import TestCase
+
+from nessus import LibNessus
+from nessus.editor import NessusTemplateType
+from nessus.error import NessusNetworkError, NessusInternalServerError, NessusScanIsActiveError, \
+    NessusPolicyInUseError
+from nessus.report import parse_report, NessusReportHost, NessusReportItem
+from nessus.retry import NessusRetryPolicy
+from nessus.scans import NessusScanStatus
+from nessus.targets import iter_hosts
+from nessus.testing import NessusMockServer
+
+
+class TestIterHosts(TestCase):
+    def test_expanded(self):
+        self.assertListEqual(list(iter_hosts(['10.0.0.0/31', 'host.test', '10.0.1.1-3'])),
+                             ['10.0.0.0', '10.0.0.1', 'host.test', '10.0.1.1', '10.0.1.2', '10.0.1.3'])
+
+
+class TestMockServer(TestCase):
+    def server(self, **kwargs):
+        server = NessusMockServer(**kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    @staticmethod
+    def create(nessus, targets=('10.0.0.0/24',)):
+        template = nessus.editor.template_by_name(NessusTemplateType.policy, 'basic')
+        policy_id, _ = nessus.policies.create(template)
+        policy = nessus.policies.policy_by_id(policy_id)
+        return policy, nessus.scans.create(policy, default_targets=targets)
+
+    def test_lifecycle(self):
+        nessus = self.server(scan_duration=0.5).client()
+        policy, scan = self.create(nessus)
+        self.assertEqual(nessus.scans.details(scan).info.status, 'empty')
+
+        scan_uuid = nessus.scans.launch(scan)
+        self.assertEqual(nessus.scans.details(scan).info.status, 'running')
+        with self.assertRaises(NessusScanIsActiveError):
+            nessus.scans.delete(scan)
+
+        finished = nessus.scans.wait(scan_uuid, timeout=10, min_interval=0.1)
+        self.assertEqual(finished.status, NessusScanStatus.completed)
+        self.assertEqual(nessus.scans.details(finished).info.status, 'completed')
+
+        with self.assertRaises(NessusPolicyInUseError):
+            nessus.policies.delete(policy)
+        nessus.scans.delete(finished)
+        nessus.policies.delete(policy)
+        self.assertSetEqual(set(nessus.scans.list()), set())
+
+    def test_large_results(self):
+        nessus = self.server(scan_duration=0, max_hosts=5000, vulnerabilities_per_host=4, plugins=50).client()
+        _, scan = self.create(nessus, targets=['10.0.0.0/16'])
+        nessus.scans.launch(scan)
+
+        details = nessus.scans.details(scan)
+        self.assertEqual(details.info.hostcount, 5000)
+        self.assertEqual(len(details.hosts), 5000)
+        self.assertEqual(sum(vuln.count for vuln in details.vulnerabilites), 5000 * 4)
+
+        host = min(details.hosts, key=lambda h: h.host_id)
+        host_details = nessus.scans.host_details(scan, host)
+        self.assertEqual(host_details.info.host_ip, '10.0.0.0')
+        self.assertEqual(len(host_details.vulnerabilities), 4)
+
+        plugin_id = min(vuln.plugin_id for vuln in host_details.vulnerabilities)
+        outputs = sorted(nessus.scans.plugin_output(scan, host, plugin_id).output, key=lambda o: -len(o.ports[0].hosts))
+        # every host with the plugin shares an output, some hosts also have one of their own
+        self.assertEqual(len(outputs[0].ports[0].hosts),
+                         next(v.count for v in details.vulnerabilites if v.plugin_id == plugin_id))
+        self.assertEqual(len(outputs), 2 if (host.host_id + plugin_id) % 3 == 0 else 1)
+        for output in outputs[1:]:
+            self.assertListEqual([h.hostname for h in output.ports[0].hosts], ['10.0.0.0'])
+
+    def test_plugins_output(self):
+        nessus = self.server(scan_duration=0, vulnerabilities_per_host=2, plugins=3).client()
+        _, scan = self.create(nessus, targets=['10.0.0.0/29'])
+        nessus.scans.launch(scan)
+        plugin_id = min(vuln.plugin_id for vuln in nessus.scans.details(scan).vulnerabilites)
+
+        details = nessus.scans.details(scan)
+        outputs = nessus.scans.plugins_output(scan, [plugin_id], hosts=details.hosts)
+
+        shared = 'Synthetic finding of plugin {}, the same on every host.'.format(plugin_id)
+        for host in details.hosts:
+            expected = set()
+            if plugin_id in {v.plugin_id for v in nessus.scans.host_details(scan, host).vulnerabilities}:
+                expected.add(shared)
+                if (host.host_id + plugin_id) % 3 == 0:
+                    expected.add('Synthetic finding of plugin {}, only on {}.'.format(plugin_id, host.hostname))
+            self.assertSetEqual({o.plugin_output for o in outputs.get(host, {}).get(plugin_id, ())}, expected)
+        self.assertTrue(any(len(by_plugin[plugin_id]) == 2 for by_plugin in outputs.values()))
+
+    def test_same_results_for_same_seed(self):
+        def plugins(server):
+            nessus = server.client()
+            _, scan = self.create(nessus)
+            nessus.scans.launch(scan)
+            return {(vuln.plugin_id, vuln.count) for vuln in nessus.scans.details(scan).vulnerabilites}
+
+        self.assertSetEqual(plugins(self.server(scan_duration=0, seed=4)),
+                            plugins(self.server(scan_duration=0, seed=4)))
+
+    def test_export(self):
+        nessus = self.server(scan_duration=0, vulnerabilities_per_host=3).client()
+        _, scan = self.create(nessus, targets=['10.0.0.0/28', 'host.test'])
+        nessus.scans.launch(scan)
+
+        report = BytesIO()
+        nessus.scans.export(scan, report)
+        report.seek(0)
+        elements = list(parse_report(report))
+
+        hosts = [e.name for e in elements if isinstance(e, NessusReportHost)]
+        self.assertEqual(len(hosts), 17)
+        self.assertEqual(hosts[-1], 'host.test')
+        self.assertEqual(sum(isinstance(e, NessusReportItem) for e in elements), 17 * 3)
+
+    def test_credentials(self):
+        server = self.server()
+        nessus = LibNessus(server.host, server.port, server.api_access_key, 'wrong', scheme='http')
+
+        with self.assertRaises(NessusNetworkError) as context:
+            nessus.scans.list()
+        self.assertEqual(context.exception.response.status_code, 401)
+
+    def test_error_rate(self):
+        server = self.server(error_rate=1)
+        with self.assertRaises(NessusInternalServerError):
+            server.client().scans.list()
+
+        server.error_rate = 0.5
+        nessus = server.client(retry_policy=NessusRetryPolicy(attempts=20, base_delay=0))
+        for _ in range(10):
+            nessus.scans.list()
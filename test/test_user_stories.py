@@ -1,5 +1,4 @@
 import os
-from time import sleep
 
 from nessus.editor import NessusTemplateType
 from nessus.file import NessusFile
@@ -21,15 +20,8 @@ class TestUserStories(TestBase):
 
         scan_uuid = self.nessus.scans.launch(scan)
 
-        status = None
-        while status is not NessusScanStatus.completed:
-            scans = self.nessus.scans.list()
-            scanning = next(s for s in scans if s.uuid == scan_uuid)
-            status = scanning.status
-            sleep(1)
-
-        scans = self.nessus.scans.list()
-        scanned = next(s for s in scans if s.uuid == scan_uuid)
+        scanned = self.nessus.scans.wait(scan_uuid)
+        self.assertIs(scanned.status, NessusScanStatus.completed)
         self.nessus.scans.details(scanned)
 
     def scan_with_import(self, name: str):
@@ -44,13 +36,6 @@ class TestUserStories(TestBase):
 
         scan_uuid = self.nessus.scans.launch(scan)
 
-        status = None
-        while status is not NessusScanStatus.completed:
-            scans = self.nessus.scans.list()
-            scanning = next(s for s in scans if s.uuid == scan_uuid)
-            status = scanning.status
-            sleep(1)
-
-        scans = self.nessus.scans.list()
-        scanned = next(s for s in scans if s.uuid == scan_uuid)
+        scanned = self.nessus.scans.wait(scan_uuid)
+        self.assertIs(scanned.status, NessusScanStatus.completed)
         self.nessus.scans.details(scanned)
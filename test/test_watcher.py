@@ -0,0 +1,53 @@
+from collections import namedtuple
+from unittest import TestCase
+
+from nessus.editor import NessusTemplateType
+from nessus.scans import NessusScanStatus
+from nessus.watcher import ScanWatcher
+from test import TestBase
+
+Scan = namedtuple('Scan', ('uuid', 'status'))
+
+
+class Scans:
+    def __init__(self, *scans):
+        self.scans = scans
+
+    def list(self, incremental=False):
+        return self.scans
+
+
+class TestWatcherCallbacks(TestCase):
+    def test_raising_callback(self):
+        scans = Scans(Scan('a', NessusScanStatus.completed), Scan('b', NessusScanStatus.completed))
+        seen = list()
+
+        def fail(scan):
+            raise ValueError(scan.uuid)
+
+        with ScanWatcher(scans, interval=3600) as watcher:
+            futures = [watcher.watch('a', fail), watcher.watch('b', lambda scan: seen.append(scan.uuid))]
+            with self.assertLogs(level='ERROR'):
+                watcher.tick()
+
+        self.assertListEqual([future.result(timeout=0).uuid for future in futures], ['a', 'b'])
+        self.assertListEqual(seen, ['b'])
+
+
+class TestWatcher(TestBase):
+    def test_watch_launched_scans(self):
+        templates = self.nessus.editor.list(NessusTemplateType.scan)
+        template = next(t for t in templates if t.name == 'discovery')
+        policy_id, _ = self.nessus.policies.create(template)
+        self.added_policies_id.add(policy_id)
+        policy = next(p for p in self.nessus.policies.list() if p.id == policy_id)
+
+        futures = list()
+        with ScanWatcher(self.nessus.scans, interval=1) as watcher:
+            for _ in range(2):
+                scan = self.nessus.scans.create(policy, default_targets=self.targets)
+                self.added_scans.add(scan)
+                futures.append(watcher.watch(self.nessus.scans.launch(scan)))
+
+            for future in futures:
+                self.assertIs(future.result().status, NessusScanStatus.completed)